@@ -6,6 +6,8 @@ class AbelianGroup(ABC):
     Implements __init__, __add__, __neg__, __sub__, __eq__,
     and all the r- variations.
     """
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self):
         pass
@@ -39,6 +41,8 @@ class Ring(AbelianGroup):
     """Abstract class of a ring. Inherits AbelianGroup.
     Implements __mul__ and __rmul__.
     """
+    __slots__ = ()
+
     @abstractmethod
     def __mul__(self, other):
         pass
@@ -49,7 +53,7 @@ class Ring(AbelianGroup):
 
     @classmethod
     def __subclasshook__(cls, subclass):
-        if subclass is int:
+        if cls is Ring and subclass is int:
             return True
         return NotImplemented
 
@@ -58,6 +62,8 @@ class Field(Ring):
     """Abstract class of a field. Inherits Ring.
     Implements __truediv__ and __rtruediv__.
     """
+    __slots__ = ()
+
     @abstractmethod
     def __truediv__(self, other):
         pass
@@ -68,6 +74,6 @@ class Field(Ring):
 
     @classmethod
     def __subclasshook__(cls, subclass):
-        if subclass is float:
+        if cls is Field and subclass is float:
             return True
         return NotImplemented
@@ -1,13 +1,13 @@
-from copy import deepcopy
-
-import rationals
+import operator
+from array import array
+from math import isqrt
 
 
 def del_extra_zeros(a):
     """
     Deleting extra zeros from the end of list
     """
-    b = deepcopy(a)
+    b = list(a)
     while b and b[-1] == 0:
         del b[-1]
     return b
@@ -18,18 +18,53 @@ def gcd(a, b):
     The correctness of the algorithm is guaranteed iff a and b are elements
     of some Euclidean domain. For a and b must be implemented:
     __ne__ to zero, __imod__ each other.
+    Objects of the same type with a gcd method, like Polynomials, are
+    delegated to it.
     """
+    if type(a) is type(b) and hasattr(type(a), 'gcd'):
+        return a.gcd(b)
     while b != 0:
         a %= b
         a, b = b, a
     return a
 
 
-def get_largest_abelian_group(cls1, cls2, exc):
-    """Return the largest class of cls1 and cls2, i.e., the class, to which
-    both abelian groups can be cast. If both cannot be cast to each other,
-    raise exc.
-    """
+# The coercion lattice: _embeddings[cls] is the set of classes, to which
+# elements of cls can be cast. _coercions memoizes the results of
+# get_largest_abelian_group for pairs of classes (None if there is none).
+_embeddings = {}
+_lattice = set()
+_coercions = {}
+
+
+def register_embedding(cls1, cls2):
+    """Declare that the elements of cls1 can be cast to cls2 by cls2(a)."""
+    _embeddings.setdefault(cls1, set()).add(cls2)
+    _lattice.update((cls1, cls2))
+    _coercions.clear()
+
+
+def _embeds(cls1, cls2):
+    """Return whether cls1 embeds into cls2 through registered embeddings."""
+    seen, stack = {cls1}, [cls1]
+    while stack:
+        for cls in _embeddings.get(stack.pop(), ()):
+            if cls is cls2:
+                return True
+            if cls not in seen:
+                seen.add(cls)
+                stack.append(cls)
+    return False
+
+
+def _coerce(cls1, cls2):
+    if cls1 is cls2 or _embeds(cls2, cls1):
+        return cls1
+    if _embeds(cls1, cls2):
+        return cls2
+    if cls1 in _lattice and cls2 in _lattice:
+        return None
+    # Classes outside of the lattice are tried by casting zero.
     try:
         cls1(cls2(0))
         return cls1
@@ -38,7 +73,32 @@ def get_largest_abelian_group(cls1, cls2, exc):
             cls2(cls1(0))
             return cls2
         except (ValueError, TypeError):
-            raise exc
+            return None
+
+
+def get_largest_abelian_group(cls1, cls2, exc):
+    """Return the largest class of cls1 and cls2, i.e., the class, to which
+    both abelian groups can be cast. If both cannot be cast to each other,
+    raise exc.
+
+    The answer comes from the registered embeddings (see
+    register_embedding) and is memoized for every pair of classes.
+    """
+    if cls1 is cls2:
+        return cls1
+    try:
+        res = _coercions[cls1, cls2]
+    except KeyError:
+        res = _coercions[cls1, cls2] = _coerce(cls1, cls2)
+    except TypeError:
+        # Unhashable arguments are not classes.
+        raise exc
+    if res is None:
+        raise exc
+    return res
+
+
+register_embedding(int, float)
 
 
 def add_lists(ls1: list, ls2: list):
@@ -49,7 +109,8 @@ def add_lists(ls1: list, ls2: list):
     if len(ls1) > len(ls2):
         ls1, ls2 = ls2, ls1
     res = [ls1[i] + ls2[i] for i in range(len(ls1))]
-    res.extend(deepcopy(ls2[len(ls1):len(ls2)]))
+    # The elements are immutable, so they are shared, not copied.
+    res.extend(ls2[len(ls1):len(ls2)])
     return res
 
 
@@ -58,9 +119,426 @@ def sub_lists(ls1: list, ls2: list):
     return add_lists(ls1, [-i for i in ls2])
 
 
+# Below these lengths the schoolbook and Karatsuba products are cheaper
+# than the bookkeeping of the next algorithm.
+KARATSUBA_THRESHOLD = 24
+TOOM3_THRESHOLD = 96
+
+
 def mul_lists(ls1: list, ls2: list):
-    res = [0 for _ in range(len(ls1) + len(ls2))]
-    for i in range(len(ls1)):
-        for j in range(len(ls2)):
-            res[i + j] += ls1[i] * ls2[j]
+    """Return the coefficients of the product of polynomials with
+    coefficients ls1 and ls2. The result has len(ls1) + len(ls2) elements.
+
+    Short lists are multiplied by the schoolbook method, longer ones by
+    Karatsuba's method, and if 2 and 3 are invertible (or exactly divisible,
+    for ints) by Toom-3. Only +, - and * of the elements are required for
+    the first two.
+    """
+    n = len(ls1) + len(ls2)
+    if min(len(ls1), len(ls2)) < KARATSUBA_THRESHOLD:
+        return _schoolbook(ls1, ls2, n)
+    divide = None
+    if min(len(ls1), len(ls2)) >= TOOM3_THRESHOLD:
+        divide = _exact_divider(ls1[0] * ls2[0])
+    res = _toom3(ls1, ls2, divide) if divide else _karatsuba(ls1, ls2)
+    res.extend(0 for _ in range(n - len(res)))
+    del res[n:]
+    return res
+
+
+# The low product of length n uses a full product of the first
+# MULDERS_RATIO * n coefficients, see mul_low.
+MULDERS_RATIO = 0.7
+
+
+def mul_low(ls1: list, ls2: list, n: int):
+    """Return the first n coefficients of the product of polynomials with
+    coefficients ls1 and ls2 (the product mod X^n), computing no
+    coefficients above them where possible.
+
+    Short lists are multiplied by the schoolbook method restricted to the
+    low triangle. Longer ones by Mulders' short product: the first k =
+    MULDERS_RATIO * n coefficients are multiplied by mul_lists, and the two
+    remaining cross products are low products of length n - k.
+    """
+    ls1, ls2 = ls1[:n], ls2[:n]
+    if not ls1 or not ls2:
+        return [0] * n
+    if min(len(ls1), len(ls2)) < KARATSUBA_THRESHOLD:
+        return _schoolbook_low(ls1, ls2, n)
+    k = max(int(MULDERS_RATIO * n + 0.5), (n + 1) // 2)
+    res = mul_lists(ls1[:k], ls2[:k])
+    if n > k:
+        _add_into(res, k, mul_low(ls1[k:], ls2, n - k))
+        _add_into(res, k, mul_low(ls2[k:], ls1, n - k))
+    res.extend(0 for _ in range(n - len(res)))
+    del res[n:]
+    return res
+
+
+def _schoolbook_low(ls1, ls2, n):
+    """The schoolbook product restricted to the coefficients below n."""
+    res = [0] * n
+    for i, a in enumerate(ls1[:n]):
+        for j, b in enumerate(ls2[:n - i], i):
+            res[j] += a * b
+    return res
+
+
+def _schoolbook(ls1, ls2, n):
+    res = [0] * n
+    for i, a in enumerate(ls1):
+        for j, b in enumerate(ls2, i):
+            res[j] += a * b
+    return res
+
+
+def _exact_divider(sample):
+    """Return a function dividing elements of sample's type exactly by
+    small integers (2 and 3), or None if that is impossible.
+    """
+    if type(sample) is not int:
+        try:
+            sample / 6
+        except (ZeroDivisionError, TypeError, ValueError):
+            return None
+    return _divide_exact
+
+
+def _divide_exact(x, d):
+    # Padding zeros are ints even for lists of other elements.
+    if type(x) is int:
+        return x // d
+    return x / d
+
+
+def _add_into(res, offset, ls):
+    """res[offset + i] += ls[i], extending res if needed."""
+    if len(res) < offset + len(ls):
+        res.extend(0 for _ in range(offset + len(ls) - len(res)))
+    for i, x in enumerate(ls, offset):
+        res[i] = res[i] + x
+
+
+def _sub_into(res, offset, ls):
+    """res[offset + i] -= ls[i], extending res if needed."""
+    if len(res) < offset + len(ls):
+        res.extend(0 for _ in range(offset + len(ls) - len(res)))
+    for i, x in enumerate(ls, offset):
+        res[i] = res[i] - x
+
+
+def _unbalanced(ls1, ls2, mul):
+    """Multiply lists of very different lengths by cutting the longer one
+    into pieces of the length of the shorter one.
+    """
+    if len(ls1) < len(ls2):
+        step = len(ls1)
+        res = []
+        for k in range(0, len(ls2), step):
+            _add_into(res, k, mul(ls1, ls2[k:k + step]))
+        return res
+    step = len(ls2)
+    res = []
+    for k in range(0, len(ls1), step):
+        _add_into(res, k, mul(ls1[k:k + step], ls2))
+    return res
+
+
+def _karatsuba(ls1, ls2):
+    n1, n2 = len(ls1), len(ls2)
+    if n1 < KARATSUBA_THRESHOLD or n2 < KARATSUBA_THRESHOLD:
+        return _schoolbook(ls1, ls2, n1 + n2)
+    if n1 >= 2 * n2 or n2 >= 2 * n1:
+        return _unbalanced(ls1, ls2, _karatsuba)
+    m = (max(n1, n2) + 1) // 2
+    a0, a1 = ls1[:m], ls1[m:]
+    b0, b1 = ls2[:m], ls2[m:]
+    z0 = _karatsuba(a0, b0)
+    z2 = _karatsuba(a1, b1)
+    z1 = _karatsuba(_sum(a0, a1), _sum(b0, b1))
+    _sub_into(z1, 0, z0)
+    _sub_into(z1, 0, z2)
+    res = z0
+    _add_into(res, m, z1)
+    _add_into(res, 2 * m, z2)
+    return res
+
+
+def _toom3(ls1, ls2, divide):
+    """Toom-3 multiplication with Bodrato's evaluation points
+    0, 1, -1, -2 and infinity.
+    """
+    n1, n2 = len(ls1), len(ls2)
+    if n1 < TOOM3_THRESHOLD or n2 < TOOM3_THRESHOLD:
+        return _karatsuba(ls1, ls2)
+    if n1 >= 2 * n2 or n2 >= 2 * n1:
+        return _unbalanced(ls1, ls2, lambda x, y: _toom3(x, y, divide))
+    k = (max(n1, n2) + 2) // 3
+
+    def evaluate(ls):
+        a0, a1, a2 = ls[:k], ls[k:2 * k], ls[2 * k:]
+        m = _sum(a0, a2)
+        p1 = _sum(m, a1)
+        pm1 = _diff(m, a1)
+        pm2 = _diff([2 * x for x in _sum(pm1, a2)], a0)
+        return a0, p1, pm1, pm2, a2
+
+    p0, p1, pm1, pm2, pinf = evaluate(ls1)
+    q0, q1, qm1, qm2, qinf = evaluate(ls2)
+    r0 = _toom3(p0, q0, divide)
+    r1 = _toom3(p1, q1, divide)
+    rm1 = _toom3(pm1, qm1, divide)
+    rm2 = _toom3(pm2, qm2, divide)
+    rinf = _toom3(pinf, qinf, divide)
+
+    r3 = [divide(x, 3) for x in _diff(rm2, r1)]
+    r1 = [divide(x, 2) for x in _diff(r1, rm1)]
+    r2 = _diff(rm1, r0)
+    r3 = _sum([divide(x, 2) for x in _diff(r2, r3)], [2 * x for x in rinf])
+    r2 = _diff(_sum(r2, r1), rinf)
+    r1 = _diff(r1, r3)
+
+    res = r0
+    _add_into(res, k, r1)
+    _add_into(res, 2 * k, r2)
+    _add_into(res, 3 * k, r3)
+    _add_into(res, 4 * k, rinf)
     return res
+
+
+def _sum(ls1, ls2):
+    """Element-wise sum without copying the tail of the longer list."""
+    if len(ls1) < len(ls2):
+        ls1, ls2 = ls2, ls1
+    res = list(ls1)
+    for i, x in enumerate(ls2):
+        res[i] = res[i] + x
+    return res
+
+
+def _diff(ls1, ls2):
+    res = list(ls1)
+    _sub_into(res, 0, ls2)
+    return res
+
+
+# Primes q = c * 2^k + 1 with a primitive root g, used for number-theoretic
+# transforms of length up to 2^k.
+NTT_PRIMES = [
+    (998244353, 3, 23),
+    (167772161, 3, 25),
+    (469762049, 3, 26),
+    (754974721, 11, 24),
+]
+# From this length of the shorter factor on, mul_lists_mod uses
+# number-theoretic transforms instead of Kronecker substitution, whose
+# product of Python ints is computed in C but only by Karatsuba's method.
+# Measured for two factors of equal length: the NTT takes 9x as long at
+# 2^10, 1.3x at 2^18, and wins from 2^19 (0.9x for p = 998244353) and 2^20
+# (0.65x for p = 998244353, 0.95x for p = 5).
+NTT_THRESHOLD = 1 << 19
+
+
+def mul_lists_mod(ls1: list, ls2: list, p: int):
+    """Return the coefficients of the product of polynomials with integer
+    coefficients ls1 and ls2 in [0, p), reduced modulo p. The result has
+    len(ls1) + len(ls2) elements.
+
+    The exact integer product is computed either by Kronecker substitution
+    (the lists are packed into Python ints, whose product is computed in C)
+    or, for very long inputs, by number-theoretic transforms modulo as many
+    primes of NTT_PRIMES as needed, combined by the Chinese remainder
+    theorem.
+    """
+    n = len(ls1) + len(ls2)
+    if not ls1 or not ls2:
+        return [0] * n
+    if min(len(ls1), len(ls2)) < NTT_THRESHOLD:
+        return _kronecker_mul(ls1, ls2, p)
+    # Every coefficient of the integer product is in [0, bound).
+    bound = min(len(ls1), len(ls2)) * (p - 1) ** 2 + 1
+    size = 1 << (n - 1).bit_length()
+    primes = []
+    for q, g, k in NTT_PRIMES:
+        if size > 1 << k:
+            continue
+        primes.append((q, g))
+        bound //= q
+        if bound == 0:
+            break
+    else:
+        # The primes can't hold the coefficients (large p).
+        return _kronecker_mul(ls1, ls2, p)
+    moduli = [q for q, _ in primes]
+    residues = [_ntt_convolution(ls1, ls2, size, q, g) for q, g in primes]
+    res = residues[0]
+    modulus = moduli[0]
+    for q, other in zip(moduli[1:], residues[1:]):
+        # Garner's step: x = res + modulus * t with x = other (mod q).
+        inverse = pow(modulus, -1, q)
+        res = [x + modulus * ((y - x) * inverse % q) for x, y in zip(res, other)]
+        modulus *= q
+    return [x % p for x in res[:n]]
+
+
+def _kronecker_mul(ls1, ls2, p):
+    """mul_lists_mod by evaluation at a power of 2 larger than every
+    coefficient of the integer product.
+    """
+    n = len(ls1) + len(ls2)
+    bits = 2 * (p - 1).bit_length() + min(len(ls1), len(ls2)).bit_length()
+    for code in 'BHIQ':
+        if 8 * array(code).itemsize >= bits:
+            width = array(code).itemsize
+            a = int.from_bytes(array(code, ls1).tobytes(), 'little')
+            b = int.from_bytes(array(code, ls2).tobytes(), 'little')
+            digits = array(code)
+            digits.frombytes((a * b).to_bytes(n * width, 'little'))
+            return [x % p for x in digits]
+    width = (bits + 7) // 8
+    a = int.from_bytes(b''.join(x.to_bytes(width, 'little') for x in ls1), 'little')
+    b = int.from_bytes(b''.join(x.to_bytes(width, 'little') for x in ls2), 'little')
+    raw = (a * b).to_bytes(n * width, 'little')
+    return [int.from_bytes(raw[i:i + width], 'little') % p for i in range(0, len(raw), width)]
+
+
+def _ntt_convolution(ls1, ls2, size, q, g):
+    """Return the cyclic convolution of ls1 and ls2 of the given size
+    (a power of 2) modulo q.
+    """
+    a = [x % q for x in ls1]
+    a.extend([0] * (size - len(a)))
+    _ntt(a, q, g)
+    if ls2 is ls1:
+        b = a
+    else:
+        b = [x % q for x in ls2]
+        b.extend([0] * (size - len(b)))
+        _ntt(b, q, g)
+    c = [x * y % q for x, y in zip(a, b)]
+    _inverse_ntt(c, q, g)
+    return c
+
+
+def _ntt(a, q, g):
+    """In-place decimation-in-frequency transform. The output is in
+    bit-reversed order, which _inverse_ntt expects.
+    """
+    n = len(a)
+    length = n
+    while length > 1:
+        half = length >> 1
+        w = pow(g, (q - 1) // length, q)
+        ws = [1] * half
+        for j in range(1, half):
+            ws[j] = ws[j - 1] * w % q
+        if half >= n // length:
+            for s in range(0, n, length):
+                lo = a[s:s + half]
+                hi = a[s + half:s + length]
+                a[s:s + half] = [(u + v) % q for u, v in zip(lo, hi)]
+                a[s + half:s + length] = [(u - v) * t % q for u, v, t in zip(lo, hi, ws)]
+        else:
+            for j in range(half):
+                lo = a[j::length]
+                hi = a[j + half::length]
+                t = ws[j]
+                a[j::length] = [(u + v) % q for u, v in zip(lo, hi)]
+                a[j + half::length] = [(u - v) * t % q for u, v in zip(lo, hi)]
+        length = half
+
+
+def _inverse_ntt(a, q, g):
+    """In-place decimation-in-time inverse transform of a list in
+    bit-reversed order, including the division by len(a).
+    """
+    n = len(a)
+    length = 2
+    while length <= n:
+        half = length >> 1
+        w = pow(g, q - 1 - (q - 1) // length, q)
+        ws = [1] * half
+        for j in range(1, half):
+            ws[j] = ws[j - 1] * w % q
+        if half >= n // length:
+            for s in range(0, n, length):
+                lo = a[s:s + half]
+                hi = [v * t % q for v, t in zip(a[s + half:s + length], ws)]
+                a[s:s + half] = [(u + v) % q for u, v in zip(lo, hi)]
+                a[s + half:s + length] = [(u - v) % q for u, v in zip(lo, hi)]
+        else:
+            for j in range(half):
+                lo = a[j::length]
+                t = ws[j]
+                hi = [v * t % q for v in a[j + half::length]]
+                a[j::length] = [(u + v) % q for u, v in zip(lo, hi)]
+                a[j + half::length] = [(u - v) % q for u, v in zip(lo, hi)]
+        length <<= 1
+    inverse = pow(n, q - 2, q)
+    a[:] = [x * inverse % q for x in a]
+
+
+def is_prime(n: int):
+    """Deterministic Miller-Rabin primality test for ints
+    (exact for n < 3.3 * 10^24, which covers every use in the package).
+    """
+    if n < 2:
+        return False
+    bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for b in bases:
+        if n % b == 0:
+            return n == b
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for b in bases:
+        x = pow(b, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def rational_reconstruction(u: int, m: int):
+    """Return the fraction (n, d) with n = d * u modulo m, |n| and d at most
+    sqrt(m / 2), d > 0 and gcd(n, d) = 1, or None if there is none. It is
+    found by the extended Euclidean algorithm on m and u, stopped halfway.
+    """
+    bound = isqrt(m // 2)
+    r0, r1 = m, u % m
+    t0, t1 = 0, 1
+    while r1 > bound:
+        q = r0 // r1
+        r0, r1 = r1, r0 - q * r1
+        t0, t1 = t1, t0 - q * t1
+    if t1 < 0:
+        r1, t1 = -r1, -t1
+    if t1 > bound or gcd(r1, t1) != 1:
+        return None
+    return r1, t1
+
+
+def divmod_lists(ls1: list, ls2: list):
+    """Return the coefficients of the quotient and the remainder of the
+    division of polynomials with coefficients ls1 and ls2. The last element
+    of ls2 must be invertible.
+    """
+    n = len(ls2) - 1
+    if len(ls1) <= n:
+        return [], list(ls1)
+    remainder = list(ls1)
+    inverse = 1 / ls2[-1]
+    low = ls2[:n]
+    quotient = [0] * (len(ls1) - n)
+    for i in range(len(quotient) - 1, -1, -1):
+        c = remainder[i + n] * inverse
+        quotient[i] = c
+        remainder[i:i + n] = map(operator.sub, remainder[i:i + n], [c * x for x in low])
+    return quotient, remainder[:n]
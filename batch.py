@@ -0,0 +1,182 @@
+"""Bulk operations on many independent polynomials in a pool of processes.
+
+    from batch import map_mul
+    products = map_mul([(f1, g1), (f2, g2), ...])
+
+The jobs are cut into chunks, which are sent to the worker processes of a
+concurrent.futures.ProcessPoolExecutor. The polynomials are sent in a
+compact form: the raw ints (or floats) of the coefficients and a tag of the
+base class, instead of the pickled graph of coefficient objects. Sparse
+polynomials are sent as their exponents and nonzero coefficients.
+
+Every map_* function returns the list of the results in the order of the
+jobs and accepts:
+workers -- the number of processes, os.cpu_count() by default. With one
+    worker, or fewer than SERIAL_LIMIT jobs, the jobs are run in this
+    process.
+chunk_size -- the number of jobs sent at once, by default such that every
+    worker gets about CHUNKS_PER_WORKER chunks.
+executor -- an executor to use instead of a new pool, e.g. to reuse it.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from integer_residues import ResidueArray, ResidueField, PrimeField
+from polynomials import Polynomials
+from rationals import Rationals
+from sparse import SparseArray
+
+# Smaller batches aren't worth starting processes.
+SERIAL_LIMIT = 64
+CHUNKS_PER_WORKER = 4
+
+
+def _encode_scalar(x):
+    """Return a picklable compact form of an element of a base class."""
+    cls = type(x)
+    if cls is Rationals:
+        return 'q', (x._nom, x._denom)
+    if isinstance(x, ResidueField):
+        return cls._prime, int(x)
+    return None, x
+
+
+def _decode_scalar(data):
+    tag, value = data
+    if tag == 'q':
+        return Rationals._make(*value)
+    if type(tag) is int:
+        return PrimeField(tag)(value)
+    return value
+
+
+def _encode_coeffs(coeffs, cls):
+    """Return the base class tag ('i' for int, 'f' for float, 'q' for
+    Rationals, p for PrimeField(p), None for other classes, whose elements
+    are pickled) and a compact form of the list of coefficients.
+    """
+    if issubclass(cls, ResidueField):
+        return cls._prime, [int(c) for c in coeffs]
+    if cls is int:
+        return 'i', coeffs
+    if cls is float:
+        return 'f', array('d', coeffs)
+    if cls is Rationals:
+        return 'q', [part for c in coeffs for part in (c._nom, c._denom)]
+    return None, (coeffs, cls)
+
+
+def _decode_coeffs(data):
+    """Return the base class and the list of coefficients of _encode_coeffs."""
+    tag, value = data
+    if type(tag) is int:
+        field = PrimeField(tag)
+        return field, [field(r) for r in value]
+    if tag == 'i':
+        return int, value
+    if tag == 'f':
+        return float, list(value)
+    if tag == 'q':
+        return Rationals, [Rationals._make(value[i], value[i + 1]) for i in range(0, len(value), 2)]
+    coeffs, cls = value
+    return cls, coeffs
+
+
+def _encode(f):
+    """Return a picklable compact form of a polynomial or a scalar: a tag
+    and the coefficients, see _encode_coeffs. Sparse polynomials are sent
+    as their exponents and nonzero coefficients, with the tag 't'.
+    """
+    if type(f) is not Polynomials:
+        return 's', _encode_scalar(f)
+    cls = f._base_cls
+    if type(f._coeffs) is SparseArray:
+        terms = f._coeffs.terms()
+        return 't', (array('q', [e for e, _ in terms]), _encode_coeffs([c for _, c in terms], cls))
+    if issubclass(cls, ResidueField):
+        residues = f._coeffs.residues
+        return cls._prime, residues if type(residues) is array else list(residues)
+    return _encode_coeffs(list(f._coeffs), cls)
+
+
+def _decode(data):
+    tag, value = data
+    if tag == 's':
+        return _decode_scalar(value)
+    if tag == 't':
+        exps, coeffs = value
+        cls, coeffs = _decode_coeffs(coeffs)
+        return Polynomials._from_terms(list(zip(exps, coeffs)), cls)
+    if type(tag) is int:
+        field = PrimeField(tag)
+        return Polynomials._from_residues(ResidueArray._make(field, ResidueArray._new_data(field, value)))
+    cls, coeffs = _decode_coeffs(data)
+    if tag is None:
+        return Polynomials(coeffs, cls)
+    return Polynomials._from_coeffs(coeffs, cls)
+
+
+_OPERATIONS = {
+    'mul': lambda f, g: f * g,
+    'divmod': lambda f, g: f.euclidean_division(g),
+    'gcd': lambda f, g: f.gcd(g),
+    'eval': lambda f, x: f(x),
+}
+
+
+def _run_chunk(name, chunk):
+    """Run the operation name on a chunk of encoded jobs in a worker and
+    return the encoded results.
+    """
+    operation = _OPERATIONS[name]
+    res = []
+    for a, b in chunk:
+        result = operation(_decode(a), _decode(b))
+        res.append(tuple(map(_encode, result)) if type(result) is tuple else _encode(result))
+    return res
+
+
+def _decoded(result):
+    if type(result) is tuple and type(result[0]) is tuple:
+        return tuple(map(_decode, result))
+    return _decode(result)
+
+
+def _map(name, jobs, workers, chunk_size, executor):
+    jobs = list(jobs)
+    operation = _OPERATIONS[name]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if executor is None and (workers <= 1 or len(jobs) < SERIAL_LIMIT):
+        return [operation(a, b) for a, b in jobs]
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(jobs) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [[(_encode(a), _encode(b)) for a, b in jobs[i:i + chunk_size]]
+              for i in range(0, len(jobs), chunk_size)]
+    if executor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_run_chunk, [name] * len(chunks), chunks))
+    else:
+        results = list(executor.map(_run_chunk, [name] * len(chunks), chunks))
+    return [_decoded(result) for chunk in results for result in chunk]
+
+
+def map_mul(pairs, workers=None, chunk_size=None, executor=None):
+    """Return the list of the products f * g for the pairs (f, g)."""
+    return _map('mul', pairs, workers, chunk_size, executor)
+
+
+def map_divmod(pairs, workers=None, chunk_size=None, executor=None):
+    """Return the list of (quotient, remainder) of f by g for the pairs (f, g)."""
+    return _map('divmod', pairs, workers, chunk_size, executor)
+
+
+def map_gcd(pairs, workers=None, chunk_size=None, executor=None):
+    """Return the list of gcd(f, g) for the pairs (f, g)."""
+    return _map('gcd', pairs, workers, chunk_size, executor)
+
+
+def map_eval(pairs, workers=None, chunk_size=None, executor=None):
+    """Return the list of the values f(x) for the pairs (f, x)."""
+    return _map('eval', pairs, workers, chunk_size, executor)
@@ -0,0 +1,207 @@
+"""Benchmarks of the core operations of the package.
+
+Usage:
+    python benchmark.py [--quick] [-k SUBSTRING] [--json FILE]
+    python benchmark.py --save-baseline [FILE]
+    python benchmark.py --compare [FILE] [--threshold 0.25]
+
+Every case is named operation/base class/size and reports the best time of
+one call in seconds. --compare exits with status 1, if some case is slower
+than in the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from algorithms import gcd
+from integer_residues import FiveElementsField, PrimeField
+from polynomials import Polynomials
+from rationals import Rationals, RationalArray
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'baseline.json')
+# Sizes of the quick run.
+QUICK_LIMIT = 1000
+# Every case is repeated until it took at least MIN_TIME seconds.
+MIN_TIME = 0.2
+
+NTT_FIELD = PrimeField(998244353)
+
+
+def _random_element(cls, rng):
+    if cls is Rationals:
+        return Rationals(rng.randint(-1000, 1000), rng.randint(1, 1000))
+    if cls is float:
+        return rng.uniform(-1, 1)
+    return cls(rng.randint(-1000, 1000))
+
+
+def _nonzero_element(cls, rng):
+    x = _random_element(cls, rng)
+    while x == 0:
+        x = _random_element(cls, rng)
+    return x
+
+
+def _random_polynomial(cls, n, rng):
+    """Return a random polynomial of degree n - 1 over cls."""
+    return Polynomials([_random_element(cls, rng) for _ in range(n - 1)] + [cls(1)], cls)
+
+
+def _cases():
+    """Generate (name, size, setup), where setup() returns the function to
+    time.
+    """
+    def binary(operation, cls, n):
+        def setup():
+            rng = random.Random(n)
+            a, b = _random_polynomial(cls, n, rng), _random_polynomial(cls, n, rng)
+            return lambda: operation(a, b)
+        return setup
+
+    def division(cls, n):
+        def setup():
+            rng = random.Random(n)
+            a, b = _random_polynomial(cls, 2 * n, rng), _random_polynomial(cls, n, rng)
+            return lambda: (a // b, a % b)
+        return setup
+
+    def unary(operation, cls, n, argument=None):
+        def setup():
+            rng = random.Random(n)
+            a = _random_polynomial(cls, n, rng)
+            x = _random_element(cls, rng) if argument is None else argument
+            return lambda: operation(a, x)
+        return setup
+
+    def scalars(operation, cls, n):
+        def setup():
+            rng = random.Random(n)
+            xs = [_random_element(cls, rng) for _ in range(n)]
+            ys = [_nonzero_element(cls, rng) for _ in range(n)]
+            return lambda: [operation(x, y) for x, y in zip(xs, ys)]
+        return setup
+
+    def arrays(operation, n):
+        def setup():
+            rng = random.Random(n)
+            xs = RationalArray([_random_element(Rationals, rng) for _ in range(n)])
+            ys = RationalArray([_random_element(Rationals, rng) for _ in range(n)])
+            return lambda: operation(xs, ys)
+        return setup
+
+    sizes = [10, 100, 1000, 10 ** 4, 10 ** 5]
+    # The largest sizes, which take at most a few seconds per call.
+    limits = {int: 10 ** 4, float: 10 ** 4, Rationals: 1000, FiveElementsField: 10 ** 5, NTT_FIELD: 10 ** 5}
+    for cls, limit in limits.items():
+        for n in sizes:
+            if n <= limit:
+                yield f"mul/{cls.__name__}/{n}", n, binary(lambda a, b: a * b, cls, n)
+    for cls in (Rationals, FiveElementsField, NTT_FIELD):
+        for n in sizes:
+            if n <= limits[cls] // 10:
+                yield f"divmod/{cls.__name__}/{n}", n, division(cls, n)
+                yield f"gcd/{cls.__name__}/{n}", n, binary(gcd, cls, n)
+    for cls in (int, Rationals, FiveElementsField):
+        for n in sizes[:3]:
+            yield f"call/{cls.__name__}/{n}", n, unary(lambda a, x: a(x), cls, n)
+            yield f"str/{cls.__name__}/{n}", n, unary(lambda a, x: str(a), cls, n)
+    for cls in (Rationals, FiveElementsField, NTT_FIELD):
+        for n in sizes[2:]:
+            yield f"scalar_add/{cls.__name__}/{n}", n, scalars(lambda x, y: x + y, cls, n)
+            yield f"scalar_mul/{cls.__name__}/{n}", n, scalars(lambda x, y: x * y, cls, n)
+            yield f"scalar_div/{cls.__name__}/{n}", n, scalars(lambda x, y: x / y, cls, n)
+    for n in sizes[2:]:
+        yield f"array_add/RationalArray/{n}", n, arrays(lambda xs, ys: xs + ys, n)
+        yield f"array_mul/RationalArray/{n}", n, arrays(lambda xs, ys: xs * ys, n)
+
+
+def measure(function, min_time=MIN_TIME):
+    """Return the best time of one call of function, which is called
+    at least once and repeatedly for at least min_time seconds.
+    """
+    best = None
+    total = 0.0
+    while best is None or total < min_time:
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(quick=False, pattern=None, min_time=MIN_TIME, log=None):
+    """Run the cases and return the dict {name: seconds}."""
+    results = {}
+    for name, size, setup in _cases():
+        if quick and size > QUICK_LIMIT or pattern and pattern not in name:
+            continue
+        results[name] = measure(setup(), min_time)
+        if log:
+            log(f"{name:40} {results[name]:.3e} s")
+    return results
+
+
+def report(results):
+    """Return the JSON document with the results and the environment."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return the list of (name, old, new, ratio) of the cases, which are
+    slower than in the baseline by more than threshold (0.25 is 25%).
+    """
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old and new / old > 1 + threshold:
+            regressions.append((name, old, new, new / old))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the core operations.")
+    parser.add_argument('--quick', action='store_true', help=f"only sizes up to {QUICK_LIMIT}")
+    parser.add_argument('-k', dest='pattern', help="only cases, whose name contains PATTERN")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="seconds to repeat every case")
+    parser.add_argument('--json', dest='output', help="write the results to the file")
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE, help="write the results as the baseline")
+    parser.add_argument('--compare', nargs='?', const=BASELINE, help="compare with the baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="relative slowdown to flag")
+    args = parser.parse_args(argv)
+
+    results = run(args.quick, args.pattern, args.min_time, log=lambda line: print(line, file=sys.stderr))
+    document = report(results)
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as file:
+                json.dump(document, file, indent=2, sort_keys=True)
+                file.write('\n')
+    if not args.output and not args.save_baseline:
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        print()
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {old:.3e} s -> {new:.3e} s ({ratio:.2f}x)", file=sys.stderr)
+        missing = sorted(set(results) - set(baseline))
+        if missing:
+            print(f"not in the baseline: {', '.join(missing)}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
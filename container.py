@@ -0,0 +1,100 @@
+"""A file format for many polynomials with random access.
+
+    container.write(path, polynomials)
+    with container.Container(path) as stored:
+        f = stored[12345]
+
+Layout, all integers little-endian:
+    MAGIC (4 bytes), VERSION (1 byte), the number n of polynomials (8 bytes),
+    the offset index: n + 1 offsets (8 bytes each) of the records, counted
+        from the end of the index; record i ends where record i + 1 starts,
+    the records, written by Polynomials.to_bytes().
+
+Container maps the file with mmap, so opening it reads nothing, and
+reading a polynomial decodes only its record.
+"""
+import mmap
+import struct
+
+from polynomials import Polynomials
+
+MAGIC = b'POLY'
+VERSION = 1
+_HEADER = struct.Struct('<4sBQ')
+_OFFSET = struct.Struct('<Q')
+
+
+def write(path, polynomials):
+    """Write the polynomials to a new container file path."""
+    records = [f.to_bytes() for f in polynomials]
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(records)))
+        file.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        for record in records:
+            file.write(record)
+
+
+class Container:
+    """Read-only sequence of the polynomials of a container file. It's a
+    context manager, which closes the file.
+    """
+    _error_format = ValueError(
+        "the file is not a polynomial container"
+    )
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped.
+            self._file.close()
+            raise self._error_format
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise self._error_format
+        magic, version, n = _HEADER.unpack_from(self._map)
+        self._data = _HEADER.size + (n + 1) * _OFFSET.size
+        if magic != MAGIC or version != VERSION or len(self._map) < self._data:
+            self.close()
+            raise self._error_format
+        self._len = n
+
+    def __len__(self):
+        return self._len
+
+    def _record(self, i):
+        """Return the memoryview of the bytes of record i."""
+        start, end = struct.unpack_from('<2Q', self._map, _HEADER.size + i * _OFFSET.size)
+        return memoryview(self._map)[self._data + start:self._data + end]
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("Container index out of range")
+        record = self._record(index)
+        try:
+            return Polynomials.from_bytes(record)
+        finally:
+            record.release()
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self[i]
+
+    def close(self):
+        if hasattr(self, '_map'):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
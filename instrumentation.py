@@ -0,0 +1,179 @@
+"""Opt-in counters of the work done by the package.
+
+    with instrumentation.record() as counters:
+        f * g
+    print(counters['mul'], counters['path:_karatsuba'])
+
+While a record() block is open, functions and methods of the package are
+replaced by counting wrappers, which are removed when the last block is
+closed, so there is no cost at all outside of record() blocks. The keys of
+the counters are:
+
+mul, add, div -- multiplications, additions (and subtractions) of
+    coefficients in mul_lists, mul_low, add_lists and sub_lists and their
+    helpers; the number theoretic and Kronecker products do none.
+path:<function> -- calls of the function, which implements an algorithm,
+    e.g. path:_karatsuba, path:_ntt_convolution, path:_half_gcd, and
+    path:mul_low, path:_mullow of the truncated products.
+alloc:<class> -- created instances of Polynomials, Rationals and elements
+    of prime fields (interned elements are not created).
+deepcopy -- calls of copy.deepcopy.
+coercion, coercion:miss -- calls of get_largest_abelian_group, and the
+    ones which were not memoized.
+calls:Polynomials.<method>[<base class>], time:... -- calls of the methods
+    of Polynomials and their inclusive wall time in seconds.
+
+Recording is not thread-safe: the wrappers are seen by all threads.
+"""
+import copy
+import functools
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import algorithms
+import polynomials
+import sparse
+from integer_residues import ResidueArray, ResidueField
+from polynomials import Polynomials
+from rationals import Rationals
+
+# The Counters of the open record() blocks.
+_active = []
+# (owner, name, original) for every patched attribute.
+_patched = []
+
+_PATHS = {
+    algorithms: ['mul_lists', 'mul_low', '_karatsuba', '_toom3', '_unbalanced', 'mul_lists_mod', '_kronecker_mul',
+                 '_ntt_convolution', 'divmod_lists'],
+    polynomials: ['_half_gcd', '_modular_gcd', '_subproduct_tree'],
+}
+_TIMED_METHODS = [
+    '__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__', '__neg__', '__eq__',
+    '__floordiv__', '__mod__', '__call__', '__str__', '__repr__', '__hash__',
+    'euclidean_division', '_newton_division', 'pseudo_divmod', 'gcd', 'xgcd', 'content', 'primitive_part',
+    'subresultant_prs', 'derivative', 'shift', 'to_monic', 'evaluate_many', 'evaluate_array', 'terms',
+]
+
+
+def _count(key, n=1):
+    for counters in _active:
+        counters[key] += n
+
+
+def _patch(owner, name, wrapper):
+    """Replace the attribute name of owner (a module or a class) by
+    wrapper(original function), keeping staticmethod and classmethod.
+    """
+    original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+    _patched.append((owner, name, original))
+    if isinstance(original, (staticmethod, classmethod)):
+        setattr(owner, name, type(original)(wrapper(original.__func__)))
+    else:
+        setattr(owner, name, wrapper(original))
+
+
+def _counting(key, amount=None):
+    """Return a wrapper, which adds amount(*args) (or 1) to key per call."""
+    def wrapper(function):
+        @functools.wraps(function)
+        def counted(*args, **kwargs):
+            _count(key, 1 if amount is None else amount(*args))
+            return function(*args, **kwargs)
+        return counted
+    return wrapper
+
+
+def _schoolbook_counter(function):
+    @functools.wraps(function)
+    def counted(ls1, ls2, n):
+        _count('mul', len(ls1) * len(ls2))
+        _count('add', len(ls1) * len(ls2))
+        return function(ls1, ls2, n)
+    return counted
+
+
+def _schoolbook_low_counter(function):
+    @functools.wraps(function)
+    def counted(ls1, ls2, n):
+        products = sum(min(len(ls2), n - i) for i in range(min(len(ls1), n)))
+        _count('mul', products)
+        _count('add', products)
+        return function(ls1, ls2, n)
+    return counted
+
+
+def _timing(name):
+    def wrapper(function):
+        @functools.wraps(function)
+        def timed(self, *args, **kwargs):
+            key = f"Polynomials.{name}[{self._base_cls.__name__}]"
+            _count('calls:' + key)
+            start = time.perf_counter()
+            try:
+                return function(self, *args, **kwargs)
+            finally:
+                _count('time:' + key, time.perf_counter() - start)
+        return timed
+    return wrapper
+
+
+def _install():
+    shorter = lambda ls1, ls2, *args: min(len(ls1), len(ls2))
+    _patch(algorithms, '_schoolbook', _schoolbook_counter)
+    _patch(algorithms, '_schoolbook_low', _schoolbook_low_counter)
+    for name in ('_add_into', '_sub_into'):
+        _patch(algorithms, name, _counting('add', lambda res, offset, ls: len(ls)))
+    for name in ('_sum', '_diff'):
+        _patch(algorithms, name, _counting('add', shorter))
+    _patch(algorithms, '_divide_exact', _counting('div'))
+    # sub_lists adds by add_lists.
+    _patch(algorithms, 'add_lists', _counting('add', shorter))
+    for module, names in _PATHS.items():
+        for name in names:
+            _patch(module, name, _counting('path:' + name))
+    _patch(Polynomials, '_mullow', _counting('path:_mullow'))
+    _patch(algorithms, 'get_largest_abelian_group', _counting('coercion'))
+    _patch(algorithms, '_coerce', _counting('coercion:miss'))
+    _patch(copy, 'deepcopy', _counting('deepcopy'))
+    for cls, name in [(Rationals, '__init__'), (Rationals, '_make'), (ResidueField, '_make'),
+                      (Polynomials, '__init__'), (Polynomials, '_from_coeffs'),
+                      (Polynomials, '_from_residues'), (Polynomials, '_from_terms')]:
+        key = 'alloc:' + ('ResidueField' if cls is ResidueField else cls.__name__)
+        _patch(cls, name, _counting(key))
+    # The operators of Polynomials hold the list functions, so they are
+    # built again from the counting ones.
+    for names, operators in [(('__add__', '__radd__'), ('add_lists', ResidueArray.add, sparse.add_terms)),
+                             (('__sub__', '__rsub__'), ('sub_lists', ResidueArray.sub, sparse.sub_terms)),
+                             (('__mul__', '__rmul__'), ('mul_lists', ResidueArray.mul, sparse.mul_terms))]:
+        name, packed_operator, sparse_operator = operators
+        rebuilt = Polynomials._operator_factory(getattr(algorithms, name), packed_operator,
+                                                _counting('path:sparse.' + sparse_operator.__name__)(sparse_operator))
+        for method, function in zip(names, rebuilt):
+            _patch(Polynomials, method, lambda original, function=function: function)
+    for name in _TIMED_METHODS:
+        _patch(Polynomials, name, _timing(name))
+
+
+def _uninstall():
+    while _patched:
+        owner, name, original = _patched.pop()
+        setattr(owner, name, original)
+
+
+@contextmanager
+def record():
+    """Count the work done inside the block in the returned Counter. The
+    blocks may be nested, then the work is counted in all of them.
+    """
+    counters = Counter()
+    if not _active:
+        _install()
+    _active.append(counters)
+    try:
+        yield counters
+    finally:
+        # Counters compare by value, so the block's one is found by identity.
+        del _active[next(i for i, c in enumerate(_active) if c is counters)]
+        if not _active:
+            _uninstall()
@@ -1,155 +1,369 @@
 import operator
+from array import array
+from itertools import repeat
 
 from abstract_structures import Field
+import algorithms
 
+# Fields with at most _INTERN_LIMIT elements keep one instance per residue,
+# fields with at most _TABLE_LIMIT elements also keep tables of the results
+# of +, - and *, so that arithmetic does not allocate.
+_INTERN_LIMIT = 1 << 16
+_TABLE_LIMIT = 256
 
-class ThreeElementsField(Field):
-    """Residue class field Z / 3Z. Inherits Field.
-    Implements __repr__ and __str__.
+# Names of the fields, which existed before PrimeField.
+_FIELD_NAMES = {3: "ThreeElementsField", 5: "FiveElementsField"}
+_fields = {}
+
+
+class ResidueField(Field):
+    """Base class of the residue class fields Z / pZ created by PrimeField(p).
+    Implements __repr__, __str__ and __int__.
+
+    Elements are immutable. If the field is small, they are interned:
+    PrimeField(p)(a) is PrimeField(p)(a + p).
     """
-    _init_exc = ValueError("ThreeElementsField() argument must be an int or an instance of ThreeElementsField")
+    __slots__ = ('_value',)
+    _prime = None
+    _init_exc = None
     _zero_exc = ZeroDivisionError("can't divide by zero")
-    _prime = 3
-
-    def __init__(self, num):
+    # _elements[a] is the interned element with _value a.
+    _elements = None
+    # _add_table[a][b] is the element a + b, the same for - and *.
+    _add_table = None
+    _sub_table = None
+    _mul_table = None
+    # _inverses[a] is the int inverse of a modulo p, for a != 0.
+    _inverses = None
+
+    def __new__(cls, num):
         """Initialization is allowed only from an int or an instance of the class."""
 
-        # _value is always the unique residue in segment [0, 2].
+        # _value is always the unique residue in segment [0, p - 1].
         if type(num) is int:
-            self._value = num % ThreeElementsField._prime
-        elif isinstance(num, ThreeElementsField):
-            self._value = num._value
+            value = num % cls._prime
+        elif type(num) is cls:
+            return num
         else:
-            raise ThreeElementsField._init_exc
+            raise cls._init_exc
+        if cls._elements is not None:
+            return cls._elements[value]
+        return cls._make(value)
+
+    def __init__(self, num):
+        # Everything is done by __new__, since elements may be interned.
+        pass
+
+    @classmethod
+    def _make(cls, value: int):
+        """Return a new element with _value value, which must be reduced."""
+        self = object.__new__(cls)
+        self._value = value
+        return self
+
+    @classmethod
+    def _inverse(cls, value: int):
+        """Return the inverse of the residue value as an int."""
+        if value == 0:
+            raise cls._zero_exc
+        if cls._inverses is not None:
+            return cls._inverses[value]
+        return pow(value, -1, cls._prime)
 
     @staticmethod
-    def _operator_factory(int_operator):
+    def _operator_factory(int_operator, table_name):
         """Construct functions, to assign to methods of arithmetic operations __#__, __r#__.
 
         Arguments:
         int_operator -- an operator for ints. It's applied to _value.
+        table_name -- the name of the table of results of the operator,
+            which is used instead of int_operator if the field has it.
         """
 
         def forward(a, b):
             """a # b"""
+            cls = type(a)
             if type(b) is int:
-                return ThreeElementsField(int_operator(a._value, b))
-            if isinstance(b, ThreeElementsField):
-                return ThreeElementsField(int_operator(a._value, b._value))
-            return NotImplemented
+                b = b % cls._prime
+            elif type(b) is cls:
+                b = b._value
+            else:
+                return NotImplemented
+            table = getattr(cls, table_name)
+            if table is not None:
+                return table[a._value][b]
+            return cls(int_operator(a._value, b))
 
         def reverse(b, a):
             """a # b"""
+            cls = type(b)
             if type(a) is int:
-                return ThreeElementsField(int_operator(a, b._value))
-            if isinstance(a, ThreeElementsField):
-                return ThreeElementsField(int_operator(a._value, b._value))
-            return NotImplemented
+                a = a % cls._prime
+            else:
+                return NotImplemented
+            table = getattr(cls, table_name)
+            if table is not None:
+                return table[a][b._value]
+            return cls(int_operator(a, b._value))
 
         return forward, reverse
 
-    __add__, __radd__ = _operator_factory(operator.add)
+    __add__, __radd__ = _operator_factory(operator.add, '_add_table')
+    __sub__, __rsub__ = _operator_factory(operator.sub, '_sub_table')
+    __mul__, __rmul__ = _operator_factory(operator.mul, '_mul_table')
 
     def __neg__(self):
-        return ThreeElementsField(-self._value)
+        return type(self)(-self._value)
+
+    def __truediv__(self, other):
+        cls = type(self)
+        if type(other) is int:
+            other = other % cls._prime
+        elif type(other) is cls:
+            other = other._value
+        else:
+            return NotImplemented
+        return self * cls._inverse(other)
 
-    __sub__, __rsub__ = _operator_factory(operator.sub)
+    def __rtruediv__(self, other):
+        if type(other) is not int:
+            return NotImplemented
+        cls = type(self)
+        return cls(other) * cls._inverse(self._value)
 
     def __eq__(self, other):
         if type(other) is int:
-            return self._value == (other % ThreeElementsField._prime)
-        if isinstance(other, ThreeElementsField):
+            return self._value == other % self._prime
+        if type(other) is type(self):
             return self._value == other._value
         return NotImplemented
 
-    __mul__, __rmul__ = _operator_factory(operator.mul)
-
-    @staticmethod
-    def _truediv(a: int, b: int):
-        if b % ThreeElementsField._prime == 0:
-            raise ThreeElementsField._zero_exc
-        return a * b
-
-    __truediv__, __rtruediv__ = _operator_factory(_truediv)
+    def __hash__(self):
+        return hash(self._value)
 
     def __repr__(self):
-        return f"ThreeElementsField({self._value})"
+        return f"{type(self).__name__}({self._value})"
 
     def __str__(self):
         return '_' + str(self._value) + '_'
 
+    def __int__(self):
+        return self._value
+
+    def __copy__(self):
+        return self
 
-class FiveElementsField(Field):
-    """Residue class field Z / 5Z. Inherits Field.
-    Implements __repr__ and __str__.
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return type(self), (self._value,)
+
+
+def PrimeField(p: int):
+    """Return the residue class field Z / pZ for a prime p, a subclass of
+    ResidueField. The class is created once for every p, so
+    PrimeField(p) is PrimeField(p).
     """
-    _init_exc = ValueError("FiveElementsField() argument must be an int or an instance of FiveElementsField")
-    _zero_exc = ZeroDivisionError("can't divide by zero")
-    _prime = 5
+    # 2.0 == 2, so the type is checked before the lookup.
+    if type(p) is int and p in _fields:
+        return _fields[p]
+    if type(p) is not int or not algorithms.is_prime(p):
+        raise ValueError("PrimeField() argument must be a prime int")
+    name = _FIELD_NAMES.get(p, f"PrimeField{p}")
+    cls = type(name, (ResidueField,), {
+        '__slots__': (),
+        '__module__': __name__,
+        '__doc__': f"Residue class field Z / {p}Z. Inherits ResidueField.",
+        '_prime': p,
+        '_init_exc': ValueError(f"{name}() argument must be an int or an instance of {name}"),
+    })
+    if p <= _INTERN_LIMIT:
+        elements = [cls._make(a) for a in range(p)]
+        cls._elements = elements
+        if p <= _TABLE_LIMIT:
+            cls._add_table = [[elements[(a + b) % p] for b in range(p)] for a in range(p)]
+            cls._sub_table = [[elements[(a - b) % p] for b in range(p)] for a in range(p)]
+            cls._mul_table = [[elements[a * b % p] for b in range(p)] for a in range(p)]
+            cls._inverses = [0] + [pow(a, -1, p) for a in range(1, p)]
+    algorithms.register_embedding(int, cls)
+    _fields[p] = cls
+    return cls
+
+
+def __getattr__(name):
+    """Resolve the names PrimeField<p> of the classes PrimeField(p),
+    e.g. when they are unpickled.
+    """
+    if name.startswith('PrimeField') and name[len('PrimeField'):].isdigit():
+        return PrimeField(int(name[len('PrimeField'):]))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def __init__(self, num):
-        """Initialization is allowed only from an int or an instance of the class."""
 
-        # _value is always the unique residue in segment [0, 4].
-        if type(num) is int:
-            self._value = num % FiveElementsField._prime
-        elif type(num) is FiveElementsField:
-            self._value = num._value
-        else:
-            raise FiveElementsField._init_exc
+def _typecode(p: int):
+    """Return the smallest array typecode holding residues modulo p, or
+    None if p is too large for an array.
+    """
+    for code in 'BHIQ':
+        if p <= 1 << (8 * array(code).itemsize):
+            return code
+    return None
 
-    @staticmethod
-    def _operator_factory(int_operator):
-        """Construct functions, to assign to methods of arithmetic operations __#__, __r#__.
 
-        Arguments:
-        int_operator -- an operator for ints. It's applied to _value.
+class ResidueArray:
+    """Immutable sequence of elements of a field PrimeField(p), stored as
+    residues packed in an array.array (or in a list of ints for p >= 2^64).
+    Indexing returns elements of the field, slicing returns a ResidueArray.
+
+    Methods add, sub, neg, scale, and mul treat the sequence as the
+    coefficients of a polynomial and work on the whole buffer at once,
+    with a single reduction modulo p per element.
+    """
+    __slots__ = ('_field', '_data')
+
+    def __init__(self, field, values=()):
+        """Arguments:
+        field -- a subclass of ResidueField.
+        values -- an iterable of ints, which are reduced modulo p.
         """
-        def forward(a, b):
-            """a # b"""
-            if type(b) is int:
-                return FiveElementsField(int_operator(a._value, b))
-            if type(b) is FiveElementsField:
-                return FiveElementsField(int_operator(a._value, b._value))
-            return NotImplemented
+        if not (isinstance(field, type) and issubclass(field, ResidueField)):
+            raise TypeError("the field of ResidueArray must be a subclass of ResidueField")
+        self._field = field
+        self._data = self._new_data(field, map(operator.mod, values, repeat(field._prime)))
 
-        def reverse(b, a):
-            """a # b"""
-            if type(a) is int:
-                return FiveElementsField(int_operator(a, b._value))
-            if type(a) is FiveElementsField:
-                return FiveElementsField(int_operator(a._value, b._value))
-            return NotImplemented
+    @staticmethod
+    def _new_data(field, residues):
+        code = _typecode(field._prime)
+        if code is None:
+            return list(residues)
+        return array(code, residues)
+
+    @classmethod
+    def _make(cls, field, data):
+        """Return a ResidueArray with the buffer data of reduced residues,
+        which must be of the type chosen by _new_data.
+        """
+        self = object.__new__(cls)
+        self._field = field
+        self._data = data
+        return self
 
-        return forward, reverse
+    @property
+    def field(self):
+        return self._field
 
-    __add__, __radd__ = _operator_factory(operator.add)
-    __mul__, __rmul__ = _operator_factory(operator.mul)
-    __sub__, __rsub__ = _operator_factory(operator.sub)
+    @property
+    def residues(self):
+        """The buffer of residues. It must not be modified."""
+        return self._data
 
-    def __neg__(self):
-        return FiveElementsField(-self._value)
+    def __len__(self):
+        return len(self._data)
 
-    @staticmethod
-    def _truediv(a: int, b: int):
-        if b % FiveElementsField._prime == 0:
-            raise FiveElementsField._zero_exc
-        return a * (b ** 3)
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return self._make(self._field, self._data[index])
+        return self._field(self._data[index])
 
-    __truediv__, __rtruediv__ = _operator_factory(_truediv)
+    def __iter__(self):
+        return map(self._field, self._data)
 
     def __eq__(self, other):
-        if type(other) is int:
-            return self._value == other % FiveElementsField._prime
-        elif type(other) is FiveElementsField:
-            return self._value == other._value
+        if type(other) is ResidueArray:
+            return self._field is other._field and self._data == other._data
+        if type(other) in (list, tuple):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
         return NotImplemented
 
     def __repr__(self):
-        return f"FiveElementsField({self._value})"
-
-    def __str__(self):
-        return '_' + str(self._value) + '_'
-
-    def __int__(self):
-        return self._value
+        return f"ResidueArray({self._field.__name__}, {list(self._data)})"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def strip(self):
+        """Return the array without zeros at the end."""
+        data = self._data
+        n = len(data)
+        while n and data[n - 1] == 0:
+            n -= 1
+        if n == len(data):
+            return self
+        return self._make(self._field, data[:n])
+
+    def _zip_operator(self, other, int_operator):
+        """Apply int_operator element-wise, the shorter array is completed
+        with zeroes.
+        """
+        p = self._field._prime
+        a, b = self._data, other._data
+        common = min(len(a), len(b))
+        res = self._new_data(self._field, map(operator.mod, map(int_operator, a, b), repeat(p)))
+        if len(a) > common:
+            res.extend(a[common:])
+        elif len(b) > common:
+            res.extend(map(operator.mod, map(int_operator, repeat(0), b[common:]), repeat(p)))
+        return self._make(self._field, res)
+
+    def add(self, other):
+        """Return the element-wise sum."""
+        return self._zip_operator(other, operator.add)
+
+    def sub(self, other):
+        """Return the element-wise difference."""
+        return self._zip_operator(other, operator.sub)
+
+    def neg(self):
+        return self.scale(-1)
+
+    def scale(self, c):
+        """Return the array multiplied by an int or an element c."""
+        p = self._field._prime
+        c = int(c) % p
+        data = self._data
+        if type(data) is array and data.typecode == 'B':
+            # Multiplication by c is a permutation of bytes.
+            table = bytes(c * i % p if i < p else 0 for i in range(256))
+            return self._make(self._field, array('B', data.tobytes().translate(table)))
+        res = map(operator.mod, map(operator.mul, data, repeat(c)), repeat(p))
+        return self._make(self._field, self._new_data(self._field, res))
+
+    def mul(self, other):
+        """Return the coefficients of the product of polynomials with
+        coefficients self and other.
+        """
+        if len(other) == 1:
+            return self.scale(other._data[0])
+        if len(self) == 1:
+            return other.scale(self._data[0])
+        data = algorithms.mul_lists_mod(list(self._data), list(other._data), self._field._prime)
+        return self._make(self._field, self._new_data(self._field, data))
+
+    def divmod(self, other):
+        """Return the coefficients of the quotient and the remainder of the
+        division of polynomials with coefficients self and other. The last
+        element of other must be nonzero.
+        """
+        p = self._field._prime
+        n = len(other) - 1
+        remainder = list(self._data)
+        if len(remainder) <= n:
+            return self._make(self._field, self._new_data(self._field, ())), self
+        inverse = self._field._inverse(other._data[-1])
+        low = list(other._data[:n])
+        quotient = [0] * (len(remainder) - n)
+        for i in range(len(quotient) - 1, -1, -1):
+            c = remainder[i + n] * inverse % p
+            quotient[i] = c
+            if c:
+                remainder[i:i + n] = map(operator.sub, remainder[i:i + n], map(operator.mul, low, repeat(c)))
+        quotient = self._new_data(self._field, quotient)
+        remainder = self._new_data(self._field, map(operator.mod, remainder[:n], repeat(p)))
+        return self._make(self._field, quotient), self._make(self._field, remainder)
+
+
+ThreeElementsField = PrimeField(3)
+FiveElementsField = PrimeField(5)
@@ -0,0 +1,393 @@
+from abstract_structures import Ring
+from polynomials import Polynomials
+import algorithms
+import sparse
+
+# Every exponent takes EXPONENT_BITS bits of a packed monomial, so the
+# total degree of a polynomial must be less than 2^EXPONENT_BITS.
+EXPONENT_BITS = 32
+ORDERS = ('lex', 'grlex', 'grevlex')
+
+
+def _pack(exps):
+    """Return the monomial with exponents exps packed into an int: the total
+    degree in the highest field, then exps[0], ..., exps[-1]. Products of
+    monomials are sums of the packed ints, which compare by grlex.
+    """
+    key = sum(exps)
+    for e in exps:
+        key = (key << EXPONENT_BITS) | e
+    return key
+
+
+def _unpack(key, nvars):
+    mask = (1 << EXPONENT_BITS) - 1
+    exps = []
+    for _ in range(nvars):
+        exps.append(key & mask)
+        key >>= EXPONENT_BITS
+    return tuple(reversed(exps))
+
+
+class MultivariatePolynomials(Ring):
+    """The ring of polynomials over some Ring R in nvars variables
+    x0, ..., x(nvars - 1). Inherits Ring.
+    Implements __repr__, __str__ and __call__. Instances are immutable and
+    hashable.
+
+    The terms are stored in a dict from monomials packed into ints (see
+    _pack) to nonzero coefficients. The monomial order, one of ORDERS, only
+    decides the order of terms() and leading_term().
+
+    Methods:
+    variables(cls, nvars, order) -- return the polynomials x0, ..., x(nvars - 1).
+    degree() -- return the total degree (-1 for zero polynomials).
+    terms() -- return the pairs (exponents, coefficient) in decreasing order.
+    leading_term() -- return the largest pair (exponents, coefficient).
+    __call__(*values) -- return the value at a point.
+    substitute(values) -- replace some variables by scalars or polynomials.
+    from_polynomial(f, nvars, var, order), to_polynomial(var) -- convert
+        from and to univariate Polynomials.
+    """
+    __slots__ = ('_terms', '_base_cls', '_nvars', '_order', '_hash')
+    _init_error_base_class = TypeError(
+        "the base class of MultivariatePolynomials is not a subclass of Ring"
+    )
+    _init_error_terms = TypeError(
+        "the terms of MultivariatePolynomials must be a dict from tuples of "
+        "nvars non-negative ints to coefficients"
+    )
+    _init_error_order = ValueError(
+        "the monomial order must be one of " + ", ".join(ORDERS)
+    )
+    _operation_error_cast = TypeError(
+        "arithmetic operation between MultivariatePolynomials with unrelated "
+        "base classes or different numbers of variables"
+    )
+    _operation_error_degree = OverflowError(
+        f"the total degree of MultivariatePolynomials must be less than 2^{EXPONENT_BITS}"
+    )
+    _operation_error_univariate = ValueError(
+        "the polynomial depends on other variables"
+    )
+    _evaluation_error_values = ValueError(
+        "a value must be given for every variable"
+    )
+
+    def __init__(self, terms, cls, nvars=None, order='lex'):
+        """Arguments:
+        terms -- a dict from tuples of exponents to coefficients:
+            {(2, 0, 1): c} is the term c * x0^2 * x2.
+        cls -- the base class, a subclass of Ring.
+        nvars -- the number of variables. If None, it's the length of the
+            tuples of exponents.
+        order -- the monomial order, one of ORDERS.
+        """
+        if not issubclass(cls, Ring):
+            raise self._init_error_base_class
+        if order not in ORDERS:
+            raise self._init_error_order
+        if type(terms) is not dict:
+            raise self._init_error_terms
+        if nvars is None:
+            nvars = len(next(iter(terms))) if terms else 0
+        packed = {}
+        for exps, c in terms.items():
+            if type(exps) is not tuple or len(exps) != nvars \
+                    or any(type(e) is not int or e < 0 for e in exps):
+                raise self._init_error_terms
+            if sum(exps) >> EXPONENT_BITS:
+                raise self._operation_error_degree
+            try:
+                c = c if type(c) is cls else cls(c)
+            except (ValueError, TypeError):
+                raise self._init_error_base_class
+            key = _pack(exps)
+            c = packed[key] + c if key in packed else c
+            packed[key] = c
+        self._terms = {key: c for key, c in packed.items() if c != 0}
+        self._base_cls = cls
+        self._nvars = nvars
+        self._order = order
+
+    @staticmethod
+    def _make(terms, cls, nvars, order):
+        """Return a polynomial with the dict terms of packed monomials and
+        nonzero coefficients in cls, without checks.
+        """
+        res = MultivariatePolynomials.__new__(MultivariatePolynomials)
+        res._terms = terms
+        res._base_cls = cls
+        res._nvars = nvars
+        res._order = order
+        return res
+
+    @staticmethod
+    def variables(cls, nvars: int, order='lex'):
+        """Return the list of polynomials x0, ..., x(nvars - 1) over cls."""
+        res = []
+        for i in range(nvars):
+            exps = tuple(int(i == j) for j in range(nvars))
+            res.append(MultivariatePolynomials({exps: 1}, cls, nvars, order))
+        return res
+
+    @property
+    def nvars(self):
+        return self._nvars
+
+    @property
+    def order(self):
+        return self._order
+
+    def _sort_key(self, key):
+        """Return the key, by which packed monomials compare in the order."""
+        if self._order == 'grlex':
+            return key
+        if self._order == 'lex':
+            return key & ((1 << (EXPONENT_BITS * self._nvars)) - 1)
+        exps = _unpack(key, self._nvars)
+        return sum(exps), tuple(-e for e in reversed(exps))
+
+    def terms(self):
+        """Return the list of pairs (exponents, coefficient) in decreasing
+        monomial order.
+        """
+        keys = sorted(self._terms, key=self._sort_key, reverse=True)
+        return [(_unpack(key, self._nvars), self._terms[key]) for key in keys]
+
+    def leading_term(self):
+        """Return the pair (exponents, coefficient) of the largest monomial,
+        or None for the zero polynomial.
+        """
+        if not self._terms:
+            return None
+        key = max(self._terms, key=self._sort_key)
+        return _unpack(key, self._nvars), self._terms[key]
+
+    def degree(self):
+        if not self._terms:
+            return -1
+        return max(self._terms) >> (EXPONENT_BITS * self._nvars)
+
+    def _operand(self, other):
+        """Return the dict of terms of other and the common base class, or
+        None if other is of an unknown type.
+        """
+        if type(other) is Polynomials and self._nvars == 1:
+            other = MultivariatePolynomials.from_polynomial(other, 1)
+        if type(other) is MultivariatePolynomials:
+            if other._nvars != self._nvars:
+                raise self._operation_error_cast
+            base_cls = algorithms.get_largest_abelian_group(self._base_cls, other._base_cls,
+                                                            self._operation_error_cast)
+            return other._cast(base_cls), base_cls
+        try:
+            base_cls = algorithms.get_largest_abelian_group(self._base_cls, type(other),
+                                                            self._operation_error_cast)
+            c = base_cls(other)
+        except (ValueError, TypeError):
+            return None
+        return ({0: c} if c != 0 else {}), base_cls
+
+    def _cast(self, cls):
+        """Return the dict of terms with coefficients cast to cls."""
+        if cls is self._base_cls:
+            return self._terms
+        return {key: cls(c) for key, c in self._terms.items()}
+
+    @staticmethod
+    def _operator_factory(terms_operator):
+        """Construct functions, to assign to methods of arithmetic operations __#__, __r#__.
+
+        Arguments:
+        terms_operator -- the operation on the dicts of terms, both with
+            coefficients in the common base class, and the number of variables.
+        """
+
+        def forward(a, b):
+            """a # b"""
+            operand = a._operand(b)
+            if operand is None:
+                return NotImplemented
+            terms, base_cls = operand
+            return MultivariatePolynomials._make(terms_operator(a._cast(base_cls), terms, a._nvars),
+                                                 base_cls, a._nvars, a._order)
+
+        def reverse(b, a):
+            """a # b"""
+            operand = b._operand(a)
+            if operand is None:
+                return NotImplemented
+            terms, base_cls = operand
+            return MultivariatePolynomials._make(terms_operator(terms, b._cast(base_cls), b._nvars),
+                                                 base_cls, b._nvars, b._order)
+
+        return forward, reverse
+
+    @staticmethod
+    def _add_terms(terms1, terms2, nvars):
+        res = dict(terms1)
+        for key, c in terms2.items():
+            if key in res:
+                c = res[key] + c
+                if c == 0:
+                    del res[key]
+                    continue
+            res[key] = c
+        return res
+
+    @staticmethod
+    def _sub_terms(terms1, terms2, nvars):
+        return MultivariatePolynomials._add_terms(terms1, {key: -c for key, c in terms2.items()}, nvars)
+
+    @staticmethod
+    def _mul_terms(terms1, terms2, nvars):
+        """Multiply by Johnson's heap algorithm on the sorted packed
+        monomials: their sums are the packed products.
+        """
+        shift = EXPONENT_BITS * nvars
+        # The largest packed monomials have the largest total degrees.
+        if terms1 and terms2 and ((max(terms1) >> shift) + (max(terms2) >> shift)) >> EXPONENT_BITS:
+            raise MultivariatePolynomials._operation_error_degree
+        return dict(sparse.mul_terms(sorted(terms1.items()), sorted(terms2.items())))
+
+    __add__, __radd__ = _operator_factory(_add_terms.__func__)
+    __sub__, __rsub__ = _operator_factory(_sub_terms.__func__)
+    __mul__, __rmul__ = _operator_factory(_mul_terms.__func__)
+
+    def __neg__(self):
+        return self._make({key: -c for key, c in self._terms.items()},
+                          self._base_cls, self._nvars, self._order)
+
+    def __eq__(self, other):
+        if type(other) is not MultivariatePolynomials:
+            if type(other) is Polynomials and self._nvars == 1:
+                return self == MultivariatePolynomials.from_polynomial(other, 1, order=self._order)
+            if not self._terms:
+                return other == 0
+            return len(self._terms) == 1 and 0 in self._terms and self._terms[0] == other
+        return self._nvars == other._nvars and self._base_cls == other._base_cls \
+            and self._terms == other._terms
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        """Constant polynomials hash as their coefficient, and polynomials
+        in one variable as the equal Polynomials, since they are equal to
+        them.
+        """
+        try:
+            return self._hash
+        except AttributeError:
+            pass
+        if not self._terms:
+            self._hash = hash(0)
+        elif len(self._terms) == 1 and 0 in self._terms:
+            self._hash = hash(self._terms[0])
+        elif self._nvars == 1:
+            # The hash of Polynomials.terms(), the key of X^e is _pack((e,)).
+            mask = (1 << EXPONENT_BITS) - 1
+            self._hash = hash(tuple(sorted((key & mask, c) for key, c in self._terms.items())))
+        else:
+            self._hash = hash(frozenset(self._terms.items()))
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        terms = ', '.join(f"{exps}: {c!r}" for exps, c in self.terms())
+        return f"MultivariatePolynomials({{{terms}}}, {self._base_cls.__name__}, " \
+               f"{self._nvars}, {self._order!r})"
+
+    def __str__(self):
+        if not self._terms:
+            return str(self._base_cls(0))
+        parts = []
+        for exps, c in self.terms():
+            monomial = '*'.join(f"x{i}^{e}" if e > 1 else f"x{i}" for i, e in enumerate(exps) if e)
+            if not monomial:
+                parts.append(str(c))
+            elif c == 1:
+                parts.append(monomial)
+            elif c == -1:
+                parts.append('-' + monomial)
+            else:
+                parts.append(f"{c}*{monomial}")
+        return ' + '.join(parts).replace('+ -', '- ')
+
+    def _powers(self, values):
+        """Return, for every variable with a value, a function giving the
+        powers of the value, which are computed once.
+        """
+        cache = [{} for _ in values]
+
+        def power(i, e):
+            if e not in cache[i]:
+                cache[i][e] = sparse.power(values[i], e)
+            return cache[i][e]
+
+        return power
+
+    def __call__(self, *values):
+        """Return the value at the point values, which has a value for
+        every variable.
+        """
+        if len(values) != self._nvars:
+            raise self._evaluation_error_values
+        power = self._powers(values)
+        res = self._base_cls(0)
+        for exps, c in self.terms():
+            for i, e in enumerate(exps):
+                if e:
+                    c = c * power(i, e)
+            res = res + c
+        return res
+
+    def substitute(self, values: dict):
+        """Return the polynomial, in which the variable x_i is replaced by
+        values[i] for every key i of the dict values. The values are scalars
+        or MultivariatePolynomials in the same variables.
+        """
+        if any(type(i) is not int or not 0 <= i < self._nvars for i in values):
+            raise self._evaluation_error_values
+        indices = sorted(values)
+        power = self._powers([values.get(i) for i in range(self._nvars)])
+        res = self._make({}, self._base_cls, self._nvars, self._order)
+        for exps, c in self.terms():
+            kept = tuple(0 if i in values else e for i, e in enumerate(exps))
+            term = self._make({_pack(kept): c}, self._base_cls, self._nvars, self._order)
+            for i in indices:
+                if exps[i]:
+                    term = term * power(i, exps[i])
+            res = res + term
+        return res
+
+    @staticmethod
+    def from_polynomial(f, nvars: int, var=0, order='lex'):
+        """Return the univariate polynomial f as a polynomial in the
+        variable x_var out of nvars.
+        """
+        if type(f) is not Polynomials:
+            raise MultivariatePolynomials._init_error_terms
+        if not 0 <= var < nvars:
+            raise MultivariatePolynomials._evaluation_error_values
+        terms = {}
+        for e, c in f.terms():
+            terms[_pack(tuple(e if i == var else 0 for i in range(nvars)))] = c
+        return MultivariatePolynomials._make(terms, f._base_cls, nvars, order)
+
+    def to_polynomial(self, var=0):
+        """Return the polynomial, which depends only on x_var, as a
+        univariate Polynomials.
+        """
+        terms = {}
+        for exps, c in self.terms():
+            if any(e for i, e in enumerate(exps) if i != var):
+                raise self._operation_error_univariate
+            terms[exps[var] if exps else 0] = c
+        return Polynomials.from_terms(terms, self._base_cls)
@@ -1,17 +1,51 @@
 import operator
+import random
 import re
-from copy import deepcopy
+import sys
+from array import array
+from itertools import chain, repeat
+from math import gcd, isqrt, lcm
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from abstract_structures import Ring, Field
-from integer_residues import FiveElementsField
+from integer_residues import ResidueField, ResidueArray, PrimeField
 from rationals import Rationals
 import algorithms
+import sparse
+from sparse import SparseArray
+
+# Above this degree of both the divisor and the quotient, euclidean_division
+# uses Newton iteration and fast multiplication. Packed coefficients over
+# prime fields have a much cheaper multiplication, hence a lower threshold.
+DIVISION_THRESHOLD = 1024
+PACKED_DIVISION_THRESHOLD = 128
+# With fewer points, evaluate_many uses Horner's scheme at every point and
+# interpolate uses Lagrange's formula. Both always do so over fields other
+# than Z / pZ: the subproduct tree is unstable over float and slower over
+# Rationals, whose coefficients grow along the tree.
+MULTIPOINT_THRESHOLD = 1024
+INTERPOLATION_THRESHOLD = 64
+# Over fields Z / pZ with p < ROOTS_TABLE_LIMIT, roots() evaluates at all
+# the elements.
+ROOTS_TABLE_LIMIT = 256
+# Coefficients of polynomials of length at least SPARSE_THRESHOLD, of which
+# less than SPARSE_DENSITY are nonzero, are stored sparse, see SparseArray.
+# Over Z / pZ, the results of operations on packed coefficients stay packed.
+SPARSE_THRESHOLD = 64
+SPARSE_DENSITY = 0.125
 
 
 class Polynomials(Ring):
     """The ring of polynomials over some Ring R. Inherits Ring.
     Implements __repr__, __str__, __floordiv__, __mod__,
-    and __call__.
+    and __call__. Polynomials are immutable and hashable.
+
+    Polynomials with few nonzero coefficients are stored sparse, see
+    SPARSE_THRESHOLD; the representation is switched automatically.
 
     Methods:
     degree() -- return the degree of a polynomial (-1 for zero polynomials).
@@ -22,9 +56,31 @@ class Polynomials(Ring):
     euclidean_division(divisor) -- for a polynomial with compatible base
         class, return the results of euclidean division of the instance by
         divisor: the integer quotient and the remainder.
+    gcd(other), xgcd(other) -- return the monic greatest common divisor
+        of the instance and other (and the Bezout cofactors).
+    factor() -- for polynomials over prime fields, return the leading
+        coefficient and the monic irreducible factors with multiplicities.
+    roots(), roots_many(polynomials) -- for polynomials over prime fields,
+        return the distinct roots.
+    pow(f, n, m) -- return f^n, or f^n mod m for a polynomial or a Modulus m.
+    pseudo_divmod(divisor) -- return the pseudo-quotient and the
+        pseudo-remainder, which need no division in the base class.
+    from_terms(terms, cls), terms() -- build a polynomial from a dict
+        {exponent: coefficient}, and return its nonzero terms.
+    to_bytes(), from_bytes(data) -- convert to and from a compact binary
+        format, see also the module container.
+    content(), primitive_part(), subresultant_prs(other) -- for
+        polynomials over int, the gcd of the coefficients, the polynomial
+        divided by it, and the subresultant remainder sequence.
+    derivative() -- return the formal derivative of a polynomial.
     __call__(x) -- return the value of a polynomial in x. x must be either
         cast to base class, or a polynomial over a class, compatible with
         the base class of the instance.
+    evaluate_many(points) -- return the list of values at many points.
+    evaluate_array(points) -- for polynomials over int or float, return
+        the values at an array of points.
+    interpolate(xs, ys, cls) -- return the polynomial over cls of degree
+        less than len(xs), which takes values ys at points xs.
     """
     _init_error_not_polynomial = TypeError(
         "the argument of Polynomials must be an instance of Polynomials"
@@ -48,18 +104,48 @@ class Polynomials(Ring):
         "to_monic(), //, and % can only be done for Polynomials with Field"
         "base classes"
     )
+    _operation_error_int = TypeError(
+        "content(), primitive_part() and subresultant_prs() can only be done"
+        " for Polynomials over int"
+    )
     _operation_error_type = TypeError(
         "arithmetic operation with unknown type"
     )
+    _operation_error_numeric = TypeError(
+        "evaluate_array() can only be done for Polynomials with int or float"
+        " base classes"
+    )
+    _interpolation_error_points = ValueError(
+        "the points of interpolate() must be distinct"
+    )
+    _operation_error_power = ValueError(
+        "the exponent of ** must be a nonnegative integer"
+    )
+    _operation_error_prime = TypeError(
+        "factor() and roots() can only be done for Polynomials over prime fields"
+    )
+    _roots_error_zero = ValueError(
+        "every element is a root of the zero polynomial"
+    )
+    _serialization_error_type = TypeError(
+        "to_bytes() can only be done for Polynomials over int, float,"
+        " Rationals or prime fields"
+    )
+    _serialization_error_data = ValueError(
+        "the data of from_bytes() is not a polynomial"
+    )
     _zero_error = ZeroDivisionError(
         "can't divide by zero"
     )
 
+    __slots__ = ('_coeffs', '_base_cls', '_hash')
+
     def __init__(self, values, cls=None):
         """If cls is None, values is a Polynomial, so a copy of values is
-        made. Otherwise, cls must be a subclass of Ring, and values must be a
-        list of elements of this Ring. So a polynomial f(X) over cls with
-        values coefficients is initialized.
+        made, which shares its coefficients. Otherwise, cls must be a
+        subclass of Ring, and values must be a list of elements of this
+        Ring. So a polynomial f(X) over cls with values coefficients is
+        initialized.
 
         Arguments:
         values -- a list of coefficients of f(X). values[i] is the
@@ -72,7 +158,8 @@ class Polynomials(Ring):
         if cls is None:
             if type(values) is not Polynomials:
                 raise self._init_error_not_polynomial
-            self._coeffs = deepcopy(values._coeffs)
+            # Polynomials are immutable, so nothing is copied.
+            self._coeffs = values._coeffs
             self._base_cls = values._base_cls
             return
         """
@@ -82,21 +169,163 @@ class Polynomials(Ring):
             raise self._init_error_base_class
         if type(values) is not list:
             raise self._init_error_not_list
-        _values = deepcopy(values)
-        for i in range(len(_values)):
-            try:
-                _values[i] = cls(_values[i])
-            except (ValueError, TypeError):
-                raise self._init_error_base_class
+        try:
+            # Elements of the Ring are immutable, so they are not copied.
+            _values = [c if type(c) is cls else cls(c) for c in values]
+        except (ValueError, TypeError):
+            raise self._init_error_base_class
+        self._coeffs = self._stored(_values, cls)
+        self._base_cls = cls
+
+    @staticmethod
+    def _stored(values, cls):
+        """Return the coefficients values, a list of elements of cls, in the
+        form stored in _coeffs: a tuple without zeros at the end, or a
+        SparseArray if few of them are nonzero. Dense coefficients in Z / pZ
+        are stored packed, see ResidueArray.
         """
-        Leading coefficient is not 0 so delete zeros from the end of array
+        n = len(values)
+        while n and values[n - 1] == 0:
+            n -= 1
+        values = tuple(values[:n])
+        if n >= SPARSE_THRESHOLD and n - values.count(0) < SPARSE_DENSITY * n:
+            return SparseArray([(e, c) for e, c in enumerate(values) if c != 0], cls(0))
+        if issubclass(cls, ResidueField):
+            return ResidueArray(cls, [int(c) for c in values])
+        return values
+
+    @staticmethod
+    def _from_terms(terms, cls):
+        """Return a polynomial over cls with the terms, a list of pairs
+        (exponent, coefficient) with increasing exponents and nonzero
+        coefficients in cls. It's stored dense, if it has many terms.
         """
-        _values = algorithms.del_extra_zeros(_values)
-        self._coeffs = deepcopy(_values)
-        self._base_cls = cls
+        length = terms[-1][0] + 1 if terms else 0
+        if length < SPARSE_THRESHOLD or len(terms) >= SPARSE_DENSITY * length:
+            values = [cls(0)] * length
+            for e, c in terms:
+                values[e] = c
+            return Polynomials._from_coeffs(values, cls)
+        res = Polynomials.__new__(Polynomials)
+        res._coeffs = SparseArray(terms, cls(0))
+        res._base_cls = cls
+        return res
+
+    @staticmethod
+    def from_terms(terms, cls):
+        """Return the polynomial over cls, which has the coefficient c at X^e
+        for every item e: c of the dict terms.
+        """
+        if not issubclass(cls, Ring):
+            raise Polynomials._init_error_base_class
+        try:
+            if any(type(e) is not int or e < 0 for e in terms):
+                raise Polynomials._init_error_not_list
+            items = sorted((e, c if type(c) is cls else cls(c)) for e, c in terms.items())
+        except AttributeError:
+            raise Polynomials._init_error_not_list
+        except (ValueError, TypeError):
+            raise Polynomials._init_error_base_class
+        return Polynomials._from_terms([(e, c) for e, c in items if c != 0], cls)
+
+    def to_bytes(self):
+        """Return the polynomial in the compact binary format read by
+        from_bytes(): a tag byte of the base class, then the coefficients as
+        zigzag varints (int), little-endian doubles (float), pairs of
+        numerator and denominator varints (Rationals), or bit-packed
+        residues (prime fields, after p as a varint). Sparse polynomials
+        store the gaps between their exponents instead of the zeros.
+        """
+        cls = self._base_cls
+        out = bytearray()
+        prime = issubclass(cls, ResidueField)
+        tag = _TAG_PRIME if prime else _TAGS.get(cls)
+        if tag is None:
+            raise self._serialization_error_type
+        sparse_coeffs = type(self._coeffs) is SparseArray
+        out.append(tag | _TAG_SPARSE if sparse_coeffs else tag)
+        if prime:
+            _write_varint(out, cls._prime)
+        if sparse_coeffs:
+            terms = self._coeffs.terms()
+            _write_varint(out, len(terms))
+            previous = -1
+            for e, _ in terms:
+                _write_varint(out, e - previous - 1)
+                previous = e
+            coeffs = [int(c) for _, c in terms] if prime else [c for _, c in terms]
+        else:
+            coeffs = list(self._coeffs.residues) if prime else self._coeffs
+            _write_varint(out, len(coeffs))
+        _write_coeffs(out, tag, coeffs, cls._prime if prime else None)
+        return bytes(out)
+
+    @staticmethod
+    def from_bytes(data):
+        """Return the polynomial stored by to_bytes() in data, a bytes-like
+        object (e.g. a slice of an mmap).
+        """
+        polynomial, end = _read_polynomial(memoryview(data), 0)
+        if end != len(data):
+            raise Polynomials._serialization_error_data
+        return polynomial
+
+    def terms(self, cls=None):
+        """Return the list of pairs (exponent, coefficient) of nonzero
+        coefficients in increasing order of exponents. The coefficients are
+        cast to cls, if it's given.
+        """
+        if type(self._coeffs) is SparseArray:
+            res = self._coeffs.terms()
+        else:
+            res = [(e, c) for e, c in enumerate(self._coeffs) if c != 0]
+        if cls is not None and cls is not self._base_cls:
+            res = [(e, cls(c)) for e, c in res]
+        return res
+
+    @staticmethod
+    def _from_coeffs(values, cls):
+        """Return a polynomial over cls with coefficients values, a list of
+        elements of cls, skipping the checks and casts of __init__.
+        """
+        res = Polynomials.__new__(Polynomials)
+        res._coeffs = Polynomials._stored(values, cls)
+        res._base_cls = cls
+        return res
+
+    @staticmethod
+    def _from_residues(coeffs):
+        """Return a polynomial over coeffs.field with packed coefficients
+        coeffs, a ResidueArray.
+        """
+        res = Polynomials.__new__(Polynomials)
+        res._coeffs = coeffs.strip()
+        res._base_cls = coeffs.field
+        return res
+
+    def _packed(self):
+        """Return a polynomial over a prime field with packed coefficients,
+        for the algorithms that work on the residues.
+        """
+        if type(self._coeffs) is ResidueArray:
+            return self
+        return Polynomials._from_residues(ResidueArray(self._base_cls, [int(c) for c in self._coeffs]))
+
+    def _packed_operand(self, other):
+        """For a polynomial with packed coefficients, return the packed
+        coefficients of other, if it is a polynomial or a scalar over the
+        same field, else None.
+        """
+        field = self._base_cls
+        if type(other) is Polynomials:
+            if type(other._coeffs) is ResidueArray and other._base_cls is field:
+                return other._coeffs
+        elif type(other) is int or type(other) is field:
+            return ResidueArray(field, [int(other)])
+        return None
 
     @staticmethod
-    def _operator_factory(polynomial_operator):
+    def _operator_factory(polynomial_operator, packed_operator, sparse_operator):
         """Construct functions, to assign to methods of arithmetic operations __#__, __r#__.
         This fabric can do __add__, __sub__, __mul__
 
@@ -104,70 +333,151 @@ class Polynomials(Ring):
 
         Arguments:
         _operator -- an operator for instances of our groups (int, float, Rationals, FiveElementGroup).
+        packed_operator -- the same operator for packed coefficients
+            (ResidueArray) of polynomials over a prime field.
+        sparse_operator -- the same operator for lists of terms, used if a
+            polynomial is sparse.
         """
 
         def forward(a, b):
             """a # b"""
+            if type(a._coeffs) is ResidueArray:
+                packed = a._packed_operand(b)
+                if packed is not None:
+                    return Polynomials._from_residues(packed_operator(a._coeffs, packed))
             base_cls = a._base_cls
+            if type(a._coeffs) is SparseArray or type(b) is Polynomials and type(b._coeffs) is SparseArray:
+                return Polynomials._sparse_operation(a, b, sparse_operator)
             if type(b) is Polynomials:
+                if b._base_cls is base_cls:
+                    return Polynomials._from_coeffs(polynomial_operator(a._coeffs, b._coeffs), base_cls)
                 base_cls = algorithms.get_largest_abelian_group(base_cls, b._base_cls, a._operation_error_cast)
             else:
                 try:
                     base_cls = algorithms.get_largest_abelian_group(base_cls, type(b), a._operation_error_cast)
                 except TypeError:
-                    raise a._operation_error_cast
+                    # Other types may know Polynomials, see __radd__ etc.
+                    return NotImplemented
                 return Polynomials(polynomial_operator(a._coeffs, [b]), base_cls)
             return Polynomials(polynomial_operator(a._coeffs, b._coeffs), base_cls)
 
         def reverse(b, a):
             """a # b"""
+            if type(b._coeffs) is ResidueArray:
+                packed = b._packed_operand(a)
+                if packed is not None:
+                    return Polynomials._from_residues(packed_operator(packed, b._coeffs))
             base_cls = b._base_cls
+            if type(b._coeffs) is SparseArray:
+                return Polynomials._sparse_operation(b, a, lambda t1, t2: sparse_operator(t2, t1))
             if type(a) is Polynomials:
                 base_cls = algorithms.get_largest_abelian_group(base_cls, a._base_cls, b._operation_error_cast)
             else:
                 try:
                     base_cls = algorithms.get_largest_abelian_group(base_cls, type(a), b._operation_error_cast)
                 except TypeError:
-                    raise b._operation_error_cast
+                    return NotImplemented
                 return Polynomials(polynomial_operator([a], b._coeffs), base_cls)
             return Polynomials(polynomial_operator(a._coeffs, b._coeffs), base_cls)
 
         return forward, reverse
 
-    __add__, __radd__ = _operator_factory(algorithms.add_lists)
-    __sub__, __rsub__ = _operator_factory(algorithms.sub_lists)
-    __mul__, __rmul__ = _operator_factory(algorithms.mul_lists)
+    def _sparse_operation(self, other, sparse_operator):
+        """Return sparse_operator applied to the terms of self and of other,
+        a polynomial or a scalar, over their common base class, or
+        NotImplemented for an unknown type of other.
+        """
+        if type(other) is Polynomials:
+            base_cls = algorithms.get_largest_abelian_group(self._base_cls, other._base_cls,
+                                                            self._operation_error_cast)
+            other_terms = other.terms(base_cls)
+        else:
+            try:
+                base_cls = algorithms.get_largest_abelian_group(self._base_cls, type(other),
+                                                                self._operation_error_cast)
+            except TypeError:
+                return NotImplemented
+            other = base_cls(other)
+            other_terms = [(0, other)] if other != 0 else []
+        return Polynomials._from_terms(sparse_operator(self.terms(base_cls), other_terms), base_cls)
+
+    __add__, __radd__ = _operator_factory(algorithms.add_lists, ResidueArray.add, sparse.add_terms)
+    __sub__, __rsub__ = _operator_factory(algorithms.sub_lists, ResidueArray.sub, sparse.sub_terms)
+    # Over a prime field, ResidueArray.mul multiplies the coefficients as
+    # ints, using number-theoretic transforms for long polynomials. Sparse
+    # polynomials are multiplied term by term with a heap.
+    __mul__, __rmul__ = _operator_factory(algorithms.mul_lists, ResidueArray.mul, sparse.mul_terms)
 
     def __neg__(self):
         """
         Return -self (every element x of coefficients list: x->-x)
         """
-        _values = [-i for i in self._coeffs]
-        self._coeffs = deepcopy(_values)
-        return self
+        if type(self._coeffs) is ResidueArray:
+            return Polynomials._from_residues(self._coeffs.neg())
+        if type(self._coeffs) is SparseArray:
+            return Polynomials._from_terms([(e, -c) for e, c in self.terms()], self._base_cls)
+        return Polynomials._from_coeffs([-i for i in self._coeffs], self._base_cls)
 
     def degree(self):
         return len(self._coeffs) - 1
 
     def __eq__(self, other):
         if type(other) is not Polynomials:
+            try:
+                algorithms.get_largest_abelian_group(self._base_cls, type(other), self._operation_error_cast)
+            except TypeError:
+                return NotImplemented
+            if type(other) is int and issubclass(self._base_cls, ResidueField):
+                # Only the residue itself is equal, since 3, 8, ... have
+                # other hashes than the constant 3 over Z / 5Z.
+                return self.degree() <= 0 and (int(self._coeffs[0]) if self._coeffs else 0) == other
             return self._coeffs == Polynomials([other], type(other))._coeffs
-        return self._coeffs == other._coeffs and self._base_cls == other._base_cls
+        if self._base_cls != other._base_cls:
+            return False
+        if type(self._coeffs) is not type(other._coeffs):
+            # Packed and sparse coefficients of the same field.
+            return self.terms() == other.terms()
+        return self._coeffs == other._coeffs
 
     def __ne__(self, other):
         return not (self == other)
 
+    def __hash__(self):
+        """Constant polynomials hash as their coefficient, since they are
+        equal to it.
+        """
+        try:
+            return self._hash
+        except AttributeError:
+            pass
+        if len(self._coeffs) <= 1:
+            self._hash = hash(self._coeffs[0]) if self._coeffs else hash(0)
+        elif type(self._coeffs) is ResidueArray:
+            # Elements of Z / pZ hash as their residues, so this is the
+            # hash of the terms of sparse coefficients.
+            self._hash = hash(tuple((e, r) for e, r in enumerate(self._coeffs.residues) if r))
+        else:
+            # The same for dense and sparse coefficients.
+            self._hash = hash(tuple(self.terms()))
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __repr__(self):
         coeffs = [repr(self._base_cls(i)) for i in self._coeffs]
         return f"Polynomials([{', '.join(coeffs)}], {self._base_cls.__name__})"
 
     def __str__(self):
-        c = deepcopy(self._coeffs)[::-1]
-        if not c:
+        terms = self.terms()
+        if not terms:
             return str(self._base_cls(0))
-        parsed_string = f"{' + '.join([f'{str(a)}*X^{len(c) - i - 1}' for i, a in enumerate(c[:-1]) if a != 0])}"
-        if c[-1] != 0:
-            parsed_string += f" + {c[-1]}"
+        parsed_string = f"{' + '.join([f'{str(a)}*X^{e}' for e, a in reversed(terms) if e > 0])}"
+        if terms[0][0] == 0:
+            parsed_string += f" + {terms[0][1]}" if parsed_string else str(terms[0][1])
         """
         If a[i]<0 then we have '+ -a[i]'
         """
@@ -175,11 +485,11 @@ class Polynomials(Ring):
         """
         If there is 1/-1 in coefficients we have '+/- 1X^i'
         """
-        parsed_string = re.sub(r'1\*X', 'X', parsed_string)
+        parsed_string = re.sub(r'(?<![\d./])1\*X', 'X', parsed_string)
         """
         There can be 'X^1'
         """
-        parsed_string = re.sub('X\^1', 'X', parsed_string)
+        parsed_string = re.sub(r'X\^1(?!\d)', 'X', parsed_string)
         return parsed_string
 
     def shift(self, n: int):
@@ -189,25 +499,55 @@ class Polynomials(Ring):
         # I changed logic a bit :D
         if type(n) is not int or n < 0:
             raise self._operation_error_shift
-        _values = [self._base_cls(0) for _ in range(n)]
-        _values.extend(deepcopy(self._coeffs))
-        return Polynomials(_values, self._base_cls)
+        if type(self._coeffs) is ResidueArray:
+            residues = chain(repeat(0, n), self._coeffs.residues) if self._coeffs else ()
+            return Polynomials._from_residues(ResidueArray(self._base_cls, residues))
+        if not self._coeffs:
+            return self
+        # A long shift makes the polynomial sparse, without zeros in memory.
+        return Polynomials._from_terms([(e + n, c) for e, c in self.terms()], self._base_cls)
 
     def to_monic(self):
         """Return a monic polynomial, which is a scalar
         multiple of the instance. The base class must be a field.
         """
 
-        """
-        As I understood, we shouldn't change self
-        """
         if not issubclass(self._base_cls, Field):
             raise self._operation_error_field
         if not self._coeffs:
             return self
-        for i in range(len(self._coeffs)):
-            self._coeffs[i] = self._base_cls(self._coeffs[i] * (1 / self._coeffs[-1]))
-        return self
+        if type(self._coeffs) is ResidueArray:
+            return Polynomials._from_residues(self._coeffs.scale(1 / self._coeffs[-1]))
+        inverse = 1 / self._coeffs[-1]
+        if type(self._coeffs) is SparseArray:
+            return Polynomials._from_terms([(e, c * inverse) for e, c in self.terms()], self._base_cls)
+        return Polynomials._from_coeffs([c * inverse for c in self._coeffs], self._base_cls)
+
+    def derivative(self):
+        """Return the formal derivative of the polynomial."""
+        if type(self._coeffs) is ResidueArray:
+            residues = map(operator.mul, self._coeffs.residues[1:], range(1, len(self._coeffs)))
+            return Polynomials._from_residues(ResidueArray(self._base_cls, residues))
+        if type(self._coeffs) is SparseArray:
+            return Polynomials._from_terms([(e - 1, c * e) for e, c in self.terms() if e and c * e != 0],
+                                           self._base_cls)
+        return Polynomials([c * i for i, c in enumerate(self._coeffs)][1:], self._base_cls)
+
+    def _over_common_field(self, other):
+        """Return self and other cast to their common base class, which
+        must be a field.
+        """
+        if self._base_cls == other._base_cls == int:
+            raise self._operation_error_cast
+        base_cls = algorithms.get_largest_abelian_group(self._base_cls, other._base_cls,
+                                                        self._operation_error_cast)
+        if Rationals in [self._base_cls, other._base_cls]:
+            base_cls = Rationals
+        if not issubclass(base_cls, Field):
+            raise self._operation_error_field
+        a = self if self._base_cls is base_cls else Polynomials(list(self._coeffs), base_cls)
+        b = other if other._base_cls is base_cls else Polynomials(list(other._coeffs), base_cls)
+        return a, b
 
     def euclidean_division(self, raw_divisor):
         """Return the integer quotient and the remainder of dividing self by
@@ -217,25 +557,74 @@ class Polynomials(Ring):
             raise self._operation_error_type
         if raw_divisor == 0:
             raise self._zero_error
-        if self._base_cls == raw_divisor._base_cls == int:
-            raise self._operation_error_cast
-        base_cls = algorithms.get_largest_abelian_group(self._base_cls, raw_divisor._base_cls,
-                                                        self._operation_error_cast)
-        if Rationals in [self._base_cls, raw_divisor._base_cls]:
-            base_cls = Rationals
-        quotient = Polynomials([], base_cls)
-        _raw_divisor = Polynomials(deepcopy(raw_divisor._coeffs), base_cls)
+        dividend, divisor = self._over_common_field(raw_divisor)
+        base_cls = dividend._base_cls
+        if issubclass(base_cls, ResidueField):
+            dividend, divisor = dividend._packed(), divisor._packed()
+        if dividend.degree() < divisor.degree():
+            return Polynomials([], base_cls), dividend
+        packed = type(dividend._coeffs) is ResidueArray
+        threshold = PACKED_DIVISION_THRESHOLD if packed else DIVISION_THRESHOLD
+        if min(dividend.degree() - divisor.degree(), divisor.degree()) >= threshold:
+            return dividend._newton_division(divisor)
+        if packed:
+            quotient, remainder = dividend._coeffs.divmod(divisor._coeffs)
+            return Polynomials._from_residues(quotient), Polynomials._from_residues(remainder)
+        quotient, remainder = algorithms.divmod_lists(dividend._coeffs, divisor._coeffs)
+        return Polynomials(quotient, base_cls), Polynomials(remainder, base_cls)
+
+    def _newton_division(self, divisor):
+        """Euclidean division by multiplication with the reciprocal of the
+        reversed divisor, which is computed by Newton iteration:
+        rev(quotient) = rev(self) * rev(divisor)^(-1) mod X^(m - n + 1),
+        where m and n are the degrees of self and divisor.
         """
-        I'm going to change coeeficients of self so I make a copy of it
+        length = self.degree() - divisor.degree() + 1
+        reciprocal = divisor._reversed(divisor.degree() + 1)._inverse_series(length)
+        reversed_quotient = self._reversed(self.degree() + 1)._mullow(reciprocal, length)
+        quotient = reversed_quotient._reversed(length)
+        return quotient, (self - divisor * quotient)._truncated(divisor.degree())
+
+    def _truncated(self, n: int):
+        """Return self mod X^n."""
+        if type(self._coeffs) is ResidueArray:
+            return Polynomials._from_residues(self._coeffs[:n])
+        if type(self._coeffs) is SparseArray:
+            return Polynomials._from_terms([(e, c) for e, c in self._coeffs.terms() if e < n], self._base_cls)
+        return Polynomials._from_coeffs(self._coeffs[:n], self._base_cls)
+
+    def _mullow(self, other, n: int):
+        """Return self * other mod X^n, without computing the higher
+        coefficients of the product where possible, see algorithms.mul_low.
         """
-        _self = deepcopy(self)
-        _self._base_cls = base_cls
-        while _self.degree() >= _raw_divisor.degree():
-            k = _self._coeffs[-1] * (1 / _raw_divisor._coeffs[-1])
-            deg = _self.degree() - _raw_divisor.degree()
-            quotient = quotient + Polynomials([k], base_cls).shift(deg)
-            _self = Polynomials(_self - k * _raw_divisor.shift(deg))
-        return quotient, _self
+        if other._base_cls is not self._base_cls:
+            return (self * other)._truncated(n)
+        if type(self._coeffs) is ResidueArray and type(other._coeffs) is ResidueArray:
+            # The packed product is computed in C, so only the factors are truncated.
+            return Polynomials._from_residues(self._coeffs[:n].mul(other._coeffs[:n])[:n])
+        if type(self._coeffs) is SparseArray or type(other._coeffs) is SparseArray:
+            return Polynomials._from_terms(sparse.mul_terms(self.terms(), other.terms(), n), self._base_cls)
+        return Polynomials._from_coeffs(algorithms.mul_low(self._coeffs, other._coeffs, n), self._base_cls)
+
+    def _reversed(self, n: int):
+        """Return X^(n - 1) * self(1 / X) for n > degree()."""
+        if type(self._coeffs) is ResidueArray:
+            residues = chain(repeat(0, n - len(self._coeffs)), self._coeffs.residues[::-1])
+            return Polynomials._from_residues(ResidueArray(self._base_cls, residues))
+        return Polynomials([0] * (n - len(self._coeffs)) + list(self._coeffs[::-1]), self._base_cls)
+
+    def _inverse_series(self, n: int):
+        """Return g with self * g = 1 mod X^n, by Newton iteration
+        g -> g * (2 - self * g), which doubles the precision of g.
+        The constant term of self must be invertible.
+        """
+        g = Polynomials([1 / self._coeffs[0]], self._base_cls)
+        k = 1
+        while k < n:
+            k = min(2 * k, n)
+            error = self._truncated(k)._mullow(g, k)
+            g = g._mullow(2 - error, k)
+        return g
 
     def __floordiv__(self, other):
         """Return the integer quotient of dividing self by
@@ -249,6 +638,404 @@ class Polynomials(Ring):
         """
         return self.euclidean_division(other)[1]
 
+    def __pow__(self, n, modulo=None):
+        """Return self^n for an integer n >= 0. pow(self, n, m) returns
+        self^n mod m, where m is a polynomial or a Modulus.
+        """
+        if type(n) is not int or n < 0:
+            raise self._operation_error_power
+        if modulo is not None:
+            if type(modulo) is Polynomials:
+                modulo = Modulus(modulo)
+            elif type(modulo) is not Modulus:
+                return NotImplemented
+            return modulo.powmod(self, n)
+        if n == 0:
+            return Polynomials([1], self._base_cls)
+        return sparse.power(self, n)
+
+    def pseudo_divmod(self, raw_divisor):
+        """Return the pseudo-quotient q and the pseudo-remainder r of dividing
+        self by divisor, such that lc^k * self = q * divisor + r, where lc
+        is the leading coefficient of divisor, k = max(m - n + 1, 0) and m, n
+        are the degrees of self and divisor. Only +, - and * of the common
+        base class are used, so it need not be a field.
+        """
+        if type(raw_divisor) is not Polynomials:
+            raise self._operation_error_type
+        if raw_divisor == 0:
+            raise self._zero_error
+        base_cls = algorithms.get_largest_abelian_group(self._base_cls, raw_divisor._base_cls,
+                                                        self._operation_error_cast)
+        remainder = [base_cls(c) for c in self._coeffs]
+        divisor = [base_cls(c) for c in raw_divisor._coeffs]
+        n = len(divisor) - 1
+        if len(remainder) <= n:
+            return Polynomials([], base_cls), Polynomials(remainder, base_cls)
+        lc = divisor[-1]
+        powers = [base_cls(1)]
+        for _ in range(len(remainder) - n - 1):
+            powers.append(powers[-1] * lc)
+        quotient = [base_cls(0)] * (len(remainder) - n)
+        for i in range(len(quotient) - 1, -1, -1):
+            c = remainder[i + n]
+            # c is multiplied by lc at each of the i remaining steps.
+            quotient[i] = c * powers[i]
+            remainder[:i] = map(operator.mul, remainder[:i], repeat(lc))
+            remainder[i:i + n] = map(operator.sub, map(operator.mul, remainder[i:i + n], repeat(lc)),
+                                     map(operator.mul, divisor[:n], repeat(c)))
+        return Polynomials(quotient, base_cls), Polynomials(remainder[:n], base_cls)
+
+    def content(self):
+        """Return the gcd of the coefficients of a polynomial over int, with
+        the sign of the leading coefficient (0 for the zero polynomial).
+        """
+        if self._base_cls is not int:
+            raise self._operation_error_int
+        if not self._coeffs:
+            return 0
+        res = gcd(*self._coeffs)
+        return -res if self._coeffs[-1] < 0 else res
+
+    def primitive_part(self):
+        """Return the polynomial over int divided by its content, so that its
+        coefficients are coprime and the leading coefficient is positive.
+        """
+        c = self.content()
+        if c in (0, 1):
+            return self
+        return Polynomials([a // c for a in self._coeffs], int)
+
+    def subresultant_prs(self, other):
+        """Return the subresultant polynomial remainder sequence of
+        polynomials over int, which starts with self and other (swapped if
+        other has the larger degree) and ends with the last nonzero
+        remainder. Every remainder is a pseudo-remainder divided exactly by a
+        known factor, so the coefficients grow only linearly in the degree.
+        """
+        if type(other) is not Polynomials:
+            raise self._operation_error_type
+        if self._base_cls is not int or other._base_cls is not int:
+            raise self._operation_error_int
+        f, g = (self, other) if self.degree() >= other.degree() else (other, self)
+        if g.degree() < 0:
+            return [f] if f.degree() >= 0 else []
+        res = [f, g]
+        d = f.degree() - g.degree()
+        h = f.pseudo_divmod(g)[1]
+        if d % 2 == 0:
+            h = -h
+        lc = g._coeffs[-1]
+        c = -lc ** d
+        while h.degree() >= 0:
+            k = h.degree()
+            res.append(h)
+            f, g, d = g, h, g.degree() - k
+            b = -lc * c ** d
+            h = Polynomials([a // b for a in f.pseudo_divmod(g)[1]._coeffs], int)
+            lc = g._coeffs[-1]
+            if d > 1:
+                c = (-lc) ** d // c ** (d - 1)
+            else:
+                c = -lc
+        return res
+
+    def gcd(self, other):
+        """Return the monic greatest common divisor of self and other (zero
+        if both are zero). The common base class must be a field. Over
+        Rationals the gcd is computed modulo primes, see _modular_gcd.
+
+        For polynomials over int the gcd is computed by the subresultant PRS
+        without leaving the integers. It is the gcd of the primitive parts
+        times the gcd of the contents, with a positive leading coefficient.
+        """
+        if type(other) is Polynomials and self._base_cls is int and other._base_cls is int:
+            common = gcd(self.content(), other.content())
+            prs = self.primitive_part().subresultant_prs(other.primitive_part())
+            if not prs:
+                return Polynomials([], int)
+            return prs[-1].primitive_part() * common
+        return self._gcd(other, False)[0]
+
+    def factor(self):
+        """Return (c, factors), where c is the leading coefficient and
+        factors is the list of pairs (g, k) of distinct monic irreducible
+        polynomials g and their multiplicities k, such that self is c times
+        the product of the g^k. The base class must be a prime field.
+
+        The square-free parts are split by distinct-degree factorization and
+        by the equal-degree splitting of Cantor and Zassenhaus. The powers
+        X^(p^i) mod f are computed by the precomputed Frobenius map.
+        """
+        if not issubclass(self._base_cls, ResidueField):
+            raise self._operation_error_prime
+        if self.degree() < 0:
+            return self._base_cls(0), []
+        f = self._packed().to_monic()
+        frobenius = _frobenius(f) if f.degree() > 1 else None
+        factors = []
+        for g, k in _square_free(f):
+            for h, d in _distinct_degree(g, frobenius):
+                factors.extend((u, k) for u in _equal_degree(h, d, frobenius))
+        factors.sort(key=lambda item: (item[0].degree(), list(item[0]._coeffs.residues), item[1]))
+        return self._coeffs[-1], factors
+
+    def roots(self):
+        """Return the sorted list of the distinct roots of a nonzero
+        polynomial over a prime field Z / pZ.
+
+        For p < ROOTS_TABLE_LIMIT the polynomial is evaluated at all the
+        elements, otherwise the roots are the linear factors of
+        gcd(self, X^p - X), which are split by the equal-degree splitting.
+        """
+        return Polynomials.roots_many([self])[0]
+
+    @staticmethod
+    def roots_many(polynomials):
+        """Return the lists of the roots (see roots()) of the polynomials.
+        Polynomials over the same small field are evaluated together, with
+        their coefficients packed into ints, see _table_roots.
+        """
+        polynomials = list(polynomials)
+        groups = {}
+        for i, f in enumerate(polynomials):
+            if type(f) is not Polynomials:
+                raise Polynomials._operation_error_type
+            if not issubclass(f._base_cls, ResidueField):
+                raise Polynomials._operation_error_prime
+            if f.degree() < 0:
+                raise Polynomials._roots_error_zero
+            polynomials[i] = f._packed()
+            groups.setdefault(f._base_cls, []).append(i)
+        res = [None] * len(polynomials)
+        for field, indices in groups.items():
+            if field._prime < ROOTS_TABLE_LIMIT:
+                found = _table_roots(field, [polynomials[i] for i in indices])
+            else:
+                found = [_split_roots(polynomials[i]) for i in indices]
+            for i, roots in zip(indices, found):
+                res[i] = roots
+        return res
+
+    def xgcd(self, other):
+        """Return (g, s, t), where g is the monic greatest common divisor of
+        self and other and s * self + t * other = g. The common base class
+        must be a field.
+        """
+        return self._gcd(other, True)
+
+    def _gcd(self, other, cofactors):
+        """Euclid's algorithm, in which long remainder sequences are
+        shortened by the half-GCD algorithm (Knuth--Schoenhage), which needs
+        O(M(n) log n) operations instead of O(n^2). If cofactors is False,
+        the returned s and t are None.
+        """
+        if type(other) is not Polynomials:
+            raise self._operation_error_type
+        a, b = self._over_common_field(other)
+        cls = a._base_cls
+        if cls is Rationals and not cofactors and a.degree() >= 0 and b.degree() >= 0:
+            return _modular_gcd(a, b), None, None
+        zero, one = Polynomials([], cls), Polynomials([1], cls)
+        swapped = a.degree() < b.degree()
+        if swapped:
+            a, b = b, a
+        # The rows of the matrix m express the current a and b by the inputs.
+        m = (one, zero, zero, one)
+        while b.degree() >= 0:
+            if a.degree() > b.degree() and b.degree() >= HALF_GCD_THRESHOLD:
+                r = _half_gcd(a, b)
+                a, b = _apply(r, a, b)
+                if cofactors:
+                    m = _compose(r, m)
+                if b.degree() < 0:
+                    break
+            q, remainder = a.euclidean_division(b)
+            a, b = b, remainder
+            if cofactors:
+                m = (m[2], m[3], m[0] - q * m[2], m[1] - q * m[3])
+        s, t = (m[1], m[0]) if swapped else (m[0], m[1])
+        if a.degree() < 0:
+            return (a, s, t) if cofactors else (a, None, None)
+        inverse = 1 / a._coeffs[-1]
+        if cofactors:
+            return a * inverse, s * inverse, t * inverse
+        return a * inverse, None, None
+
+    def evaluate_many(self, points):
+        """Return the list of values of the polynomial at all points, as
+        elements of the common base class of the polynomial and the points.
+
+        Over prime fields, many points are handled by a subproduct tree: the
+        polynomial is reduced modulo the products of (X - x) over halves,
+        quarters, ... of the points, which needs O(M(n) log n) operations
+        instead of the O(n^2) of Horner's scheme at every point.
+        """
+        points = list(points)
+        cls = self._base_cls
+        for point_cls in set(map(type, points)):
+            cls = algorithms.get_largest_abelian_group(cls, point_cls, self._operation_error_cast)
+        try:
+            points = [cls(x) for x in points]
+        except (ValueError, TypeError):
+            raise self._operation_error_cast
+        f = self if cls is self._base_cls else Polynomials(list(self._coeffs), cls)
+        if len(points) < MULTIPOINT_THRESHOLD or f.degree() < 1 or not issubclass(cls, ResidueField):
+            return [f._horner(x) for x in points]
+        # Each chunk of points is at least as long as the polynomial, so
+        # that the tree is not higher than needed.
+        size = max(f.degree() + 1, MULTIPOINT_THRESHOLD)
+        values = []
+        for start in range(0, len(points), size):
+            tree = _subproduct_tree(points[start:start + size], cls)
+            values.extend(f._remainders_down(tree))
+        return values
+
+    def evaluate_array(self, points, chunk_size=None):
+        """Return the values of a polynomial over int or float at all points,
+        computed by Horner's scheme run on all points at once.
+
+        points may be a NumPy array, whose values are then returned as a NumPy
+        array of the same shape, or any other iterable of numbers (a list,
+        an array.array, a memoryview, ...). Then the values are returned as
+        an array.array('d') if some point or coefficient is a float, and as a
+        list of ints otherwise.
+
+        Arguments:
+        chunk_size -- if given, the points are processed in chunks of this
+            size, which bounds the memory of the intermediate arrays.
+        """
+        if self._base_cls is not int and self._base_cls is not float:
+            raise self._operation_error_numeric
+        if chunk_size is not None and (type(chunk_size) is not int or chunk_size < 1):
+            raise ValueError("chunk_size must be a positive int")
+        coeffs = self._coeffs[::-1]
+        if numpy is not None and isinstance(points, numpy.ndarray):
+            flat = points.reshape(-1)
+            dtype = numpy.result_type(flat.dtype, self._base_cls)
+            values = numpy.zeros(flat.shape, dtype=dtype)
+            step = chunk_size or max(len(flat), 1)
+            for start in range(0, len(flat), step):
+                x = flat[start:start + step]
+                acc = numpy.zeros(x.shape, dtype=dtype)
+                for c in coeffs:
+                    acc *= x
+                    acc += c
+                values[start:start + step] = acc
+            return values.reshape(points.shape)
+        if type(points) is not list:
+            points = list(points)
+        exact = self._base_cls is int and all(type(x) is int for x in points)
+        values = [] if exact else array('d')
+        step = chunk_size or max(len(points), 1)
+        for start in range(0, len(points), step):
+            x = points[start:start + step]
+            acc = [0] * len(x)
+            for c in coeffs:
+                acc = map(operator.add, map(operator.mul, acc, x), repeat(c))
+                acc = list(acc) if exact else array('d', acc)
+            values.extend(acc)
+        return values
+
+    def _horner(self, x):
+        """Return self(x) as an element of the base class, x must be an
+        element of the base class.
+        """
+        if type(self._coeffs) is ResidueArray:
+            p = self._base_cls._prime
+            x = int(x)
+            acc = 0
+            for c in reversed(self._coeffs.residues):
+                acc = (acc * x + c) % p
+            return self._base_cls(acc)
+        if type(self._coeffs) is SparseArray:
+            return sparse.evaluate_terms(self.terms(), x, self._base_cls(0))
+        acc = self._base_cls(0)
+        for c in reversed(self._coeffs):
+            acc = acc * x + c
+        return acc
+
+    def _remainders_down(self, tree):
+        """Return the values at the leaves of a subproduct tree, the
+        remainders of self modulo the linear polynomials X - x.
+        """
+        remainders = [self % tree[-1][0]]
+        for level in reversed(tree[:-1]):
+            children = []
+            for i, remainder in enumerate(remainders):
+                for node in level[2 * i:2 * i + 2]:
+                    children.append(remainder % node if remainder.degree() >= node.degree() else remainder)
+            remainders = children
+        zero = self._base_cls(0)
+        return [r._coeffs[0] if r._coeffs else zero for r in remainders]
+
+    @staticmethod
+    def interpolate(xs, ys, cls):
+        """Return the polynomial f over cls of degree less than len(xs) with
+        f(xs[i]) = ys[i]. cls must be a field and the points xs must be
+        distinct.
+
+        Over prime fields, many points are handled by a subproduct tree:
+        with the product M of all (X - x), f is the sum of
+        ys[i] / M'(xs[i]) * M / (X - xs[i]), which is combined up the tree
+        in O(M(n) log n) operations.
+        """
+        if not (isinstance(cls, type) and issubclass(cls, Field)):
+            raise Polynomials._operation_error_field
+        xs, ys = list(xs), list(ys)
+        if len(xs) != len(ys):
+            raise ValueError("interpolate() needs as many values as points")
+        try:
+            xs = [cls(x) for x in xs]
+            ys = [cls(y) for y in ys]
+        except (ValueError, TypeError):
+            raise Polynomials._init_error_cast
+        if len(xs) < INTERPOLATION_THRESHOLD or not issubclass(cls, ResidueField):
+            return Polynomials._lagrange(xs, ys, cls)
+        tree = _subproduct_tree(xs, cls)
+        derivatives = tree[-1][0].derivative()._remainders_down(tree)
+        if any(d == 0 for d in derivatives):
+            raise Polynomials._interpolation_error_points
+        combinations = [Polynomials([y / d], cls) for y, d in zip(ys, derivatives)]
+        for level in tree[:-1]:
+            combinations = [combinations[i] * level[i + 1] + combinations[i + 1] * level[i]
+                            if i + 1 < len(level) else combinations[i]
+                            for i in range(0, len(level), 2)]
+        return combinations[0]
+
+    @staticmethod
+    def _lagrange(xs, ys, cls):
+        """interpolate() by Lagrange's formula with O(n^2) operations."""
+        zero = cls(0)
+        # The coefficients of M = prod (X - x).
+        master = [cls(1)]
+        for x in xs:
+            master = [zero] + master
+            for i in range(len(master) - 1):
+                master[i] = master[i] - x * master[i + 1]
+        res = [zero] * len(xs)
+        for x, y in zip(xs, ys):
+            # M / (X - x) by synthetic division, and its value at x.
+            quotient = [zero] * len(xs)
+            acc = zero
+            for i in range(len(xs), 0, -1):
+                acc = master[i] + acc * x
+                quotient[i - 1] = acc
+            denominator = zero
+            for c in reversed(quotient):
+                denominator = denominator * x + c
+            if denominator == 0:
+                raise Polynomials._interpolation_error_points
+            weight = y / denominator
+            res = [r + weight * q for r, q in zip(res, quotient)]
+        return Polynomials(res, cls)
+
+    def _shifted_down(self, n: int):
+        """Return self // X^n."""
+        if type(self._coeffs) is ResidueArray:
+            return Polynomials._from_residues(self._coeffs[n:])
+        return Polynomials(list(self._coeffs[n:]), self._base_cls)
+
     def __call__(self, val):
         """Return the value of f(val)."""
 
@@ -258,20 +1045,605 @@ class Polynomials(Ring):
         """
         if self._base_cls is Rationals and type(val) is float:
             raise self._operation_error_cast
-        if type(val) is Polynomials:
-            try:
-                cls = algorithms.get_largest_abelian_group(self._base_cls, val._base_cls,
-                                                           self._operation_error_cast)
-            except:
-                raise self._operation_error_type
-        else:
-            try:
-                cls = algorithms.get_largest_abelian_group(self._base_cls, type(val),
-                                                           self._operation_error_cast)
-            except:
-                raise self._operation_error_type
+        val_cls = val._base_cls if type(val) is Polynomials else type(val)
+        algorithms.get_largest_abelian_group(self._base_cls, val_cls, self._operation_error_type)
         ans = Polynomials([], self._base_cls)
+        if type(self._coeffs) is SparseArray:
+            return ans + sparse.evaluate_terms(self.terms(), val, self._base_cls(0))
         for i in self._coeffs[::-1]:
             ans = ans * val
             ans = ans + i
         return ans
+
+
+class Modulus:
+    """A nonzero polynomial over a field, prepared for many reductions
+    modulo it. The coercions are done once, and for long polynomials the
+    reciprocal of the reversed divisor is kept, so every reduction costs
+    two multiplications (Barrett's method, see Polynomials._newton_division).
+
+    Methods:
+    reduce(f) -- return f mod the divisor.
+    mulmod(f, g) -- return f * g mod the divisor.
+    powmod(f, n) -- return f^n mod the divisor, also pow(f, n, modulus).
+    """
+    __slots__ = ('_divisor', '_base_cls', '_reversed_divisor', '_reciprocal', '_precision')
+
+    def __init__(self, divisor):
+        """divisor must be a nonzero polynomial over a field (or over int,
+        then it's taken over Rationals).
+        """
+        if type(divisor) is not Polynomials:
+            raise Polynomials._operation_error_type
+        if divisor == 0:
+            raise Polynomials._zero_error
+        if divisor._base_cls is int:
+            divisor = Polynomials(list(divisor._coeffs), Rationals)
+        self._divisor = divisor._over_common_field(divisor)[0]
+        self._base_cls = self._divisor._base_cls
+        if issubclass(self._base_cls, ResidueField):
+            self._divisor = self._divisor._packed()
+        self._reversed_divisor = None
+        self._reciprocal = None
+        self._precision = 0
+
+    @property
+    def divisor(self):
+        return self._divisor
+
+    def __repr__(self):
+        return f"Modulus({self._divisor!r})"
+
+    def _newton_quotient(self, f, length):
+        """Return the quotient of f by the divisor, which has length
+        coefficients, using the cached reciprocal, extended if needed.
+        """
+        n = self._divisor.degree()
+        if self._precision < length:
+            if self._reversed_divisor is None:
+                self._reversed_divisor = self._divisor._reversed(n + 1)
+            # Reductions of products of two remainders need length n - 1.
+            self._precision = max(length, n - 1)
+            self._reciprocal = self._reversed_divisor._inverse_series(self._precision)
+        reversed_quotient = (f._reversed(f.degree() + 1)._truncated(length)
+                             * self._reciprocal._truncated(length))._truncated(length)
+        return reversed_quotient._reversed(length)
+
+    def reduce(self, f):
+        """Return the remainder of dividing the polynomial f by the divisor."""
+        if type(f) is not Polynomials:
+            raise Polynomials._operation_error_type
+        divisor = self._divisor
+        if f._base_cls is not self._base_cls:
+            f = f._over_common_field(divisor)[0]
+            if f._base_cls is not self._base_cls:
+                return f % divisor
+        n = divisor.degree()
+        if f.degree() < n:
+            return f
+        if issubclass(self._base_cls, ResidueField):
+            f = f._packed()
+        packed = type(f._coeffs) is ResidueArray
+        threshold = PACKED_DIVISION_THRESHOLD if packed else DIVISION_THRESHOLD
+        if min(f.degree() - n, n) >= threshold:
+            quotient = self._newton_quotient(f, f.degree() - n + 1)
+            return (f - divisor * quotient)._truncated(n)
+        if packed:
+            return Polynomials._from_residues(f._coeffs.divmod(divisor._coeffs)[1])
+        coeffs = f._coeffs if type(f._coeffs) is tuple else tuple(f._coeffs)
+        return Polynomials._from_coeffs(algorithms.divmod_lists(coeffs, divisor._coeffs)[1], self._base_cls)
+
+    def mulmod(self, f, g):
+        """Return f * g mod the divisor."""
+        return self.reduce(f * g)
+
+    def powmod(self, f, n: int):
+        """Return f^n mod the divisor for an integer n >= 0, by repeated
+        squaring with a sliding window: the odd powers f, f^3, ...,
+        f^(2^w - 1) are precomputed, and one multiplication is done per
+        window of w bits of n.
+        """
+        if type(n) is not int or n < 0:
+            raise Polynomials._operation_error_power
+        f = self.reduce(f)
+        if n == 0:
+            return self.reduce(Polynomials([1], self._base_cls))
+        bits = n.bit_length()
+        w = 1 if bits <= 8 else 2 if bits <= 24 else 3 if bits <= 80 else 4 if bits <= 240 else 5
+        odd_powers = [f]
+        if w > 1:
+            square = self.mulmod(f, f)
+            for _ in range((1 << (w - 1)) - 1):
+                odd_powers.append(self.mulmod(odd_powers[-1], square))
+        res = None
+        i = bits - 1
+        while i >= 0:
+            if not n >> i & 1:
+                res = self.mulmod(res, res)
+                i -= 1
+                continue
+            # The window n[j..i] ends with a 1 bit.
+            j = max(i - w + 1, 0)
+            while not n >> j & 1:
+                j += 1
+            if res is not None:
+                for _ in range(i - j + 1):
+                    res = self.mulmod(res, res)
+            power = odd_powers[(n >> j & ((1 << (i - j + 1)) - 1)) >> 1]
+            res = power if res is None else self.mulmod(res, power)
+            i = j - 1
+        return res
+
+
+def _subproduct_tree(points, cls):
+    """Return the levels of the subproduct tree of points: level 0 holds the
+    polynomials X - x, and node i of level k + 1 is the product of the nodes
+    2i and 2i + 1 of level k.
+    """
+    level = [Polynomials([-x, 1], cls) for x in points]
+    tree = [level]
+    while len(level) > 1:
+        level = [level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        tree.append(level)
+    return tree
+
+
+# Below this degree the half-GCD algorithm falls back to Euclid's steps.
+HALF_GCD_THRESHOLD = 128
+
+
+def _apply(m, a, b):
+    """Return m * (a, b) for a 2x2 matrix m = (m00, m01, m10, m11)."""
+    return m[0] * a + m[1] * b, m[2] * a + m[3] * b
+
+
+def _compose(m, n):
+    """Return the matrix product m * n."""
+    return (m[0] * n[0] + m[1] * n[2], m[0] * n[1] + m[1] * n[3],
+            m[2] * n[0] + m[3] * n[2], m[2] * n[1] + m[3] * n[3])
+
+
+def _half_gcd(a, b):
+    """For polynomials with deg a > deg b, return a matrix m of
+    polynomials, which is a product of Euclid's steps, such that
+    (c, d) = m * (a, b) satisfies deg c >= k > deg d for k = ceil(deg a / 2).
+    """
+    cls = a._base_cls
+    zero, one = Polynomials([], cls), Polynomials([1], cls)
+    k = (a.degree() + 1) // 2
+    if b.degree() < k:
+        return one, zero, zero, one
+    if a.degree() < HALF_GCD_THRESHOLD:
+        m = (one, zero, zero, one)
+        while b.degree() >= k:
+            q, remainder = a.euclidean_division(b)
+            a, b = b, remainder
+            m = (m[2], m[3], m[0] - q * m[2], m[1] - q * m[3])
+        return m
+    m = _half_gcd(a._shifted_down(k), b._shifted_down(k))
+    a, b = _apply(m, a, b)
+    if b.degree() < k:
+        return m
+    q, remainder = a.euclidean_division(b)
+    a, b = b, remainder
+    m = (m[2], m[3], m[0] - q * m[2], m[1] - q * m[3])
+    if b.degree() < k:
+        return m
+    j = 2 * k - a.degree()
+    if j <= 0:
+        # Only possible with inexact (float) coefficients.
+        return m
+    return _compose(_half_gcd(a._shifted_down(j), b._shifted_down(j)), m)
+
+
+# The primes used by _modular_gcd, the largest ones below 2^31.
+_GCD_PRIMES = []
+
+
+def _gcd_primes():
+    """Generate primes below 2^31 in descending order."""
+    yield from _GCD_PRIMES
+    p = _GCD_PRIMES[-1] - 2 if _GCD_PRIMES else (1 << 31) - 1
+    while True:
+        if algorithms.is_prime(p):
+            _GCD_PRIMES.append(p)
+            yield p
+        p -= 2
+
+
+def _cleared(f):
+    """Return the primitive polynomial over int, which is a multiple of the
+    polynomial f over Rationals.
+    """
+    coeffs = [Rationals(c) for c in f._coeffs]
+    multiple = lcm(*(c._denom for c in coeffs))
+    return Polynomials([c._nom * (multiple // c._denom) for c in coeffs], int).primitive_part()
+
+
+def _modular_gcd(a, b):
+    """Return the monic gcd of nonzero polynomials a and b over Rationals.
+
+    The denominators are cleared, and the gcd is computed over PrimeField(p)
+    for primes p, which don't divide the leading coefficients. The monic
+    gcds of the minimal degree are combined by the Chinese remainder theorem,
+    and the coefficients are recovered by rational reconstruction. As soon as
+    the candidate divides both polynomials, it is the gcd.
+    """
+    a, b = _cleared(a), _cleared(b)
+    leading = a._coeffs[-1] * b._coeffs[-1]
+    degree, modulus, residues = None, 1, None
+    tested = None
+    for p in _gcd_primes():
+        if leading % p == 0:
+            continue
+        field = PrimeField(p)
+        g = Polynomials._from_residues(ResidueArray(field, a._coeffs)).gcd(
+            Polynomials._from_residues(ResidueArray(field, b._coeffs)))
+        if g.degree() == 0:
+            return Polynomials([1], Rationals)
+        if degree is None or g.degree() < degree:
+            # All the previous primes were unlucky.
+            degree, modulus, residues = g.degree(), p, list(g._coeffs.residues)
+        elif g.degree() > degree:
+            continue
+        else:
+            inverse = pow(modulus, -1, p)
+            residues = [x + modulus * ((r - x) * inverse % p) for x, r in zip(residues, g._coeffs.residues)]
+            modulus *= p
+        fractions = [algorithms.rational_reconstruction(x, modulus) for x in residues]
+        if None in fractions or fractions == tested:
+            continue
+        tested = fractions
+        multiple = lcm(*(d for _, d in fractions))
+        candidate = Polynomials([n * (multiple // d) for n, d in fractions], int)
+        if a.pseudo_divmod(candidate)[1].degree() < 0 and b.pseudo_divmod(candidate)[1].degree() < 0:
+            return Polynomials([Rationals(n, d) for n, d in fractions], Rationals)
+
+
+# The random polynomials of the equal-degree splitting are reproducible.
+_SPLITTING_RANDOM = random.Random(0)
+
+
+def _frobenius(f):
+    """Return the Frobenius map g -> g^p mod f for polynomials g of degree
+    less than deg f over PrimeField(p). Since g^p = g(X^p), it is linear:
+    the rows X^(p*k) mod f of its matrix are computed once and packed into
+    ints (as in Kronecker substitution), so every application is deg f
+    multiply-adds of ints, done in C.
+    """
+    field = f._base_cls
+    p = field._prime
+    n = f.degree()
+    modulus = Modulus(f)
+    bits = 2 * (p - 1).bit_length() + n.bit_length()
+    code = next((code for code in 'BHIQ' if 8 * array(code).itemsize >= bits), None)
+    width = array(code).itemsize if code else (bits + 7) // 8
+    power = modulus.powmod(Polynomials._from_residues(ResidueArray(field, [0, 1])), p)
+    rows = []
+    row = Polynomials._from_residues(ResidueArray(field, [1]))
+    for _ in range(n):
+        residues = row._coeffs.residues
+        if code:
+            rows.append(int.from_bytes(array(code, residues).tobytes(), 'little'))
+        else:
+            rows.append(int.from_bytes(b''.join(x.to_bytes(width, 'little') for x in residues), 'little'))
+        row = modulus.mulmod(row, power)
+
+    def apply(g):
+        acc = 0
+        for c, row in zip(g._coeffs.residues, rows):
+            if c:
+                acc += c * row
+        raw = acc.to_bytes(n * width, 'little')
+        if code:
+            digits = array(code)
+            digits.frombytes(raw)
+        else:
+            digits = [int.from_bytes(raw[i:i + width], 'little') for i in range(0, len(raw), width)]
+        return Polynomials._from_residues(ResidueArray(field, digits))
+
+    return apply
+
+
+def _square_free(f):
+    """Return the list of pairs (g, k) of square-free, pairwise coprime
+    monic polynomials g with f the product of the g^k, for a monic f over
+    a prime field (Yun's algorithm, with p-th roots for the factors, whose
+    derivative vanishes).
+    """
+    field = f._base_cls
+    p = field._prime
+    res = []
+    multiplicity = 1
+    while f.degree() > 0:
+        c = f.gcd(f.derivative())
+        w = f // c
+        i = 1
+        while w.degree() > 0:
+            y = w.gcd(c)
+            factor = w // y
+            if factor.degree() > 0:
+                res.append((factor, i * multiplicity))
+            w, c = y, c // y
+            i += 1
+        # The rest c is a p-th power, since c' = 0, and a^p = a in Z / pZ.
+        f = Polynomials._from_residues(ResidueArray(field, c._coeffs.residues[::p]))
+        multiplicity *= p
+    return res
+
+
+def _distinct_degree(f, frobenius):
+    """Return the list of pairs (g, d), where g is the product of the
+    irreducible factors of degree d of a square-free monic f. frobenius is
+    the Frobenius map modulo f or modulo a multiple of f.
+
+    The gcds with X^(p^d) - X are taken for blocks of about sqrt(deg f)
+    consecutive d at once, with the product of the X^(p^d) - X mod f, and
+    only blocks with a nontrivial gcd are split.
+    """
+    field = f._base_cls
+    x = Polynomials._from_residues(ResidueArray(field, [0, 1]))
+    res = []
+    h = x
+    d = 0
+    while 2 * (d + 1) <= f.degree():
+        modulus = Modulus(f)
+        block = []
+        product = Polynomials._from_residues(ResidueArray(field, [1]))
+        for _ in range(max(isqrt(f.degree()), 1)):
+            if 2 * (d + 1) > f.degree():
+                break
+            d += 1
+            # h = X^(p^d) mod f.
+            h = frobenius(h) % f
+            block.append((h - x, d))
+            product = modulus.mulmod(product, h - x)
+        g = f.gcd(product)
+        if g.degree() <= 0:
+            continue
+        f = f // g
+        h = h % f
+        for difference, e in block:
+            factor = g.gcd(difference)
+            if factor.degree() > 0:
+                res.append((factor, e))
+                g = g // factor
+    if f.degree() > 0:
+        res.append((f, f.degree()))
+    return res
+
+
+def _equal_degree(f, d, frobenius):
+    """Return the irreducible factors of degree d of f, a square-free monic
+    product of them, by the splitting of Cantor and Zassenhaus: for a random
+    a, a^((p^d - 1) / 2) - 1 (the trace a + a^2 + ... + a^(2^(d - 1)) for
+    p = 2) has a nontrivial gcd with f with probability about 1 / 2.
+    """
+    if f.degree() == d:
+        return [f]
+    field = f._base_cls
+    p = field._prime
+    modulus = Modulus(f)
+    while True:
+        a = Polynomials._from_residues(ResidueArray(
+            field, [_SPLITTING_RANDOM.randrange(p) for _ in range(f.degree())]))
+        if a.degree() <= 0:
+            continue
+        # t runs over a^(p^j) mod f, computed by the Frobenius map.
+        t = a
+        if p == 2:
+            b = a
+            for _ in range(d - 1):
+                t = modulus.mulmod(t, t)
+                b = b + t
+        else:
+            # a^((p^d - 1) / 2) = (a^(1 + p + ... + p^(d - 1)))^((p - 1) / 2).
+            norm = a
+            for _ in range(d - 1):
+                t = frobenius(t) % f
+                norm = modulus.mulmod(norm, t)
+            b = modulus.powmod(norm, (p - 1) // 2) - 1
+        g = f.gcd(b)
+        if 0 < g.degree() < f.degree():
+            return _equal_degree(g, d, frobenius) + _equal_degree(f // g, d, frobenius)
+
+
+def _split_roots(f):
+    """Return the sorted roots of a nonzero polynomial f over Z / pZ: the
+    roots of g = gcd(f, X^p - X), a product of distinct linear factors,
+    which are split by _equal_degree.
+    """
+    field = f._base_cls
+    if f.degree() <= 0:
+        return []
+    f = f.to_monic()
+    x = Polynomials._from_residues(ResidueArray(field, [0, 1]))
+    g = f.gcd(Modulus(f).powmod(x, field._prime) - x)
+    if g.degree() <= 0:
+        return []
+    return [field(r) for r in sorted(-h._coeffs.residues[0] % field._prime for h in _equal_degree(g, 1, None))]
+
+
+def _table_roots(field, polynomials):
+    """Return the lists of the roots of the polynomials over Z / pZ, found
+    by evaluating all of them at every element x at once: the coefficients
+    of X^k of all the polynomials are packed into one int C_k (as in
+    Kronecker substitution), so the sum of the C_k * (x^k mod p) holds all
+    the values.
+    """
+    p = field._prime
+    n = max(f.degree() for f in polynomials) + 1
+    bits = 2 * (p - 1).bit_length() + n.bit_length()
+    code = next((code for code in 'BHIQ' if 8 * array(code).itemsize >= bits), None)
+    if code is None:
+        return [_split_roots(f) for f in polynomials]
+    m = len(polynomials)
+    residues = [f._coeffs.residues for f in polynomials]
+    packed = [int.from_bytes(array(code, [r[k] if k < len(r) else 0 for r in residues]).tobytes(), 'little')
+              for k in range(n)]
+    res = [[] for _ in polynomials]
+    for x in range(p):
+        value = 0
+        power = 1
+        for c in packed:
+            value += c * power
+            power = power * x % p
+        values = array(code)
+        values.frombytes(value.to_bytes(m * values.itemsize, 'little'))
+        for i, v in enumerate(values):
+            if v % p == 0:
+                res[i].append(field(x))
+    return res
+
+
+# The tag bytes of to_bytes(). Sparse polynomials have _TAG_SPARSE set.
+_TAG_INT, _TAG_FLOAT, _TAG_RATIONAL, _TAG_PRIME = range(4)
+_TAG_SPARSE = 0x80
+_TAGS = {int: _TAG_INT, float: _TAG_FLOAT, Rationals: _TAG_RATIONAL}
+_TAG_CLASSES = {tag: cls for cls, tag in _TAGS.items()}
+
+
+def _write_varint(out, n):
+    """Append the int n >= 0 to the bytearray out, 7 bits per byte, the
+    lowest first, with the high bit set in all but the last byte.
+    """
+    while n >= 0x80:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    """Return the varint at data[pos] and the position after it."""
+    res = 0
+    shift = 0
+    try:
+        while True:
+            b = data[pos]
+            pos += 1
+            res |= (b & 0x7f) << shift
+            if b < 0x80:
+                return res, pos
+            shift += 7
+    except IndexError:
+        raise Polynomials._serialization_error_data
+
+
+def _write_coeffs(out, tag, coeffs, p=None):
+    """Write the coefficients, the residues for tag _TAG_PRIME."""
+    if tag == _TAG_PRIME:
+        width = (p - 1).bit_length()
+        out += _pack_bits(coeffs, width).to_bytes((len(coeffs) * width + 7) // 8, 'little')
+    elif tag == _TAG_INT:
+        for c in coeffs:
+            # Zigzag: 0, -1, 1, -2, ... are 0, 1, 2, 3, ...
+            _write_varint(out, 2 * c if c >= 0 else -2 * c - 1)
+    elif tag == _TAG_FLOAT:
+        doubles = array('d', coeffs)
+        if sys.byteorder == 'big':
+            doubles.byteswap()
+        out += doubles.tobytes()
+    else:
+        for c in coeffs:
+            _write_varint(out, 2 * c._nom if c._nom >= 0 else -2 * c._nom - 1)
+            _write_varint(out, c._denom)
+
+
+def _read_coeffs(data, pos, tag, n, p=None):
+    """Return the list of n coefficients (residues for tag _TAG_PRIME) at
+    data[pos] and the position after them.
+    """
+    coeffs = []
+    if tag == _TAG_PRIME:
+        width = (p - 1).bit_length()
+        end = pos + (n * width + 7) // 8
+        if end > len(data):
+            raise Polynomials._serialization_error_data
+        return _unpack_bits(int.from_bytes(data[pos:end], 'little'), n, width), end
+    if tag == _TAG_FLOAT:
+        end = pos + 8 * n
+        if end > len(data):
+            raise Polynomials._serialization_error_data
+        doubles = array('d')
+        doubles.frombytes(data[pos:end])
+        if sys.byteorder == 'big':
+            doubles.byteswap()
+        return doubles.tolist(), end
+    for _ in range(n):
+        z, pos = _read_varint(data, pos)
+        nom = z >> 1 if not z & 1 else -(z >> 1) - 1
+        if tag == _TAG_INT:
+            coeffs.append(nom)
+        else:
+            denom, pos = _read_varint(data, pos)
+            if denom == 0:
+                raise Polynomials._serialization_error_data
+            coeffs.append(Rationals._make(nom, denom))
+    return coeffs, pos
+
+
+def _pack_bits(values, width):
+    """Return the int with values[i] in bits i * width to (i + 1) * width,
+    built by halves, so it takes O(n log n) instead of O(n^2) time.
+    """
+    if len(values) <= 64:
+        res = 0
+        for v in reversed(values):
+            res = res << width | v
+        return res
+    half = len(values) // 2
+    return _pack_bits(values[:half], width) | _pack_bits(values[half:], width) << (half * width)
+
+
+def _unpack_bits(packed, n, width):
+    """Return the list of n values of width bits packed by _pack_bits."""
+    if n <= 64:
+        mask = (1 << width) - 1
+        res = []
+        for _ in range(n):
+            res.append(packed & mask)
+            packed >>= width
+        return res
+    half = n // 2
+    return _unpack_bits(packed & ((1 << (half * width)) - 1), half, width) \
+        + _unpack_bits(packed >> (half * width), n - half, width)
+
+
+def _read_polynomial(data, pos):
+    """Return the polynomial written by to_bytes() at data[pos] and the
+    position after it.
+    """
+    if pos >= len(data):
+        raise Polynomials._serialization_error_data
+    tag = data[pos]
+    pos += 1
+    p = None
+    if tag & ~_TAG_SPARSE == _TAG_PRIME:
+        p, pos = _read_varint(data, pos)
+        try:
+            cls = PrimeField(p)
+        except ValueError:
+            raise Polynomials._serialization_error_data
+    else:
+        cls = _TAG_CLASSES.get(tag & ~_TAG_SPARSE)
+        if cls is None:
+            raise Polynomials._serialization_error_data
+    n, pos = _read_varint(data, pos)
+    if not tag & _TAG_SPARSE:
+        coeffs, pos = _read_coeffs(data, pos, tag, n, p)
+        if p is not None:
+            return Polynomials._from_residues(ResidueArray(cls, coeffs)), pos
+        return Polynomials._from_coeffs(coeffs, cls), pos
+    exps = []
+    e = -1
+    for _ in range(n):
+        gap, pos = _read_varint(data, pos)
+        e += gap + 1
+        exps.append(e)
+    coeffs, pos = _read_coeffs(data, pos, tag & ~_TAG_SPARSE, n, p)
+    if p is not None:
+        coeffs = [cls(c) for c in coeffs]
+    if any(c == 0 for c in coeffs):
+        raise Polynomials._serialization_error_data
+    return Polynomials._from_terms(list(zip(exps, coeffs)), cls), pos
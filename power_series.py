@@ -0,0 +1,250 @@
+from abstract_structures import Ring, Field
+from polynomials import Polynomials
+from rationals import Rationals
+import sparse
+
+
+class PowerSeries(Ring):
+    """Truncated power series f + O(X^n) over some Ring R, where f is a
+    polynomial of degree less than the precision n. Inherits Ring.
+    Implements __repr__, __str__, __truediv__ and __pow__. Instances are
+    immutable and hashable.
+
+    The precision of a result is the smallest precision of the operands.
+    Products are truncated (see Polynomials._mullow), so no coefficients
+    above the precision are computed.
+
+    Methods:
+    inverse(), log(), exp(), sqrt() -- return the series 1 / f, log(f),
+        exp(f) and sqrt(f), computed by Newton iteration, which doubles the
+        number of correct coefficients per step. They need a base class, in
+        which the integers up to the precision can be inverted; series over
+        int are taken over Rationals.
+    derivative(), integral() -- return the formal derivative and the
+        integral with constant term 0.
+    """
+    _init_error_not_polynomial = TypeError(
+        "the argument of PowerSeries must be an instance of Polynomials"
+    )
+    _init_error_precision = ValueError(
+        "the precision of PowerSeries must be a positive integer"
+    )
+    _operation_error_field = TypeError(
+        "inverse(), log(), exp() and sqrt() can only be done for PowerSeries "
+        "with int or Field base classes"
+    )
+    _operation_error_power = ValueError(
+        "the exponent of ** must be an integer"
+    )
+    _operation_error_characteristic = ValueError(
+        "the integers up to the precision are not invertible in the base class"
+    )
+    _operation_error_log = ValueError(
+        "log() and sqrt() can only be done for PowerSeries with constant term 1"
+    )
+    _operation_error_exp = ValueError(
+        "exp() can only be done for PowerSeries with constant term 0"
+    )
+    _zero_error = ZeroDivisionError(
+        "the constant term of the PowerSeries is not invertible"
+    )
+
+    __slots__ = ('_poly', '_precision')
+
+    def __init__(self, values, precision: int, cls=None):
+        """Arguments:
+        values -- a polynomial, or the list of coefficients, if cls is given.
+            The coefficients from X^precision on are dropped.
+        precision -- the number n of known coefficients, f + O(X^n).
+        cls -- if given, the base class, a subclass of Ring.
+        """
+        if cls is not None:
+            values = Polynomials(values, cls)
+        if type(values) is not Polynomials:
+            raise self._init_error_not_polynomial
+        if type(precision) is not int or precision < 1:
+            raise self._init_error_precision
+        self._poly = values._truncated(precision)
+        self._precision = precision
+
+    @staticmethod
+    def _make(poly, precision):
+        """Return the series poly + O(X^precision) without checks; the
+        degree of poly must be less than precision.
+        """
+        res = PowerSeries.__new__(PowerSeries)
+        res._poly = poly
+        res._precision = precision
+        return res
+
+    @property
+    def polynomial(self):
+        return self._poly
+
+    @property
+    def precision(self):
+        return self._precision
+
+    def _operand(self, other):
+        """Return the polynomial of other and the precision of the result."""
+        if type(other) is PowerSeries:
+            return other._poly, min(self._precision, other._precision)
+        return other, self._precision
+
+    def __add__(self, other):
+        other, n = self._operand(other)
+        return self._make((self._poly + other)._truncated(n), n)
+
+    def __radd__(self, other):
+        return self + other
+
+    def __sub__(self, other):
+        other, n = self._operand(other)
+        return self._make((self._poly - other)._truncated(n), n)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        other, n = self._operand(other)
+        if type(other) is Polynomials:
+            return self._make(self._poly._truncated(n)._mullow(other._truncated(n), n), n)
+        return self._make(self._poly * other, n)
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __neg__(self):
+        return self._make(-self._poly, self._precision)
+
+    def __truediv__(self, other):
+        if type(other) is Polynomials:
+            other = PowerSeries(other, self._precision)
+        elif type(other) is not PowerSeries:
+            other = PowerSeries(Polynomials([other], self._poly._base_cls), self._precision)
+        return self * other.inverse()
+
+    def __rtruediv__(self, other):
+        return self.inverse() * other
+
+    def __pow__(self, n):
+        if type(n) is not int:
+            raise self._operation_error_power
+        if n < 0:
+            return self.inverse() ** -n
+        if n == 0:
+            return self._make(Polynomials([1], self._poly._base_cls), self._precision)
+        return sparse.power(self, n)
+
+    def __eq__(self, other):
+        """Series are equal, if they have equal precisions and coefficients.
+        Other objects are compared with the polynomial.
+        """
+        if type(other) is PowerSeries:
+            return self._precision == other._precision and self._poly == other._poly
+        return self._poly == other
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self._poly)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"PowerSeries({self._poly!r}, {self._precision})"
+
+    def __str__(self):
+        return f"{self._poly} + O(X^{self._precision})"
+
+    def _constant(self):
+        return self._poly._coeffs[0] if self._poly.degree() >= 0 else self._poly._base_cls(0)
+
+    def _over_field(self):
+        """Return self with coefficients in a field, over Rationals if it's
+        a series over int.
+        """
+        cls = self._poly._base_cls
+        if cls is int:
+            return PowerSeries(Polynomials(list(self._poly._coeffs), Rationals), self._precision)
+        if not issubclass(cls, Field):
+            raise self._operation_error_field
+        return self
+
+    def derivative(self):
+        """Return f' + O(X^(n - 1)) for self = f + O(X^n)."""
+        return self._make(self._poly.derivative(), max(self._precision - 1, 1))
+
+    def integral(self):
+        """Return the series F + O(X^(n + 1)) with F' = f and F(0) = 0 for
+        self = f + O(X^n).
+        """
+        series = self._over_field()
+        cls = series._poly._base_cls
+        terms = {}
+        try:
+            for e, c in series._poly.terms():
+                terms[e + 1] = c * (cls(1) / cls(e + 1))
+        except ZeroDivisionError:
+            raise self._operation_error_characteristic
+        return self._make(Polynomials.from_terms(terms, cls), self._precision + 1)
+
+    def inverse(self):
+        """Return 1 / self, by Newton iteration g -> g * (2 - self * g)."""
+        series = self._over_field()
+        if series._constant() == 0:
+            raise self._zero_error
+        return self._make(series._poly._inverse_series(self._precision), self._precision)
+
+    def log(self):
+        """Return log(self) = integral(self' / self). The constant term of
+        self must be 1.
+        """
+        series = self._over_field()
+        if series._constant() != 1:
+            raise self._operation_error_log
+        if self._precision == 1:
+            return self._make(Polynomials([], series._poly._base_cls), 1)
+        return (series.derivative() * series.inverse()).integral()
+
+    def exp(self):
+        """Return exp(self) by Newton iteration g -> g * (1 + self - log(g)),
+        which doubles the precision of g. The constant term of self must be
+        0.
+        """
+        series = self._over_field()
+        if series._constant() != 0:
+            raise self._operation_error_exp
+        cls = series._poly._base_cls
+        g = self._make(Polynomials([1], cls), 1)
+        k = 1
+        while k < self._precision:
+            k = min(2 * k, self._precision)
+            g = PowerSeries(g._poly, k)
+            g = g * (1 + PowerSeries(series._poly, k) - g.log())
+        return g
+
+    def sqrt(self):
+        """Return the square root with constant term 1 by Newton iteration
+        g -> (g + self / g) / 2. The constant term of self must be 1.
+        """
+        series = self._over_field()
+        if series._constant() != 1:
+            raise self._operation_error_log
+        cls = series._poly._base_cls
+        try:
+            half = cls(1) / cls(2)
+        except ZeroDivisionError:
+            raise self._operation_error_characteristic
+        g = self._make(Polynomials([1], cls), 1)
+        k = 1
+        while k < self._precision:
+            k = min(2 * k, self._precision)
+            g = PowerSeries(g._poly, k)
+            g = (g + PowerSeries(series._poly, k) * g.inverse()) * half
+        return g
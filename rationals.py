@@ -1,13 +1,23 @@
 import operator
+import sys
+from itertools import chain, repeat
+from math import gcd
 
 from abstract_structures import Field
-from algorithms import gcd
+import algorithms
+
+_HASH_MODULUS = sys.hash_info.modulus
 
 
 class Rationals(Field):
     """Residue class of Rational numbers.
     Implements __repr__, __str__, comparison operators.
+
+    Fractions are always reduced with a positive denominator. Arithmetic uses
+    Henrici's algorithms, which take gcds of the small cross terms instead of
+    reducing the full products.
     """
+    __slots__ = ('_nom', '_denom')
     _init_exc = ValueError("Rationals() arguments must be an int, 2 ints or an instance of FiveElementsField")
     _zero_exc = ZeroDivisionError("can't divide by zero")
 
@@ -16,9 +26,10 @@ class Rationals(Field):
         if self._denom < 0:
             self._denom *= -1
             self._nom *= -1
-        _gcd = gcd(abs(self._nom), self._denom)
-        self._nom //= _gcd
-        self._denom //= _gcd
+        _gcd = gcd(self._nom, self._denom)
+        if _gcd != 1:
+            self._nom //= _gcd
+            self._denom //= _gcd
 
     """Initialization is allowed only from an int or an instance of the class."""
 
@@ -28,12 +39,40 @@ class Rationals(Field):
                 raise Rationals._zero_exc
             self._nom = a
             self._denom = b
+            self._reduce()
         elif type(a) is Rationals:
             self._nom = a._nom
             self._denom = a._denom
         else:
             raise Rationals._init_exc
-        self._reduce()
+
+    @classmethod
+    def _make(cls, nom: int, denom: int):
+        """Unchecked constructor: nom / denom must be reduced and denom > 0."""
+        self = object.__new__(cls)
+        self._nom = nom
+        self._denom = denom
+        return self
+
+    @staticmethod
+    def _sum(n1: int, d1: int, n2: int, d2: int):
+        """Return n1 / d1 + n2 / d2 for reduced fractions."""
+        g = gcd(d1, d2)
+        if g == 1:
+            return Rationals._make(n1 * d2 + n2 * d1, d1 * d2)
+        s = d1 // g
+        t = n1 * (d2 // g) + n2 * s
+        g2 = gcd(t, g)
+        if g2 == 1:
+            return Rationals._make(t, s * d2)
+        return Rationals._make(t // g2, s * (d2 // g2))
+
+    @staticmethod
+    def _product(n1: int, d1: int, n2: int, d2: int):
+        """Return n1 / d1 * n2 / d2 for reduced fractions."""
+        g1 = gcd(n1, d2)
+        g2 = gcd(n2, d1)
+        return Rationals._make((n1 // g1) * (n2 // g2), (d1 // g2) * (d2 // g1))
 
     """Factory of arithmetic operations"""
 
@@ -41,21 +80,21 @@ class Rationals(Field):
     def _arithmetic_operator_factory(int_operator):
         def forward(a, b):
             if type(b) is int:
-                return Rationals(int_operator(a._nom, b * a._denom), a._denom)
+                # gcd(a._nom +- b * a._denom, a._denom) = 1, so it's reduced.
+                return Rationals._make(int_operator(a._nom, b * a._denom), a._denom)
             elif type(b) is float:
                 return int_operator(a._nom, b * a._denom) / a._denom
             elif type(b) is Rationals:
-                # # # Строки кода должны быть короче 80 символов в длину.
-                return Rationals(int_operator(a._nom * b._denom, b._nom * a._denom), a._denom * b._denom)
+                return Rationals._sum(a._nom, a._denom, int_operator(0, b._nom), b._denom)
             return NotImplemented
 
         def reverse(b, a):
             if type(a) is int:
-                return Rationals(int_operator(a * b._denom, b._nom), b._denom)
+                return Rationals._make(int_operator(a * b._denom, b._nom), b._denom)
             elif type(a) is float:
                 return int_operator(a * b._denom, b._nom) / b._denom
             elif type(a) is Rationals:
-                return Rationals(int_operator(a._nom * b._denom, b._nom * a._denom), a._denom * b._denom)
+                return Rationals._sum(a._nom, a._denom, int_operator(0, b._nom), b._denom)
             return NotImplemented
 
         return forward, reverse
@@ -87,15 +126,25 @@ class Rationals(Field):
 
     __le__, __ge__ = _comparison_operator_factory(operator.le)
     __lt__, __gt__ = _comparison_operator_factory(operator.lt)
-    __eq__, _ = _comparison_operator_factory(operator.eq)
+
+    def __eq__(self, other):
+        # Fractions are reduced, so equal ones have equal parts.
+        if type(other) is int:
+            return self._denom == 1 and self._nom == other
+        elif type(other) is Rationals:
+            return self._nom == other._nom and self._denom == other._denom
+        elif type(other) is float:
+            return self._nom == self._denom * other
+        return NotImplemented
 
     def __mul__(self, other):
         if type(other) is int:
-            return Rationals(self._nom * other, self._denom)
+            g = gcd(other, self._denom)
+            return Rationals._make(self._nom * (other // g), self._denom // g)
         elif type(other) is float:
             return self._nom * other / self._denom
         elif type(other) is Rationals:
-            return Rationals(self._nom * other._nom, self._denom * other._denom)
+            return Rationals._product(self._nom, self._denom, other._nom, other._denom)
         return NotImplemented
 
     def __rmul__(self, other):
@@ -108,30 +157,50 @@ class Rationals(Field):
         if type(a) in [int, float, Rationals] and a == 0:
             raise Rationals._zero_exc
         if type(a) is int:
-            return Rationals(1, a)
+            return Rationals._make(1, a) if a > 0 else Rationals._make(-1, -a)
         elif type(a) is float:
             return 1 / a
         elif type(a) is Rationals:
-            return Rationals(a._denom, a._nom)
+            if a._nom > 0:
+                return Rationals._make(a._denom, a._nom)
+            return Rationals._make(-a._denom, -a._nom)
         else:
             return NotImplemented
 
     """a * b = a * (1 / b)"""
 
     def __truediv__(self, other):
-        return self * self._inverse(other)
+        inverse = self._inverse(other)
+        if inverse is NotImplemented:
+            return NotImplemented
+        return self * inverse
 
     def __rtruediv__(self, other):
+        if type(other) not in [int, float, Rationals]:
+            return NotImplemented
         return other * self._inverse(self)
 
     def __neg__(self):
-        return Rationals(-self._nom, self._denom)
+        return Rationals._make(-self._nom, self._denom)
 
     def __abs__(self):
         if self._nom < 0:
             return -self
         return self
 
+    def __hash__(self):
+        """Equal ints, floats and Fractions have the same hash."""
+        if self._denom == 1:
+            return hash(self._nom)
+        try:
+            inverse = pow(self._denom, -1, _HASH_MODULUS)
+        except ValueError:
+            res = sys.hash_info.inf
+        else:
+            res = hash(hash(abs(self._nom)) * inverse)
+        res = res if self._nom >= 0 else -res
+        return -2 if res == -1 else res
+
     def __repr__(self):
         return f"Rationals({self._nom}, {self._denom})"
 
@@ -142,3 +211,261 @@ class Rationals(Field):
 
     def __float__(self):
         return self._nom / self._denom
+
+
+algorithms.register_embedding(int, Rationals)
+algorithms.register_embedding(Rationals, float)
+
+
+def _normalized(noms, denoms):
+    """Reduce the fractions noms[i] / denoms[i] in one pass and make the
+    denominators positive. Return the new lists of numerators and denominators.
+    """
+    if any(d < 0 for d in denoms):
+        noms = [-n if d < 0 else n for n, d in zip(noms, denoms)]
+        denoms = list(map(abs, denoms))
+    gcds = list(map(gcd, noms, denoms))
+    if any(g != 1 for g in gcds):
+        noms = list(map(operator.floordiv, noms, gcds))
+        denoms = list(map(operator.floordiv, denoms, gcds))
+    return noms, denoms
+
+
+class RationalArray:
+    """Sequence of rational numbers with the semantics of Rationals, stored as
+    two parallel lists of numerators and denominators.
+    Indexing returns Rationals, slicing returns a RationalArray.
+
+    Arithmetic operators work element-wise on arrays of the same length, an
+    int or a Rationals operand is broadcast. Every operation builds the
+    unreduced results first and then reduces all of them in a single pass,
+    instead of creating a Rationals per element.
+    """
+    __slots__ = ('_noms', '_denoms')
+    _init_exc = ValueError("RationalArray() arguments must be an iterable of ints or Rationals, "
+                           "or two iterables of ints")
+    _length_exc = ValueError("RationalArray operands must have the same length")
+
+    def __init__(self, values=(), denoms=None):
+        """Arguments:
+        values -- an iterable of ints or Rationals, or of numerators if
+            denoms is given.
+        denoms -- an iterable of int denominators.
+        """
+        values = list(values)
+        if denoms is None:
+            noms, denoms = [], []
+            for a in values:
+                if type(a) is int:
+                    noms.append(a)
+                    denoms.append(1)
+                elif type(a) is Rationals:
+                    noms.append(a._nom)
+                    denoms.append(a._denom)
+                else:
+                    raise RationalArray._init_exc
+            self._noms, self._denoms = noms, denoms
+            return
+        denoms = list(denoms)
+        if len(values) != len(denoms) or any(type(a) is not int for a in chain(values, denoms)):
+            raise RationalArray._init_exc
+        if 0 in denoms:
+            raise Rationals._zero_exc
+        self._noms, self._denoms = _normalized(values, denoms)
+
+    @classmethod
+    def _make(cls, noms, denoms):
+        """Unchecked constructor: the fractions must be reduced and have
+        positive denominators.
+        """
+        self = object.__new__(cls)
+        self._noms = noms
+        self._denoms = denoms
+        return self
+
+    @property
+    def numerators(self):
+        """The list of numerators. It must not be modified."""
+        return self._noms
+
+    @property
+    def denominators(self):
+        """The list of denominators. It must not be modified."""
+        return self._denoms
+
+    def __len__(self):
+        return len(self._noms)
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return self._make(self._noms[index], self._denoms[index])
+        return Rationals._make(self._noms[index], self._denoms[index])
+
+    def __iter__(self):
+        return map(Rationals._make, self._noms, self._denoms)
+
+    def __eq__(self, other):
+        if type(other) is RationalArray:
+            return self._noms == other._noms and self._denoms == other._denoms
+        if type(other) in (list, tuple):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"RationalArray({self._noms}, {self._denoms})"
+
+    def __str__(self):
+        return '[' + ', '.join(map(str, self)) + ']'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _operands(self, other):
+        """Return the numerators and denominators of other as iterables,
+        which can be zipped with the ones of self, or None.
+        """
+        if type(other) is RationalArray:
+            if len(other) != len(self):
+                raise RationalArray._length_exc
+            return other._noms, other._denoms
+        if type(other) is int:
+            return repeat(other), repeat(1)
+        if type(other) is Rationals:
+            return repeat(other._nom), repeat(other._denom)
+        return None
+
+    """Factory of arithmetic operations"""
+
+    @staticmethod
+    def _arithmetic_operator_factory(int_operator):
+        def forward(a, b):
+            operands = a._operands(b)
+            if operands is None:
+                return NotImplemented
+            noms, denoms = operands
+            res_noms = list(map(int_operator, map(operator.mul, a._noms, denoms),
+                                map(operator.mul, noms, a._denoms)))
+            res_denoms = list(map(operator.mul, a._denoms, denoms))
+            return RationalArray._make(*_normalized(res_noms, res_denoms))
+
+        def reverse(b, a):
+            operands = b._operands(a)
+            if operands is None:
+                return NotImplemented
+            noms, denoms = operands
+            res_noms = list(map(int_operator, map(operator.mul, noms, b._denoms),
+                                map(operator.mul, b._noms, denoms)))
+            res_denoms = list(map(operator.mul, denoms, b._denoms))
+            return RationalArray._make(*_normalized(res_noms, res_denoms))
+
+        return forward, reverse
+
+    __add__, __radd__ = _arithmetic_operator_factory(operator.add)
+    __sub__, __rsub__ = _arithmetic_operator_factory(operator.sub)
+
+    def __mul__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+        noms, denoms = operands
+        res_noms = list(map(operator.mul, self._noms, noms))
+        res_denoms = list(map(operator.mul, self._denoms, denoms))
+        return RationalArray._make(*_normalized(res_noms, res_denoms))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def _inverse(self):
+        if 0 in self._noms:
+            raise Rationals._zero_exc
+        # Swapping keeps the fractions reduced, only the signs are fixed.
+        return RationalArray._make(*_normalized(self._denoms, self._noms))
+
+    def __truediv__(self, other):
+        if type(other) is RationalArray:
+            other = other._inverse()
+        elif type(other) in (int, Rationals):
+            other = Rationals._inverse(other)
+        else:
+            return NotImplemented
+        return self * other
+
+    def __rtruediv__(self, other):
+        if type(other) not in (int, Rationals):
+            return NotImplemented
+        return self._inverse() * other
+
+    def __neg__(self):
+        return RationalArray._make(list(map(operator.neg, self._noms)), self._denoms)
+
+    def __abs__(self):
+        return RationalArray._make(list(map(abs, self._noms)), self._denoms)
+
+    """Factory of element-wise comparisons, which return lists of bools"""
+
+    @staticmethod
+    def _comparison_operator_factory(comparison_operator):
+        def compare(a, b):
+            operands = a._operands(b)
+            if operands is None:
+                raise TypeError(f"RationalArray can't be compared with {type(b).__name__}")
+            noms, denoms = operands
+            return list(map(comparison_operator, map(operator.mul, a._noms, denoms),
+                            map(operator.mul, noms, a._denoms)))
+
+        return compare
+
+    eq = _comparison_operator_factory(operator.eq)
+    lt = _comparison_operator_factory(operator.lt)
+    le = _comparison_operator_factory(operator.le)
+    gt = _comparison_operator_factory(operator.gt)
+    ge = _comparison_operator_factory(operator.ge)
+
+    """Reductions"""
+
+    @staticmethod
+    def _reduction(noms, denoms, combine):
+        """Combine the fractions pairwise in a tree, reducing every level in
+        one pass, so that the numbers stay small.
+        combine(n1, d1, n2, d2) returns the unreduced lists of the results.
+        """
+        while len(noms) > 1:
+            odd = len(noms) % 2
+            last = (noms[-1], denoms[-1])
+            noms, denoms = _normalized(*combine(noms[0:-1:2], denoms[0:-1:2], noms[1::2], denoms[1::2]))
+            if odd:
+                noms.append(last[0])
+                denoms.append(last[1])
+        return Rationals._make(noms[0], denoms[0])
+
+    @staticmethod
+    def _pairwise_sums(n1, d1, n2, d2):
+        noms = list(map(operator.add, map(operator.mul, n1, d2), map(operator.mul, n2, d1)))
+        return noms, list(map(operator.mul, d1, d2))
+
+    @staticmethod
+    def _pairwise_products(n1, d1, n2, d2):
+        return list(map(operator.mul, n1, n2)), list(map(operator.mul, d1, d2))
+
+    def sum(self):
+        """Return the sum of the elements as Rationals."""
+        if not self._noms:
+            return Rationals(0)
+        return self._reduction(self._noms, self._denoms, self._pairwise_sums)
+
+    def prod(self):
+        """Return the product of the elements as Rationals."""
+        if not self._noms:
+            return Rationals(1)
+        return self._reduction(self._noms, self._denoms, self._pairwise_products)
+
+    def dot(self, other):
+        """Return the sum of the products of the elements of self and the
+        RationalArray other of the same length.
+        """
+        if type(other) is not RationalArray:
+            raise TypeError("RationalArray.dot() argument must be a RationalArray")
+        return (self * other).sum()
@@ -0,0 +1,170 @@
+import heapq
+from bisect import bisect_left
+
+
+class SparseArray:
+    """Immutable sequence of the coefficients of a polynomial, which stores
+    only the nonzero coefficients and their exponents, in increasing order.
+
+    Indexing and iteration behave like those of the dense tuple of
+    coefficients, the missing coefficients are zero. Slicing returns a
+    dense tuple.
+    """
+    __slots__ = ('_exps', '_coeffs', '_zero')
+
+    def __init__(self, terms, zero):
+        """Arguments:
+        terms -- a list of pairs (exponent, coefficient) with increasing
+            exponents and nonzero coefficients.
+        zero -- the zero of the base class, returned for missing exponents.
+        """
+        self._exps = tuple(e for e, _ in terms)
+        self._coeffs = tuple(c for _, c in terms)
+        self._zero = zero
+
+    def terms(self):
+        """Return the list of pairs (exponent, coefficient)."""
+        return list(zip(self._exps, self._coeffs))
+
+    def __len__(self):
+        return self._exps[-1] + 1 if self._exps else 0
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SparseArray index out of range")
+        i = bisect_left(self._exps, index)
+        if self._exps[i] == index:
+            return self._coeffs[i]
+        return self._zero
+
+    def __iter__(self):
+        n = 0
+        for e, c in zip(self._exps, self._coeffs):
+            for _ in range(e - n):
+                yield self._zero
+            yield c
+            n = e + 1
+
+    def __reversed__(self):
+        n = len(self) - 1
+        for e, c in zip(reversed(self._exps), reversed(self._coeffs)):
+            for _ in range(n - e):
+                yield self._zero
+            yield c
+            n = e - 1
+
+    def __eq__(self, other):
+        if type(other) is SparseArray:
+            return self._exps == other._exps and self._coeffs == other._coeffs
+        if type(other) in (list, tuple):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self._exps, self._coeffs))
+
+    def __repr__(self):
+        return f"SparseArray({self.terms()})"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def add_terms(terms1, terms2):
+    """Merge two lists of pairs (exponent, coefficient) with increasing
+    exponents into the list of terms of their sum. Zero coefficients are
+    dropped.
+    """
+    res = []
+    i = j = 0
+    while i < len(terms1) and j < len(terms2):
+        e1, e2 = terms1[i][0], terms2[j][0]
+        if e1 < e2:
+            res.append(terms1[i])
+            i += 1
+        elif e1 > e2:
+            res.append(terms2[j])
+            j += 1
+        else:
+            c = terms1[i][1] + terms2[j][1]
+            if c != 0:
+                res.append((e1, c))
+            i += 1
+            j += 1
+    res.extend(terms1[i:])
+    res.extend(terms2[j:])
+    return res
+
+
+def sub_terms(terms1, terms2):
+    """Return the terms of the difference of two lists of terms."""
+    return add_terms(terms1, [(e, -c) for e, c in terms2])
+
+
+def mul_terms(terms1, terms2, n=None):
+    """Return the terms of the product of two polynomials given by lists of
+    terms. The products of terms are generated in increasing order of the
+    exponent by a heap, which holds one candidate per term of the shorter
+    polynomial (Johnson's algorithm), so equal exponents are summed at once.
+    If n is given, only the terms with exponents less than n are computed.
+    """
+    if len(terms1) > len(terms2):
+        terms1, terms2 = terms2, terms1
+    if not terms1:
+        return []
+    # Entries are (exponent, i, j) for the product of terms1[i] and terms2[j].
+    heap = [(e + terms2[0][0], i, 0) for i, (e, _) in enumerate(terms1)]
+    if n is not None:
+        heap = [entry for entry in heap if entry[0] < n]
+    heapq.heapify(heap)
+    res = []
+    while heap:
+        e = heap[0][0]
+        acc = None
+        while heap and heap[0][0] == e:
+            _, i, j = heapq.heappop(heap)
+            product = terms1[i][1] * terms2[j][1]
+            acc = product if acc is None else acc + product
+            if j + 1 < len(terms2) and (n is None or terms1[i][0] + terms2[j + 1][0] < n):
+                heapq.heappush(heap, (terms1[i][0] + terms2[j + 1][0], i, j + 1))
+        if acc != 0:
+            res.append((e, acc))
+    return res
+
+
+def power(x, n: int):
+    """Return x^n for n >= 1 by repeated squaring, using only *."""
+    res = None
+    while True:
+        if n & 1:
+            res = x if res is None else res * x
+        n >>= 1
+        if not n:
+            return res
+        x = x * x
+
+
+def evaluate_terms(terms, x, zero):
+    """Return the value at x of the polynomial given by a list of terms, by
+    Horner's scheme, in which the gaps between exponents are bridged by
+    powers of x, computed by repeated squaring.
+    """
+    if not terms:
+        return zero
+    powers = {}
+    acc = terms[-1][1]
+    for k in range(len(terms) - 1, 0, -1):
+        gap = terms[k][0] - terms[k - 1][0]
+        if gap not in powers:
+            powers[gap] = power(x, gap)
+        acc = acc * powers[gap] + terms[k - 1][1]
+    if terms[0][0]:
+        acc = acc * power(x, terms[0][0])
+    return acc
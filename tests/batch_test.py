@@ -0,0 +1,45 @@
+import pickle
+
+import pytest
+
+import batch
+from integer_residues import FiveElementsField, PrimeField
+from polynomials import Polynomials
+from rationals import Rationals
+
+FIELD = PrimeField(998244353)
+
+
+def _jobs(cls, n):
+    return [(Polynomials([i + 1, 2, 0, i % 3 + 1], cls), Polynomials([1, i + 2], cls)) for i in range(n)]
+
+
+@pytest.mark.parametrize('cls', [int, float, Rationals, FiveElementsField, FIELD])
+def test_encode(cls):
+    f = Polynomials([Rationals(1, 3) if cls is Rationals else 1, 0, 2, 4], cls)
+    data = batch._encode(f)
+    decoded = batch._decode(pickle.loads(pickle.dumps(data)))
+    assert decoded == f and decoded._base_cls is cls
+    x = cls(3)
+    assert batch._decode(batch._encode(x)) == x
+    if cls is FiveElementsField:
+        assert len(pickle.dumps(data)) < len(pickle.dumps(f)) / 2
+
+
+@pytest.mark.parametrize('cls', [int, float, Rationals, FiveElementsField, FIELD])
+def test_encode_sparse(cls):
+    f = Polynomials.from_terms({100000: 1, 17: 3, 0: 1}, cls)
+    data = batch._encode(f)
+    assert data[0] == 't' and len(pickle.dumps(data)) < 200
+    decoded = batch._decode(pickle.loads(pickle.dumps(data)))
+    assert decoded == f and decoded._base_cls is cls and decoded.terms() == f.terms()
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, None), (2, None), (2, 7)])
+def test_map(workers, chunk_size):
+    jobs = _jobs(Rationals, 70) + _jobs(FiveElementsField, 30)
+    assert batch.map_mul(jobs, workers, chunk_size) == [f * g for f, g in jobs]
+    assert batch.map_divmod(jobs, workers, chunk_size) == [f.euclidean_division(g) for f, g in jobs]
+    assert batch.map_gcd(jobs, workers, chunk_size) == [f.gcd(g) for f, g in jobs]
+    points = [(f, f._base_cls(2)) for f, _ in jobs]
+    assert batch.map_eval(points, workers, chunk_size) == [f(x) for f, x in points]
@@ -0,0 +1,21 @@
+import json
+
+import benchmark
+
+
+def test_compare():
+    baseline = {'a': 1.0, 'b': 1.0, 'c': 2.0}
+    results = {'a': 1.2, 'b': 1.5, 'c': 1.0, 'd': 5.0}
+    assert benchmark.compare(results, baseline, 0.25) == [('b', 1.0, 1.5, 1.5)]
+
+
+def test_main(tmp_path):
+    output, baseline = tmp_path / 'run.json', tmp_path / 'baseline.json'
+    argv = ['--quick', '-k', 'mul/int/10', '--min-time', '0']
+    assert benchmark.main(argv + ['--save-baseline', str(baseline)]) == 0
+    results = json.loads(baseline.read_text())['results']
+    assert set(results) == {'mul/int/10', 'mul/int/100', 'mul/int/1000'}
+    # Everything is a regression against a baseline of zero-time cases.
+    baseline.write_text(json.dumps({'results': {name: 1e-12 for name in results}}))
+    assert benchmark.main(argv + ['--json', str(output), '--compare', str(baseline)]) == 1
+    assert set(json.loads(output.read_text())['results']) == set(results)
@@ -0,0 +1,29 @@
+import pytest
+
+import container
+from integer_residues import FiveElementsField
+from polynomials import Polynomials
+from rationals import Rationals
+
+
+def test_container(tmp_path):
+    path = tmp_path / 'polynomials.bin'
+    polynomials = [Polynomials([i, 1, i * i], FiveElementsField) for i in range(100)]
+    polynomials += [Polynomials([], int), Polynomials([Rationals(1, 3), 2], Rationals)]
+    container.write(path, polynomials)
+    with container.Container(path) as stored:
+        assert len(stored) == len(polynomials)
+        assert stored[37] == polynomials[37]
+        assert stored[-1] == polynomials[-1]
+        assert stored[10:13] == polynomials[10:13]
+        assert list(stored) == polynomials
+        with pytest.raises(IndexError):
+            stored[len(polynomials)]
+
+
+def test_bad_container(tmp_path):
+    for data in (b'', b'POLY', b'JUNK\x01' + bytes(16)):
+        path = tmp_path / 'bad.bin'
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            container.Container(path)
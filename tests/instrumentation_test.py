@@ -0,0 +1,62 @@
+import algorithms
+import instrumentation
+from integer_residues import FiveElementsField
+from polynomials import Polynomials
+from rationals import Rationals
+
+
+def test_counts():
+    a = Polynomials(list(range(1, 11)), int)
+    b = Polynomials(list(range(1, 6)), int)
+    with instrumentation.record() as counters:
+        a * b
+        a + b
+    assert counters['mul'] == 50
+    assert counters['add'] == 50 + 5
+    assert counters['path:mul_lists'] == 1
+    assert counters['path:_karatsuba'] == 0
+    assert counters['calls:Polynomials.__mul__[int]'] == 1
+    assert counters['time:Polynomials.__mul__[int]'] > 0
+    assert counters['alloc:Polynomials'] == 2
+
+
+def test_paths():
+    a = Polynomials([Rationals(i, 7) for i in range(1, 41)], Rationals)
+    b = Polynomials([FiveElementsField(i) for i in range(1, 42)], FiveElementsField)
+    with instrumentation.record() as outer:
+        with instrumentation.record() as inner:
+            a * a
+        a.gcd(a + 1)
+        b(FiveElementsField(2))
+    assert inner['path:_karatsuba'] > 0
+    assert inner['mul'] < 40 * 40
+    assert inner['alloc:Rationals'] > 0
+    assert inner['path:_modular_gcd'] == 0
+    assert outer['path:_modular_gcd'] == 1
+    assert outer['path:_karatsuba'] == inner['path:_karatsuba']
+    assert outer['calls:Polynomials.__call__[FiveElementsField]'] == 1
+
+
+def test_restored():
+    originals = (algorithms._schoolbook, algorithms.mul_lists, Polynomials.__mul__, Polynomials.__dict__['_from_coeffs'],
+                 Rationals.__dict__['_make'])
+    with instrumentation.record():
+        assert algorithms._schoolbook is not originals[0]
+    assert (algorithms._schoolbook, algorithms.mul_lists, Polynomials.__mul__, Polynomials.__dict__['_from_coeffs'],
+            Rationals.__dict__['_make']) == originals
+
+
+def test_low_product():
+    a = Polynomials([Rationals(i, 3) for i in range(1, 11)], Rationals)
+    with instrumentation.record() as counters:
+        algorithms.mul_low(list(range(10)), list(range(10)), 4)
+        a._mullow(a, 100)
+    # 4 + 3 + 2 + 1 products below X^4, all 100 products of a * a.
+    assert counters['mul'] == 10 + 100
+    assert counters['path:mul_low'] == 2
+    assert counters['path:_mullow'] == 1
+    long = [Rationals(i, 7) for i in range(1, 61)]
+    with instrumentation.record() as counters:
+        algorithms.mul_low(long, long, 60)
+    assert counters['path:_karatsuba'] > 0
+    assert 0 < counters['mul'] < 60 * 60
@@ -1,6 +1,8 @@
+import pickle
+
 import pytest
 
-from integer_residues import FiveElementsField
+from integer_residues import FiveElementsField, ThreeElementsField, PrimeField, ResidueArray
 
 TEST_INIT = [
     (15, FiveElementsField(0)),
@@ -111,3 +113,61 @@ def test_repr():
 def test_str():
     assert str(FiveElementsField(55)) == "_0_"
     assert str(FiveElementsField(-1)) == "_4_"
+
+
+def test_prime_field():
+    assert PrimeField(5) is FiveElementsField
+    assert PrimeField(3) is ThreeElementsField
+    assert PrimeField(7) is PrimeField(7)
+    assert repr(PrimeField(7)(-1)) == "PrimeField7(6)"
+    assert FiveElementsField(2) is FiveElementsField(7)
+    assert FiveElementsField(2) + FiveElementsField(3) is FiveElementsField(0)
+
+
+@pytest.mark.parametrize("p", [0, 1, 4, 9, 2.0, 5.0, "7"])
+def test_bad_prime_field(p):
+    # Equal floats must not find the cached fields.
+    PrimeField(2)
+    with pytest.raises(ValueError):
+        PrimeField(p)
+
+
+@pytest.mark.parametrize("p", [2, 3, 7, 257, 65537, 2 ** 31 - 1])
+def test_prime_field_arithmetic(p):
+    cls = PrimeField(p)
+    for a in [0, 1, 2, p - 1, p // 2]:
+        for b in [1, p - 1, p // 3 + 1]:
+            assert cls(a) + cls(b) == (a + b) % p
+            assert cls(a) - b == (a - b) % p
+            assert a * cls(b) == a * b % p
+            assert cls(a) / cls(b) * b == a
+            assert a / cls(b) == cls(a) / b
+    with pytest.raises(ZeroDivisionError):
+        cls(1) / p
+
+
+def test_pickle():
+    for x in [FiveElementsField(3), PrimeField(11)(4), PrimeField(2 ** 31 - 1)(5)]:
+        assert pickle.loads(pickle.dumps(x)) == x
+
+
+def test_residue_array():
+    a = ResidueArray(FiveElementsField, [1, 2, 3, 9])
+    b = ResidueArray(FiveElementsField, [4, 4])
+    assert a[3] is FiveElementsField(4)
+    assert list(a) == [1, 2, 3, 4]
+    assert a[1:3] == ResidueArray(FiveElementsField, [2, 3])
+    assert a.add(b) == [0, 1, 3, 4]
+    assert b.sub(a) == [3, 2, 2, 1]
+    assert a.neg() == [4, 3, 2, 1]
+    assert a.scale(FiveElementsField(2)) == [2, 4, 1, 3]
+    assert a.mul(b).strip() == [4, 2, 0, 3, 1]
+    assert ResidueArray(FiveElementsField, [1, 0, 5]).strip() == [1]
+
+
+@pytest.mark.parametrize("p", [3, 257, 2 ** 31 - 1, 2 ** 89 - 1])
+def test_residue_array_typecodes(p):
+    cls = PrimeField(p)
+    a = ResidueArray(cls, [-1, 1])
+    assert a.mul(a).strip() == [1, -2, 1]
+    assert a.add(a.neg()).strip() == []
@@ -0,0 +1,116 @@
+import pytest
+
+from integer_residues import FiveElementsField
+from multivariate import MultivariatePolynomials
+from polynomials import Polynomials
+from rationals import Rationals
+
+
+def test_init():
+    f = MultivariatePolynomials({(1, 0): 2, (0, 1): Rationals(1, 2), (1, 1): 0}, Rationals)
+    assert f.nvars == 2 and f.order == 'lex'
+    assert f == MultivariatePolynomials({(0, 1): Rationals(1, 2), (1, 0): 2}, Rationals)
+    assert MultivariatePolynomials({(0, 0): 3}, int) == 3
+    assert MultivariatePolynomials({}, int, 2) == 0
+    assert MultivariatePolynomials({(1, 1): 5}, FiveElementsField) == 0
+
+
+def test_bad_init():
+    with pytest.raises(TypeError):
+        MultivariatePolynomials({(1, 0): 1}, str)
+    with pytest.raises(TypeError):
+        MultivariatePolynomials([1, 2], int)
+    with pytest.raises(TypeError):
+        MultivariatePolynomials({(1, 0): 1, (1,): 1}, int)
+    with pytest.raises(TypeError):
+        MultivariatePolynomials({(1, -1): 1}, int)
+    with pytest.raises(TypeError):
+        MultivariatePolynomials({(1, 0): 's'}, int)
+    with pytest.raises(ValueError):
+        MultivariatePolynomials({(1, 0): 1}, int, order='deglex')
+    with pytest.raises(OverflowError):
+        MultivariatePolynomials({(1 << 32, 0): 1}, int)
+
+
+def test_arithmetic():
+    x, y, z = MultivariatePolynomials.variables(int, 3)
+    f = (x + y + 1) * (x - z) * 3
+    assert f.terms() == [
+        ((2, 0, 0), 3), ((1, 1, 0), 3), ((1, 0, 1), -3), ((1, 0, 0), 3), ((0, 1, 1), -3), ((0, 0, 1), -3),
+    ]
+    assert str(f) == "3*x0^2 + 3*x0*x1 - 3*x0*x2 + 3*x0 - 3*x1*x2 - 3*x2"
+    assert f - f == 0 and -f + f == 0 and f.degree() == 2
+    assert (x * Rationals(1, 2)).terms() == [((1, 0, 0), Rationals(1, 2))]
+    assert 1 - x == -(x - 1)
+    assert x * y * y * z == MultivariatePolynomials({(1, 2, 1): 1}, int)
+    assert hash(x + 1 - x) == hash(1)
+    assert {x * y: 1}[y * x] == 1
+    big = MultivariatePolynomials({(1 << 31, 0, 0): 1}, int)
+    with pytest.raises(OverflowError):
+        big * big
+    with pytest.raises(TypeError):
+        x + 's'
+    with pytest.raises(TypeError):
+        x + MultivariatePolynomials.variables(int, 2)[0]
+    with pytest.raises(TypeError):
+        x * Rationals(1, 2) + MultivariatePolynomials({(1, 0, 0): 1}, FiveElementsField)
+
+
+@pytest.mark.parametrize("order,expected", [
+    ('lex', [(2, 0, 1), (1, 2, 1), (0, 0, 3)]),
+    ('grlex', [(1, 2, 1), (2, 0, 1), (0, 0, 3)]),
+    ('grevlex', [(1, 2, 1), (2, 0, 1), (0, 0, 3)]),
+])
+def test_orders(order, expected):
+    f = MultivariatePolynomials({(2, 0, 1): 1, (1, 2, 1): 1, (0, 0, 3): 1}, int, order=order)
+    assert [exps for exps, _ in f.terms()] == expected
+    assert f.leading_term() == (expected[0], 1)
+
+
+def test_grevlex():
+    f = MultivariatePolynomials({(1, 0, 2): 1, (0, 2, 1): 1}, int, order='grevlex')
+    assert f.leading_term() == ((0, 2, 1), 1)
+    assert f.degree() == 3
+
+
+def test_evaluation():
+    x, y, z = MultivariatePolynomials.variables(int, 3)
+    f = (x + y + 1) * (x - z) * 3
+    assert f(1, 2, 3) == -24
+    assert f.substitute({0: y + z}) == 6 * y * y + 3 * y * z + 3 * y
+    assert f.substitute({0: 1, 2: 0}) == 3 * y + 6
+    with pytest.raises(ValueError):
+        f(1, 2)
+    with pytest.raises(ValueError):
+        f.substitute({3: 1})
+
+
+def test_univariate():
+    p = Polynomials([1, 2, 3], int)
+    f = MultivariatePolynomials.from_polynomial(p, 2, var=1)
+    assert f.terms() == [((0, 2), 3), ((0, 1), 2), ((0, 0), 1)]
+    assert f.to_polynomial(1) == p
+    t, = MultivariatePolynomials.variables(Rationals, 1)
+    assert t + p == MultivariatePolynomials({(2,): 3, (1,): 3, (0,): 1}, Rationals)
+    assert (t * p).to_polynomial() == Polynomials([0, 1, 2, 3], Rationals)
+    assert MultivariatePolynomials.from_polynomial(p, 1) == p
+    with pytest.raises(ValueError):
+        (f + MultivariatePolynomials.variables(int, 2)[0]).to_polynomial(1)
+
+
+@pytest.mark.parametrize('cls', [int, Rationals, FiveElementsField])
+def test_univariate_on_the_left(cls):
+    t, = MultivariatePolynomials.variables(cls, 1)
+    p = Polynomials([0, 1], cls)
+    assert p + t == MultivariatePolynomials({(1,): 2}, cls)
+    assert p - t == 0
+    assert p * t == MultivariatePolynomials({(2,): 1}, cls)
+    assert p == t and t == p
+    assert hash(p) == hash(t) and hash(p * p + 3) == hash(t * t + 3)
+    assert {p: 1}[t] == 1 and {t: 1}[p] == 1
+    # Sparse polynomials take another path.
+    q = Polynomials.from_terms({100: 1}, cls)
+    assert (q * t).to_polynomial() == q.shift(1)
+    assert hash(q * t) == hash(q.shift(1))
+    with pytest.raises(TypeError):
+        p + MultivariatePolynomials.variables(cls, 2)[0]
@@ -1,9 +1,14 @@
+from array import array
+
 import pytest
 
+import algorithms
 from algorithms import gcd
-from integer_residues import FiveElementsField
+import polynomials
+from integer_residues import FiveElementsField, ThreeElementsField, PrimeField
 from polynomials import Polynomials
 from rationals import Rationals
+from sparse import SparseArray
 
 TEST_INIT = [
     ([], FiveElementsField),
@@ -271,6 +276,64 @@ def test_mul(x, y, expected):
     assert x * y == expected
 
 
+TEST_LARGE_MUL = [
+    (int, 300),
+    (Rationals, 150),
+    (FiveElementsField, 300),
+    (ThreeElementsField, 300),
+    (float, 100),
+]
+
+
+@pytest.mark.parametrize("cls,n", TEST_LARGE_MUL)
+def test_large_mul(cls, n):
+    # (X - 1) * (1 + X + ... + X^(n - 1)) = X^n - 1
+    geometric = Polynomials([1] * n, cls)
+    expected = Polynomials([-1] + [0] * (n - 1) + [1], cls)
+    assert Polynomials([-1, 1], cls) * geometric == expected
+    assert geometric * geometric * Polynomials([-1, 1], cls) == expected * geometric
+
+
+def test_packed_coefficients():
+    f = Polynomials([1, 2, 3], FiveElementsField)
+    g = Polynomials([4, 3, 2, 1], FiveElementsField)
+    assert f + g == Polynomials([0, 0, 0, 1], FiveElementsField)
+    assert g - 1 == Polynomials([3, 3, 2, 1], FiveElementsField)
+    assert 2 - f == Polynomials([1, 3, 2], FiveElementsField)
+    assert FiveElementsField(2) * f == Polynomials([2, 4, 1], FiveElementsField)
+    assert f * g == Polynomials([4, 1, 0, 4, 3, 3], FiveElementsField)
+    assert f.shift(2) == Polynomials([0, 0, 1, 2, 3], FiveElementsField)
+    assert f + Polynomials([4], int) == Polynomials([0, 2, 3], FiveElementsField)
+    assert -f == Polynomials([4, 3, 2], FiveElementsField)
+
+
+@pytest.mark.parametrize("cls", [FiveElementsField, ThreeElementsField])
+def test_ntt_mul(monkeypatch, cls):
+    monkeypatch.setattr(algorithms, "NTT_THRESHOLD", 256)
+    # (1 + X)^p = 1 + X^p over Z / pZ, so (1 + X)^(p^5) = 1 + X^(p^5).
+    n = cls._prime ** 5
+    f = Polynomials([1, 1], cls)
+    for _ in range(5):
+        g = f
+        for _ in range(cls._prime - 1):
+            g = g * f
+        f = g
+    assert f == Polynomials([1] + [0] * (n - 1) + [1], cls)
+
+
+def test_ntt_mul_large_prime(monkeypatch):
+    # The coefficients of the product don't fit the NTT primes.
+    monkeypatch.setattr(algorithms, "NTT_THRESHOLD", 8)
+    p = 2 ** 61 - 1
+    ls1 = [p - 1 - i for i in range(20)]
+    ls2 = [p - 2 * i - 1 for i in range(30)]
+    expected = [0] * 50
+    for i, a in enumerate(ls1):
+        for j, b in enumerate(ls2):
+            expected[i + j] = (expected[i + j] + a * b) % p
+    assert algorithms.mul_lists_mod(ls1, ls2, p) == expected
+
+
 TEST_REPR = [
     (
         Polynomials([1, 2], FiveElementsField),
@@ -326,6 +389,10 @@ TEST_STR = [
         Polynomials([2, Rationals(1, 3), 1, 0, Rationals(3, 2)], Rationals),
         "3/2*X^4 + X^2 + 1/3*X + 2"
     ),
+    (
+        Polynomials([0, 21] + [0] * 15 + [1], int),
+        "X^17 + 21*X"
+    ),
 ]
 
 
@@ -464,6 +531,24 @@ def test_division(x, y, q, r):
     assert x % y == r
 
 
+@pytest.mark.parametrize("x,y,q,r", TEST_DIVISION)
+def test_newton_division(monkeypatch, x, y, q, r):
+    monkeypatch.setattr(polynomials, "DIVISION_THRESHOLD", 1)
+    monkeypatch.setattr(polynomials, "PACKED_DIVISION_THRESHOLD", 1)
+    assert x.euclidean_division(y) == (q, r)
+
+
+@pytest.mark.parametrize("cls", [FiveElementsField, Rationals, PrimeField(65537)])
+def test_large_division(monkeypatch, cls):
+    monkeypatch.setattr(polynomials, "DIVISION_THRESHOLD", 8)
+    monkeypatch.setattr(polynomials, "PACKED_DIVISION_THRESHOLD", 8)
+    x = Polynomials([i * i + 1 for i in range(100)], cls)
+    y = Polynomials([3 * i - 1 for i in range(40)] + [1], cls)
+    q, r = x.euclidean_division(y)
+    assert q.degree() == 59 and r.degree() < 40
+    assert q * y + r == x
+
+
 TEST_BAD_DIVISION = [
     (
         Polynomials([3, -5, 1, 1], Rationals),
@@ -552,6 +637,40 @@ def test_gcd():
     assert gcd(a, b).to_monic() == expected
 
 
+@pytest.mark.parametrize("cls", [Rationals, FiveElementsField, PrimeField(101)])
+def test_half_gcd(monkeypatch, cls):
+    monkeypatch.setattr(polynomials, "HALF_GCD_THRESHOLD", 2)
+    common = Polynomials([1, 2, 0, 1, 1], cls)
+    a = common * Polynomials([3, 0, 1, 2, 1, 0, 0, 1], cls)
+    b = common * Polynomials([1, 1, 1, 1, 0, 2, 1], cls)
+    g, s, t = a.xgcd(b)
+    assert g == common
+    assert s * a + t * b == g
+    assert gcd(a, b) == common
+    assert gcd(b, a) == common
+
+
+def test_xgcd_trivial():
+    a = Polynomials([1, 1], Rationals)
+    zero = Polynomials([], Rationals)
+    assert zero.xgcd(zero) == (zero, Polynomials([1], Rationals), zero)
+    assert zero.xgcd(2 * a) == (a, zero, Polynomials([Rationals(1, 2)], Rationals))
+    assert a.gcd(a * a - a) == a
+
+
+TEST_DERIVATIVE = [
+    (Polynomials([1, 2, 3], Rationals), Polynomials([2, 6], Rationals)),
+    (Polynomials([1, 1, 1, 1, 1, 1], FiveElementsField), Polynomials([1, 2, 3, 4], FiveElementsField)),
+    (Polynomials([5], int), Polynomials([], int)),
+    (Polynomials([], float), Polynomials([], float)),
+]
+
+
+@pytest.mark.parametrize("f,expected", TEST_DERIVATIVE)
+def test_derivative(f, expected):
+    assert f.derivative() == expected
+
+
 TEST_CALL = [
     (
         Polynomials([1, 2, 3, 4, 5], Rationals),
@@ -576,6 +695,95 @@ def test_call(f, x, expected):
     assert f(x) == expected
 
 
+@pytest.mark.parametrize("cls", [Rationals, FiveElementsField, PrimeField(65537), int])
+def test_evaluate_many(monkeypatch, cls):
+    monkeypatch.setattr(polynomials, "MULTIPOINT_THRESHOLD", 4)
+    f = Polynomials([(-1) ** i * (i + 2) for i in range(30)], cls)
+    points = list(range(-20, 40)) + [cls(3)]
+    assert f.evaluate_many(points) == [f(x) for x in points]
+    assert f.evaluate_many([]) == []
+
+
+def test_evaluate_many_float():
+    f = Polynomials([(-1) ** i / (i + 1) for i in range(51)], float)
+    points = [-10 + 20 * i / polynomials.MULTIPOINT_THRESHOLD for i in range(polynomials.MULTIPOINT_THRESHOLD + 76)]
+    assert f.evaluate_many(points) == pytest.approx([f(x) for x in points], rel=1e-12)
+
+
+def test_evaluate_many_cast():
+    f = Polynomials([1, 2], int)
+    assert f.evaluate_many([Rationals(1, 2), 1]) == [Rationals(2), Rationals(3)]
+    with pytest.raises(TypeError):
+        Polynomials([1, 2], Rationals).evaluate_many([FiveElementsField(1)])
+
+
+@pytest.mark.parametrize("threshold", [1, 1000])
+@pytest.mark.parametrize("cls", [Rationals, FiveElementsField, PrimeField(65537)])
+def test_interpolate(monkeypatch, threshold, cls):
+    monkeypatch.setattr(polynomials, "INTERPOLATION_THRESHOLD", threshold)
+    f = Polynomials([3, -1, 0, 2], cls)
+    xs = [0, 1, 2, 3, 4]
+    assert Polynomials.interpolate(xs, f.evaluate_many(xs), cls) == f
+    assert Polynomials.interpolate([2], [7], cls) == Polynomials([7], cls)
+    assert Polynomials.interpolate([], [], cls) == Polynomials([], cls)
+
+
+def test_interpolate_many():
+    cls = PrimeField(65537)
+    xs = list(range(1, 300, 2))
+    ys = [x * x % 65537 for x in range(150)]
+    f = Polynomials.interpolate(xs, ys, cls)
+    assert f.degree() < len(xs)
+    assert f.evaluate_many(xs) == ys
+
+
+TEST_BAD_INTERPOLATE = [
+    ([1, 2], [1], Rationals, ValueError),
+    ([1, 1], [1, 2], Rationals, ValueError),
+    ([1, 6], [1, 2], FiveElementsField, ValueError),
+    ([1, 2], [1, 2], int, TypeError),
+    ([0.5], [1], Rationals, TypeError),
+]
+
+
+@pytest.mark.parametrize("xs,ys,cls,error", TEST_BAD_INTERPOLATE)
+def test_bad_interpolate(monkeypatch, xs, ys, cls, error):
+    for threshold in [1, 1000]:
+        monkeypatch.setattr(polynomials, "INTERPOLATION_THRESHOLD", threshold)
+        with pytest.raises(error):
+            Polynomials.interpolate(xs, ys, cls)
+
+
+TEST_EVALUATE_ARRAY = [
+    (Polynomials([1, 2, 3], int), [0, 1, -2], None, [1, 6, 9]),
+    (Polynomials([1, 2, 3], int), array('q', [0, 1, -2]), 2, [1, 6, 9]),
+    (Polynomials([1, 2, 3], int), [0.5, 2], None, array('d', [2.75, 17.0])),
+    (Polynomials([0.5, 0, 1], float), range(4), 3, array('d', [0.5, 1.5, 4.5, 9.5])),
+    (Polynomials([], float), [1.0, 2.0], None, array('d', [0.0, 0.0])),
+]
+
+
+@pytest.mark.parametrize("f,points,chunk_size,expected", TEST_EVALUATE_ARRAY)
+def test_evaluate_array(f, points, chunk_size, expected):
+    assert f.evaluate_array(points, chunk_size) == expected
+
+
+def test_evaluate_array_numpy():
+    numpy = pytest.importorskip("numpy")
+    points = numpy.linspace(-1, 1, 12).reshape(3, 4)
+    f = Polynomials([1, -1, 0, 2], int)
+    values = f.evaluate_array(points, chunk_size=5)
+    assert values.shape == (3, 4)
+    assert numpy.allclose(values, 1 - points + 2 * points ** 3)
+
+
+def test_bad_evaluate_array():
+    with pytest.raises(TypeError):
+        Polynomials([1], Rationals).evaluate_array([1])
+    with pytest.raises(ValueError):
+        Polynomials([1], int).evaluate_array([1], chunk_size=0)
+
+
 TEST_BAD_CALL = [
     (
         Polynomials([1, 1], Rationals),
@@ -600,3 +808,288 @@ TEST_BAD_CALL = [
 def test_bad_call(f, x):
     with pytest.raises((ValueError, TypeError)):
         f(x)
+
+
+def test_pseudo_divmod():
+    f = Polynomials([-5, 2, 8, -3, -3, 0, 1, 0, 1], int)
+    g = Polynomials([21, -9, -4, 0, 5, 0, 3], int)
+    q, r = f.pseudo_divmod(g)
+    assert q == Polynomials([-6, 0, 9], int)
+    assert r == Polynomials([-9, 0, 3, 0, -15], int)
+    assert q * g + r == 27 * f
+    assert g.pseudo_divmod(f) == (Polynomials([], int), g)
+    q, r = f.pseudo_divmod(Polynomials([1, 2], Rationals))
+    assert q * Polynomials([1, 2], Rationals) + r == Polynomials([-5, 2, 8, -3, -3, 0, 1, 0, 1], Rationals) * 2 ** 8
+    with pytest.raises(ZeroDivisionError):
+        f.pseudo_divmod(Polynomials([], int))
+
+
+def test_subresultant_prs():
+    f = Polynomials([-5, 2, 8, -3, -3, 0, 1, 0, 1], int)
+    g = Polynomials([21, -9, -4, 0, 5, 0, 3], int)
+    assert g.subresultant_prs(f) == [
+        f, g,
+        Polynomials([9, 0, -3, 0, 15], int),
+        Polynomials([-245, 125, 65], int),
+        Polynomials([-12300, 9326], int),
+        Polynomials([260708], int),
+    ]
+    assert f.subresultant_prs(Polynomials([], int)) == [f]
+    with pytest.raises(TypeError):
+        f.subresultant_prs(Polynomials([1], Rationals))
+
+
+def test_int_gcd():
+    a = Polynomials([2, 4], int) * Polynomials([1, 0, 3], int) * Polynomials([-6, 3], int)
+    b = Polynomials([6, 12], int) * Polynomials([5, 1], int) * Polynomials([-4, 2], int)
+    assert a.content() == 6 and (a * -1).content() == -6
+    assert a.primitive_part() == Polynomials([1, 2], int) * Polynomials([1, 0, 3], int) * Polynomials([-2, 1], int)
+    assert gcd(a, b) == Polynomials([-12, -18, 12], int)
+    assert gcd(a, Polynomials([], int)) == a
+    assert gcd(Polynomials([], int), Polynomials([-4, -2], int)) == Polynomials([4, 2], int)
+    assert gcd(Polynomials([], int), Polynomials([], int)) == Polynomials([], int)
+    with pytest.raises(TypeError):
+        Polynomials([1], Rationals).content()
+
+
+def test_rational_reconstruction():
+    m = 1000003 * 998244353
+    assert algorithms.rational_reconstruction(-3 * pow(7, -1, m) % m, m) == (-3, 7)
+    assert algorithms.rational_reconstruction(5, m) == (5, 1)
+    assert algorithms.rational_reconstruction(m // 2, m) == (-1, 2)
+    assert algorithms.rational_reconstruction(10, 101) is None
+
+
+def test_modular_gcd():
+    common = Polynomials([Rationals(3 ** 40, 7), Rationals(-1, 2 ** 70), 5, Rationals(11, 13)], Rationals)
+    a = common * Polynomials([Rationals(1, 3), 2, -7, 1], Rationals)
+    b = common * Polynomials([4, Rationals(-5, 9), 0, 0, 2], Rationals)
+    expected = common * (1 / common._coeffs[-1])
+    assert a.gcd(b) == expected
+    assert gcd(b, a) == expected
+    assert a.gcd(Polynomials([1, 1], int)) == Polynomials([1], Rationals)
+    assert a.gcd(Polynomials([6], Rationals)) == Polynomials([1], Rationals)
+
+
+def test_immutable():
+    a = Polynomials([Rationals(1, 2), 0, 2], Rationals)
+    b = Polynomials([1, 2, 3], FiveElementsField)
+    assert -a == Polynomials([Rationals(-1, 2), 0, -2], Rationals)
+    assert b.to_monic() == Polynomials([2, 4, 1], FiveElementsField)
+    assert a.to_monic() == Polynomials([Rationals(1, 4), 0, 1], Rationals)
+    assert -b == Polynomials([4, 3, 2], FiveElementsField)
+    assert a == Polynomials([Rationals(1, 2), 0, 2], Rationals)
+    assert b == Polynomials([1, 2, 3], FiveElementsField)
+    assert Polynomials(a)._coeffs is a._coeffs
+    with pytest.raises(AttributeError):
+        a.extra = 1
+
+
+def test_hash():
+    a = Polynomials([1, 2, 3], Rationals)
+    assert hash(a) == hash(Polynomials([1, 2, 3], Rationals))
+    assert hash(Polynomials([3], Rationals)) == hash(3)
+    assert hash(Polynomials([], FiveElementsField)) == hash(0)
+    table = {a: 1, Polynomials([1, 2, 3], FiveElementsField): 2, Polynomials([1, 2], float): 3}
+    assert table[Polynomials([1, 2, 3], Rationals)] == 1
+    assert table[Polynomials([6, 7, 8], FiveElementsField)] == 2
+    assert table[Polynomials([1.0, 2.0], float)] == 3
+    # Equal to ints only by the residue, so equal objects hash equal.
+    constant = Polynomials([3], FiveElementsField)
+    assert constant == 3 and hash(constant) == hash(3)
+    assert constant != 8 and Polynomials([4], FiveElementsField) != -1
+    assert 3 in {constant} and constant in {3} and 8 not in {constant}
+
+
+def test_coercion_lattice():
+    error = TypeError()
+    assert algorithms.get_largest_abelian_group(int, Rationals, error) is Rationals
+    assert algorithms.get_largest_abelian_group(Rationals, int, error) is Rationals
+    assert algorithms.get_largest_abelian_group(int, float, error) is float
+    assert algorithms.get_largest_abelian_group(Rationals, float, error) is float
+    assert algorithms.get_largest_abelian_group(int, PrimeField(7), error) is PrimeField(7)
+    for cls1, cls2 in [(FiveElementsField, Rationals), (ThreeElementsField, FiveElementsField)]:
+        with pytest.raises(TypeError):
+            algorithms.get_largest_abelian_group(cls1, cls2, error)
+    assert (Polynomials([1, 2], int) + Polynomials([1], FiveElementsField))._base_cls is FiveElementsField
+    assert Polynomials([1, 2], int) + 0.5 == Polynomials([1.5, 2.0], float)
+
+
+def test_sparse():
+    f = Polynomials.from_terms({100000: 1, 17: 3, 0: 1}, int)
+    g = Polynomials.from_terms({50000: 2, 1: -1}, int)
+    assert type(f._coeffs) is SparseArray and f.degree() == 100000
+    assert str(f) == "X^100000 + 3*X^17 + 1"
+    assert (f * g).terms() == [(1, -1), (18, -3), (50000, 2), (50017, 6), (100001, -1), (150000, 2)]
+    assert f + g - g == f and (f - f).degree() == -1
+    assert (-f).terms() == [(0, -1), (17, -3), (100000, -1)]
+    assert f.derivative().terms() == [(16, 51), (99999, 100000)]
+    assert f(2) == 2 ** 100000 + 3 * 2 ** 17 + 1
+    assert f.evaluate_many([1, -1]) == [5, -1]
+    assert hash(f) == hash(Polynomials.from_terms({0: 1, 17: 3, 100000: 1}, int))
+    x = Polynomials([0, 1], int)
+    assert type(x.shift(1000)._coeffs) is SparseArray
+    assert x.shift(1000) == Polynomials([0] * 1001 + [1], int)
+    # Filled enough, the result is dense again.
+    dense = x.shift(1000) + Polynomials(list(range(1, 500)), int)
+    assert type(dense._coeffs) is tuple and dense.terms()[-1] == (1001, 1)
+
+
+def test_sparse_prime_field():
+    f = Polynomials.from_terms({100000: 1, 17: 3, 0: 1}, FiveElementsField)
+    assert type(f._coeffs) is SparseArray
+    assert len(f.to_bytes()) < 16 and Polynomials.from_bytes(f.to_bytes()) == f
+    dense = f._packed()
+    assert f == dense and dense == f and hash(f) == hash(dense)
+    g = Polynomials([1, 2, 0, 4], FiveElementsField)
+    assert f * g == dense * g and g * f == g * dense and f - g == dense - g
+    assert f % g == dense % g and f.gcd(g) == dense.gcd(g)
+    assert f.roots() == dense.roots()
+    # X^125 - 1 = (X - 1)^125 over Z / 5Z.
+    h = Polynomials.from_terms({125: 1, 0: -1}, FiveElementsField)
+    assert type(h._coeffs) is SparseArray
+    assert h.factor() == (FiveElementsField(1), [(Polynomials([-1, 1], FiveElementsField), 125)])
+
+
+def test_sparse_division():
+    f = Polynomials.from_terms({200: 1, 3: 2}, Rationals)
+    divisor = Polynomials([1, 0, 1], Rationals)
+    q, r = f.euclidean_division(divisor)
+    assert q * divisor + r == f
+    assert f.gcd(Polynomials.from_terms({100: 1, 2: 1}, Rationals)) == Polynomials([0, 0, 1], Rationals)
+    packed = Polynomials.from_terms({300: 1, 3: 2}, FiveElementsField)
+    assert packed.terms() == [(3, FiveElementsField(2)), (300, FiveElementsField(1))]
+    with pytest.raises(TypeError):
+        Polynomials.from_terms({-1: 1}, int)
+    with pytest.raises(TypeError):
+        Polynomials.from_terms({1: 's'}, int)
+
+
+def test_modulus():
+    field = PrimeField(998244353)
+    m = Polynomials([3, 0, 1, 4, 1], field)
+    modulus = polynomials.Modulus(m)
+    f = Polynomials(list(range(1, 12)), field)
+    g = Polynomials([5, 7, 9], field)
+    assert modulus.reduce(f) == f % m
+    assert modulus.mulmod(f, g) == f * g % m
+    assert modulus.powmod(g, 0) == Polynomials([1], field)
+    for n in (1, 2, 5, 33, 1000):
+        expected = Polynomials([1], field)
+        for _ in range(n):
+            expected = expected * g % m
+        assert pow(g, n, modulus) == pow(g, n, m) == expected
+    assert g ** 3 == g * g * g
+    # Long divisors use the cached reciprocal of the reversed divisor.
+    m = Polynomials(list(range(1, 300)), field)
+    f = Polynomials(list(range(7, 900)), field)
+    assert polynomials.Modulus(m).reduce(f) == f % m
+    m = Polynomials([1, 2, 3], int)
+    assert polynomials.Modulus(m).reduce(Polynomials([1, 0, 0, 1], Rationals)) == \
+        Polynomials([Rationals(11, 9), Rationals(1, 9)], Rationals)
+
+
+def test_bad_modulus():
+    with pytest.raises(ZeroDivisionError):
+        polynomials.Modulus(Polynomials([], Rationals))
+    with pytest.raises(TypeError):
+        polynomials.Modulus(3)
+    f = Polynomials([1, 1], Rationals)
+    with pytest.raises(ValueError):
+        pow(f, -1, f)
+    with pytest.raises(ValueError):
+        f ** 0.5
+
+
+@pytest.mark.parametrize('len1, len2, n', [(0, 5, 3), (5, 7, 4), (30, 30, 59), (100, 40, 70), (200, 300, 250)])
+def test_mul_low(len1, len2, n):
+    ls1 = [(3 * i) % 11 - 5 for i in range(len1)]
+    ls2 = [(7 * i) % 13 - 6 for i in range(len2)]
+    assert algorithms.mul_low(ls1, ls2, n) == (algorithms.mul_lists(ls1, ls2) + [0] * n)[:n]
+    f, g = Polynomials(ls1, Rationals), Polynomials(ls2, Rationals)
+    assert f._mullow(g, n) == (f * g)._truncated(n)
+
+
+@pytest.mark.parametrize('field', [PrimeField(2), ThreeElementsField, FiveElementsField, PrimeField(998244353)])
+def test_factor(field):
+    factors = [Polynomials([1, 1], field), Polynomials([2, 0, 1], field), Polynomials([1, 1, 0, 1], field),
+               Polynomials([3, 1], field)]
+    f = factors[0] ** 3 * factors[1] * factors[2] ** min(field._prime, 5) * factors[3] * -1
+    c, result = f.factor()
+    assert c == f._coeffs[-1]
+    product = Polynomials([c], field)
+    for g, k in result:
+        assert g.to_monic() == g
+        assert g.factor()[1] == [(g, 1)]
+        product = product * g ** k
+    assert product == f
+    assert [g.degree() for g, _ in result] == sorted(g.degree() for g, _ in result)
+
+
+def test_factor_irreducible():
+    # X^4 + X + 1 is irreducible over Z / 2Z, X^8 + 1 = (X + 1)^8.
+    field = PrimeField(2)
+    f = Polynomials([1, 1, 0, 0, 1], field)
+    assert f.factor() == (field(1), [(f, 1)])
+    assert Polynomials([1] + [0] * 7 + [1], field).factor()[1] == [(Polynomials([1, 1], field), 8)]
+    # Over Z / 5Z, X^4 - 1 has the roots 1, 2, 3, 4.
+    c, result = Polynomials([-1, 0, 0, 0, 1], FiveElementsField).factor()
+    assert {g for g, _ in result} == {Polynomials([-r, 1], FiveElementsField) for r in (1, 2, 3, 4)}
+    assert Polynomials([], FiveElementsField).factor() == (FiveElementsField(0), [])
+    assert Polynomials([3], FiveElementsField).factor() == (FiveElementsField(3), [])
+    with pytest.raises(TypeError):
+        Polynomials([1, 2], Rationals).factor()
+
+
+@pytest.mark.parametrize('field', [PrimeField(2), FiveElementsField, PrimeField(251), PrimeField(998244353)])
+def test_roots(field):
+    p = field._prime
+    # 3 generates the units modulo 998244353, so X^2 - 3 has no roots there.
+    f = Polynomials([-9, 0, 1], field) ** 2 * Polynomials([-3, 0, 1], field) * 3
+    for r in (0, 1, 1, 4):
+        f = f * Polynomials([-r, 1], field)
+    if p < 1000:
+        expected = [x for x in range(p) if f(field(x)) == 0]
+    else:
+        expected = sorted({0, 1, 4, 3, p - 3})
+    assert [int(r) for r in f.roots()] == expected
+    assert Polynomials([1], field).roots() == []
+
+
+def test_roots_many():
+    field = PrimeField(31)
+    polynomials = [Polynomials([(i * 7 + k * k) % 31 for k in range(6)] + [1], field) for i in range(50)]
+    polynomials.append(Polynomials([-5, 1], PrimeField(257)))
+    result = Polynomials.roots_many(polynomials)
+    for f, roots in zip(polynomials[:-1], result):
+        assert roots == [field(x) for x in range(31) if f(field(x)) == 0]
+    assert result[-1] == [PrimeField(257)(5)]
+    with pytest.raises(ValueError):
+        Polynomials([], field).roots()
+    with pytest.raises(TypeError):
+        Polynomials([1, 1], Rationals).roots()
+
+
+@pytest.mark.parametrize('f', [
+    Polynomials([], int),
+    Polynomials([3, -(1 << 80), 0, 7], int),
+    Polynomials([0.5, -2.25, 1e300], float),
+    Polynomials([Rationals(1, 7), Rationals(-5, 3), 2], Rationals),
+    Polynomials([4, 0, 1, 3, 2], FiveElementsField),
+    Polynomials([1, 2], PrimeField(998244353)),
+    Polynomials.from_terms({0: 1, 5000: Rationals(2, 9)}, Rationals),
+])
+def test_bytes(f):
+    data = f.to_bytes()
+    g = Polynomials.from_bytes(data)
+    assert g == f and g._base_cls is f._base_cls
+    assert Polynomials.from_bytes(memoryview(data)) == f
+
+
+def test_bad_bytes():
+    data = Polynomials([1, 2, 3], FiveElementsField).to_bytes()
+    for bad in (b'', data[:-1], data + b'\0', b'\x7f' + data[1:]):
+        with pytest.raises(ValueError):
+            Polynomials.from_bytes(bad)
+    with pytest.raises(TypeError):
+        Polynomials([Polynomials([1], int)], Polynomials).to_bytes()
@@ -0,0 +1,74 @@
+import pytest
+
+from integer_residues import FiveElementsField, PrimeField
+from polynomials import Polynomials
+from power_series import PowerSeries
+from rationals import Rationals
+
+X = PowerSeries([0, 1], 8, int)
+
+
+def test_init():
+    f = PowerSeries([1, 2, 3, 4], 2, Rationals)
+    assert f.precision == 2
+    assert f.polynomial == Polynomials([1, 2], Rationals)
+    assert f == PowerSeries(Polynomials([1, 2, 5], Rationals), 2)
+    assert f != PowerSeries(Polynomials([1, 2], Rationals), 3)
+    assert str(f) == "2*X + 1 + O(X^2)"
+    assert repr(PowerSeries([1], 1, int)) == "PowerSeries(Polynomials([1], int), 1)"
+    with pytest.raises(TypeError):
+        PowerSeries([1, 2], 3)
+    with pytest.raises(ValueError):
+        PowerSeries([1, 2], 0, int)
+
+
+def test_arithmetic():
+    f = 1 + X
+    assert f * f == PowerSeries([1, 2, 1], 8, int)
+    assert (f ** 10).polynomial == Polynomials([1, 10, 45, 120, 210, 252, 210, 120], int)
+    assert (f - X) * 3 == PowerSeries([3], 8, int)
+    assert f * PowerSeries([1, 1], 3, int) == PowerSeries([1, 2, 1], 3, int)
+    assert f * Polynomials([0, 0, 0, 0, 0, 0, 0, 1], int) == PowerSeries([0, 0, 0, 0, 0, 0, 0, 1], 8, int)
+    assert 1 / (1 - X) == PowerSeries([1] * 8, 8, Rationals)
+    assert f ** -1 == PowerSeries([1, -1, 1, -1, 1, -1, 1, -1], 8, Rationals)
+    assert f / f == PowerSeries([1], 8, Rationals)
+
+
+def test_newton():
+    exp = PowerSeries([Rationals(1, n) for n in (1, 1, 2, 6, 24, 120, 720, 5040)], 8, Rationals)
+    assert X.exp() == exp
+    assert exp.log() == PowerSeries([0, 1], 8, Rationals)
+    # log(1 + X) = X - X^2 / 2 + X^3 / 3 - ...
+    assert (1 + X).log() == PowerSeries([0] + [Rationals((-1) ** (n + 1), n) for n in range(1, 8)], 8, Rationals)
+    root = (1 + X).sqrt()
+    assert root * root == PowerSeries([1, 1], 8, Rationals)
+    assert root.polynomial._coeffs[:3] == (1, Rationals(1, 2), Rationals(-1, 8))
+    assert X.derivative() == PowerSeries([1], 7, int)
+    assert (1 + X).integral() == PowerSeries([0, 1, Rationals(1, 2)], 9, Rationals)
+
+
+def test_prime_field():
+    field = PrimeField(998244353)
+    n = 300
+    f = PowerSeries(Polynomials(list(range(1, n + 1)), field), n)
+    assert (f * f.inverse()).polynomial == Polynomials([1], field)
+    g = PowerSeries(Polynomials([0] + list(range(1, n)), field), n)
+    assert g.exp().log() == g
+    h = 1 + g
+    assert h.sqrt() ** 2 == h
+
+
+def test_bad_newton():
+    with pytest.raises(ZeroDivisionError):
+        X.inverse()
+    with pytest.raises(ValueError):
+        X.log()
+    with pytest.raises(ValueError):
+        (1 + X).exp()
+    with pytest.raises(ValueError):
+        (2 + X).sqrt()
+    # 5 is not invertible in Z / 5Z.
+    with pytest.raises(ValueError):
+        PowerSeries([0, 1], 8, FiveElementsField).exp()
+    with pytest.raises(ValueError):
+        X ** 0.5
@@ -1,6 +1,6 @@
 import pytest
 
-from rationals import Rationals
+from rationals import Rationals, RationalArray
 
 
 TEST_INIT = [
@@ -175,3 +175,64 @@ def test_bad_cmp():
         {} < Rationals(1, 2)
     with pytest.raises(TypeError):
         None <= Rationals(1, 2)
+
+
+def test_reduced_arithmetic():
+    from fractions import Fraction
+    values = [(n, d) for n in range(-12, 13, 5) for d in (1, 2, 6, 9, 12, -4)]
+    for n1, d1 in values:
+        for n2, d2 in values:
+            a, b = Rationals(n1, d1), Rationals(n2, d2)
+            fa, fb = Fraction(n1, d1), Fraction(n2, d2)
+            for res, expected in [(a + b, fa + fb), (a - b, fa - fb), (a * b, fa * fb)]:
+                assert (res._nom, res._denom) == (expected.numerator, expected.denominator)
+            if n2:
+                res, expected = a / b, fa / fb
+                assert (res._nom, res._denom) == (expected.numerator, expected.denominator)
+
+
+def test_rational_array():
+    a = RationalArray([1, Rationals(-2, 4), 0, Rationals(5, 3)])
+    b = RationalArray([2, 3, -4, 5], [4, -9, 6, 1])
+    assert a == [1, Rationals(-1, 2), 0, Rationals(5, 3)]
+    assert b == RationalArray([Rationals(1, 2), Rationals(-1, 3), Rationals(-2, 3), 5])
+    assert repr(b) == "RationalArray([1, -1, -2, 5], [2, 3, 3, 1])"
+    assert a[1] == Rationals(-1, 2) and a[1:3] == RationalArray([Rationals(-1, 2), 0])
+    for op in ('__add__', '__sub__', '__mul__', '__truediv__'):
+        for other in (b, 3, Rationals(-2, 7)):
+            expected = [getattr(x, op)(y) for x, y in zip(a, other if type(other) is RationalArray else [other] * 4)]
+            assert getattr(a, op)(other) == expected
+    assert 2 - a == [1, Rationals(5, 2), 2, Rationals(1, 3)]
+    assert 1 / b == [2, -3, Rationals(-3, 2), Rationals(1, 5)]
+    assert -a == [-x for x in a]
+    assert a.lt(b) == [False, True, False, True]
+    assert a.ge(0) == [True, False, True, True]
+    assert a.sum() == sum(a, Rationals(0))
+    assert b.prod() == Rationals(5, 9)
+    assert a.dot(b) == Rationals(1, 2) + Rationals(1, 6) + Rationals(25, 3)
+    assert RationalArray().sum() == 0 and RationalArray().prod() == 1
+
+
+def test_bad_rational_array():
+    with pytest.raises(ValueError):
+        RationalArray([1, 'a'])
+    with pytest.raises(ValueError):
+        RationalArray([1, 2], [1])
+    with pytest.raises(ZeroDivisionError):
+        RationalArray([1, 2], [1, 0])
+    with pytest.raises(ZeroDivisionError):
+        RationalArray([1, 2]) / RationalArray([1, 0])
+    with pytest.raises(ValueError):
+        RationalArray([1, 2]) + RationalArray([1])
+    with pytest.raises(TypeError):
+        RationalArray([1, 2]) + 'a'
+    with pytest.raises(TypeError):
+        RationalArray([1, 2]).lt('a')
+
+
+def test_hash():
+    from fractions import Fraction
+    assert hash(Rationals(6, 3)) == hash(2)
+    assert hash(Rationals(-1, 2)) == hash(-0.5) == hash(Fraction(-1, 2))
+    assert hash(Rationals(5, 7)) == hash(Fraction(5, 7))
+    assert {Rationals(1, 3): 'a'}[Rationals(2, 6)] == 'a'